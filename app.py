@@ -1,37 +1,82 @@
-from flask import Flask, render_template_string, request, redirect, url_for, session, send_file
-from werkzeug.security import generate_password_hash, check_password_hash
-import pandas as pd
+from flask import Flask, request, redirect, url_for, session, send_file, g, jsonify, Response, stream_with_context
+from functools import wraps
+import io
 import json
+import os
+
+import numpy as np
+
+from compression import CompressionMiddleware
+from conditional import build_tag, conditional
+from fastjson import json_response
+from password_pool import PasswordPool, PoolBusy
+from response_cache import LRUCache
+from session_store import ServerSessionInterface, session_store_from_env
+from static_assets import StaticAssets
+from template_registry import TemplateRegistry
+from trip_dataset import DatasetManager
+from trip_calendar import parse_range
+from trip_export import ExportError, iter_csv, iter_xlsx, select_rows
+from trip_metrics import ONGOING, CLOSED, UNDER_AUDIT
+from user_store import DuplicateEmail, UserStore
 
 app = Flask(__name__)
 app.secret_key = 'supersecret'
-
-# Load Excel datasets
+# Sessions are kept server-side (SESSION_DB for a store shared by all workers);
+# the cookie only carries a random session id.
+app.session_interface = ServerSessionInterface(session_store_from_env())
+# Gzip/brotli for text responses (COMPRESS_LEVEL, COMPRESS_MIN_SIZE, COMPRESS_CACHE_SIZE).
+compression = CompressionMiddleware(app.wsgi_app)
+app.wsgi_app = compression
+
+# Load Excel datasets (fleet sheet + closure data for the financial dashboard);
+# the manager reloads them in the background whenever either file changes.
 fleet_file = 'fleet_50_entries.xlsx'
 closure_file = 'Trip_Closure_Sheet_Oct2024_Mar2025.xlsx'
 
-df = pd.read_excel(fleet_file)
-df.columns = df.columns.str.strip()
-df['Trip Date'] = pd.to_datetime(df['Trip Date'], errors='coerce')
-df['Day'] = df['Trip Date'].dt.day
+datasets = DatasetManager(fleet_file, closure_file)
+datasets.start_watcher()
+
+@app.before_request
+def pin_dataset():
+    # Every request works on the snapshot that was current when it started.
+    g.dataset = datasets.current()
+
+# Rendered dashboard pages keyed by (vehicle, route, dataset version).
+dashboard_cache = LRUCache(
+    maxsize=int(os.environ.get('DASHBOARD_CACHE_SIZE', '256')),
+    ttl=float(os.environ['DASHBOARD_CACHE_TTL']) if os.environ.get('DASHBOARD_CACHE_TTL') else None)
+
+# Dashboard contexts (summary/daily/finance) keyed by (filters..., dataset version);
+# the page and the three /api/v1 parts share one cube.summary per filter.
+context_cache = LRUCache(maxsize=int(os.environ.get('DASHBOARD_CACHE_SIZE', '256')))
 
-# Load closure data for financial dashboard
-closure_df = pd.read_excel(closure_file)
-closure_df.columns = closure_df.columns.str.strip()
-closure_df['Trip Date'] = pd.to_datetime(closure_df['Trip Date'], errors='coerce')
-closure_df['Day'] = closure_df['Trip Date'].dt.day
+# AI report texts keyed by (vehicle, route, from, to, dataset version).
+ai_report_cache = LRUCache(maxsize=int(os.environ.get('AI_REPORT_CACHE_SIZE', '256')))
 
-vehicles = sorted(df['Vehicle ID'].dropna().unique())
-routes = sorted(df['Route'].dropna().unique()) if 'Route' in df.columns else []
+@datasets.on_swap
+def clear_dashboard_cache(old, new):
+    dashboard_cache.clear()
+    context_cache.clear()
+    ai_report_cache.clear()
+    compression.cache.clear()
 
-users = []
+# Accounts live in SQLite (USER_DB, default users.db) so every worker sees them.
+users = UserStore()
+# Password hashing runs in a bounded process pool (PASSWORD_WORKERS, PASSWORD_QUEUE).
+passwords = PasswordPool()
+
+@app.errorhandler(PoolBusy)
+def password_pool_busy(exc):
+    return 'Too many sign-ins right now, please try again in a moment.', 429, {'Retry-After': '1'}
 
 TEMPLATES = {
     'signup': '''
-    <html><head><title>Sign Up</title><script src="https://cdn.tailwindcss.com"></script></head>
+    <html><head><title>Sign Up</title><link rel="stylesheet" href="{{ asset_url('css/app.css') }}"></head>
     <body class="bg-[#0B132B] text-white flex justify-center items-center h-screen">
       <form method="POST" class="bg-[#0E1A36] p-8 rounded-xl space-y-4 w-96">
         <h1 class="text-2xl font-bold text-center">Sign Up</h1>
+        {% if error %}<p class="text-red-400 text-center">{{ error }}</p>{% endif %}
         <input name="fullname" placeholder="Full Name" class="w-full p-2 rounded bg-[#1C2541]" required>
         <input name="email" type="email" placeholder="Email" class="w-full p-2 rounded bg-[#1C2541]" required>
         <input name="password" type="password" placeholder="Password" class="w-full p-2 rounded bg-[#1C2541]" required>
@@ -42,7 +87,7 @@ TEMPLATES = {
     ''',
 
     'login': '''
-    <html><head><title>Login</title><script src="https://cdn.tailwindcss.com"></script></head>
+    <html><head><title>Login</title><link rel="stylesheet" href="{{ asset_url('css/app.css') }}"></head>
     <body class="bg-[#0B132B] text-white flex justify-center items-center h-screen">
       <form method="POST" class="bg-[#0E1A36] p-8 rounded-xl space-y-4 w-96">
         <h1 class="text-2xl font-bold text-center">Login</h1>
@@ -55,23 +100,34 @@ TEMPLATES = {
     ''',
 
     'table_page': '''
-    <html><head><title>{{ title }}</title><script src="https://cdn.tailwindcss.com"></script></head>
+    <html><head><title>{{ title }}</title><link rel="stylesheet" href="{{ asset_url('css/app.css') }}"></head>
     <body class="bg-[#0B132B] text-white p-6">
       <h2 class="text-2xl font-bold mb-4">{{ title }}</h2>
+      <div class="flex gap-3 mb-2 text-sm">
+        <span>Sort by:</span>
+        {% for label, link, active in sort_links %}
+          <a href="{{ link }}" class="underline {% if active %}font-bold{% endif %}">{{ label }}</a>
+        {% endfor %}
+      </div>
       <div class="overflow-x-auto text-sm bg-[#1C2541] p-4 rounded">{{ table|safe }}</div>
+      <div class="flex gap-4 items-center mt-2 text-sm">
+        <span>Rows {{ page.first }}–{{ page.last }} of {{ page.total }} (page {{ page.number }} of {{ page.pages }})</span>
+        {% if prev_url %}<a href="{{ prev_url }}" class="underline">Previous</a>{% endif %}
+        {% if next_url %}<a href="{{ next_url }}" class="underline">Next</a>{% endif %}
+      </div>
       <a href="{{ url_for('dashboard') }}" class="mt-4 inline-block bg-blue-500 px-4 py-2 rounded">Back</a>
     </body></html>
     ''',
 
     'dashboard': '''
     <html><head><title>Dashboard</title>
-    <script src="https://cdn.tailwindcss.com"></script>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+    <link rel="stylesheet" href="{{ asset_url('css/app.css') }}">
+    <script src="{{ asset_url('vendor/chart.umd.js') }}"></script>
     </head>
     <body class="bg-[#0B132B] text-white p-6 font-sans">
       <h1 class="text-3xl font-bold mb-6">Fleet Owner Dashboard</h1>
 
-      <form method="get" class="flex gap-4 mb-6">
+      <form method="get" id="filters" class="flex gap-4 mb-6">
         <select name="vehicle" class="text-black p-2 rounded">
           <option value="">All Vehicles</option>
           {% for v in vehicles %}
@@ -84,30 +140,32 @@ TEMPLATES = {
             <option value="{{ r }}" {% if r == selected_route %}selected{% endif %}>{{ r }}</option>
           {% endfor %}
         </select>
+        <input type="date" name="from" value="{{ selected_from }}" class="text-black p-2 rounded">
+        <input type="date" name="to" value="{{ selected_to }}" class="text-black p-2 rounded">
         <button class="bg-blue-600 hover:bg-blue-700 px-4 py-2 rounded">Apply Filters</button>
       </form>
 
       <div class="grid grid-cols-3 gap-4 mb-6">
         <div class="bg-[#1C2541] p-4 rounded">
-          <p>Total Trips: <b>{{ total_trips }}</b></p>
-          <p>Ongoing: <b>{{ ongoing }}</b></p>
-          <p>Closed: <b>{{ closed }}</b></p>
-          <p>Flags: <b>{{ flags }}</b></p>
-          <p>Resolved: <b>{{ resolved }}</b></p>
+          <p>Total Trips: <b data-field="total_trips">{{ total_trips }}</b></p>
+          <p>Ongoing: <b data-field="ongoing">{{ ongoing }}</b></p>
+          <p>Closed: <b data-field="closed">{{ closed }}</b></p>
+          <p>Flags: <b data-field="flags">{{ flags }}</b></p>
+          <p>Resolved: <b data-field="resolved">{{ resolved }}</b></p>
         </div>
         <div class="bg-[#1C2541] p-4 rounded">
           <p class="font-bold mb-2 text-lg">Financial Summary</p>
-          <p>Revenue: ₹{{ rev_m }}M</p>
-          <p>Expense: ₹{{ exp_m }}M</p>
-          <p>Profit: ₹{{ profit_m }}M</p>
-          <p>KMs: {{ kms_k }}K</p>
-          <p>Per KM: ₹{{ per_km }}</p>
-          <p>Profit %: {{ profit_pct }}%</p>
+          <p>Revenue: ₹<span data-field="rev_m">{{ rev_m }}</span>M</p>
+          <p>Expense: ₹<span data-field="exp_m">{{ exp_m }}</span>M</p>
+          <p>Profit: ₹<span data-field="profit_m">{{ profit_m }}</span>M</p>
+          <p>KMs: <span data-field="kms_k">{{ kms_k }}</span>K</p>
+          <p>Per KM: ₹<span data-field="per_km">{{ per_km }}</span></p>
+          <p>Profit %: <span data-field="profit_pct">{{ profit_pct }}</span>%</p>
         </div>
         <div class="bg-[#1C2541] p-4 rounded">
           <p class="font-bold mb-2">AI Report</p>
-          <pre class="text-sm text-gray-300">{{ ai_report }}</pre>
-          <a href="/download-summary" class="mt-2 inline-block bg-green-600 px-3 py-1 rounded hover:bg-green-700">Download Summary</a>
+          <pre id="aiReport" class="text-sm text-gray-300" data-src="{{ url_for('ai_report_fragment', **export_args) }}">Loading AI report...</pre>
+          <a href="{{ url_for('download_summary', **export_args) }}" data-export class="mt-2 inline-block bg-green-600 px-3 py-1 rounded hover:bg-green-700">Download Summary</a>
         </div>
       </div>
 
@@ -129,13 +187,15 @@ TEMPLATES = {
         <a href="/trip-ongoing" class="bg-purple-600 px-4 py-2 rounded">Ongoing Trips</a>
         <a href="/trip-stats" class="bg-pink-600 px-4 py-2 rounded">Trip Stats</a>
         <a href="/financial-dashboard" class="bg-orange-600 px-4 py-2 rounded">Financial Dashboard</a>
+        <a href="{{ url_for('export_trips', fmt='csv', **export_args) }}" data-export class="bg-teal-600 px-4 py-2 rounded">Export CSV</a>
+        <a href="{{ url_for('export_trips', fmt='xlsx', **export_args) }}" data-export class="bg-teal-600 px-4 py-2 rounded">Export Excel</a>
         <a href="/logout" class="bg-red-600 px-4 py-2 rounded">Logout</a>
       </div>
 
       <script>
-        new Chart(document.getElementById('auditChart').getContext('2d'), {
+        const auditChart = new Chart(document.getElementById('auditChart').getContext('2d'), {
           data: {
-            labels: Array.from({length: 31}, (_, i) => i + 1),
+            labels: {{ labels | tojson }},
             datasets: [
               {type: 'bar', label: 'Closed', data: {{ daily | safe }}, backgroundColor: '#4CAF50'},
               {type: 'bar', label: 'Audited', data: {{ audited | safe }}, backgroundColor: '#2196F3'},
@@ -153,7 +213,7 @@ TEMPLATES = {
           }
         });
 
-        new Chart(document.getElementById('financeChart').getContext('2d'), {
+        const financeChart = new Chart(document.getElementById('financeChart').getContext('2d'), {
           type: 'bar',
           data: {
             labels: {{ bar_labels | safe }},
@@ -171,163 +231,43 @@ TEMPLATES = {
             }
           }
         });
+
+        // The AI report is built on its own request, after the page has rendered.
+        const aiReport = document.getElementById('aiReport');
+        function loadReport(url) {
+          fetch(url).then(r => r.text()).then(text => { aiReport.textContent = text; });
+        }
+        loadReport(aiReport.dataset.src);
+
+        // Filter changes only fetch the JSON data API instead of reloading the page.
+        document.getElementById('filters').addEventListener('submit', async function (event) {
+          event.preventDefault();
+          const query = new URLSearchParams(new FormData(this)).toString();
+          const [summary, daily, finance] = await Promise.all(
+            ['summary', 'daily', 'finance'].map(name => fetch('/api/v1/' + name + '?' + query).then(r => r.json())));
+          document.querySelectorAll('[data-field]').forEach(el => { el.textContent = summary[el.dataset.field]; });
+          auditChart.data.labels = daily.labels;
+          auditChart.data.datasets[0].data = daily.daily;
+          auditChart.data.datasets[1].data = daily.audited;
+          auditChart.data.datasets[2].data = daily.audit_pct;
+          auditChart.update();
+          financeChart.data.datasets[0].data = finance.bar_values;
+          financeChart.update();
+          loadReport('/dashboard/ai-report?' + query);
+          history.replaceState(null, '', '?' + query);
+          document.querySelectorAll('[data-export]').forEach(el => { el.search = '?' + query; });
+        });
       </script>
     </body>
     </html>
-    '''
-}
-
-def generate_ai_report(filtered_df):
-    if filtered_df.empty:
-        return "No data available for AI report."
-    most_profitable_vehicle = filtered_df.groupby('Vehicle ID')['Net Profit'].sum().idxmax()
-    top_routes = ", ".join(filtered_df['Route'].value_counts().head(2).index) if 'Route' in filtered_df.columns else "N/A"
-    avg_profit_per_trip = round(filtered_df['Net Profit'].sum() / len(filtered_df), 2)
-    rev = filtered_df['Freight Amount'].sum()
-    exp = filtered_df['Total Trip Expense'].sum()
-    profit = filtered_df['Net Profit'].sum()
-    kms = filtered_df['Actual Distance (KM)'].sum()
-    profit_pct = round((profit / rev * 100), 1) if rev else 0
-    per_km = round(profit / kms, 2) if kms else 0
-    return f"""
-📊 AI Report Highlights:
-
-Total Trips: {len(filtered_df)}
-On-going Trips: {filtered_df[filtered_df['Trip Status'] == 'Pending Closure'].shape[0]}
-Completed Trips: {filtered_df[filtered_df['Trip Status'] == 'Completed'].shape[0]}
-Profit Percentage: {profit_pct}%
-
-Financials:
-- Revenue: ₹{round(rev / 1e6, 2)}M
-- Expense: ₹{round(exp / 1e6, 2)}M
-- Profit: ₹{round(profit / 1e6, 2)}M
-- KMs Travelled: {round(kms / 1e3, 1)}K
-- Cost per KM: ₹{per_km}
-
-AI Insights:
-- Top Vehicle: {most_profitable_vehicle}
-- Average Profit per Trip: ₹{avg_profit_per_trip}
-- Top Routes: {top_routes}
-"""
-
-@app.route('/')
-def home():
-    return redirect(url_for('signup'))
-
-@app.route('/signup', methods=['GET', 'POST'])
-def signup():
-    if request.method == 'POST':
-        users.append({
-            'name': request.form['fullname'],
-            'email': request.form['email'],
-            'password': generate_password_hash(request.form['password']),
-            'role': 'Owner'
-        })
-        return redirect(url_for('login'))
-    return render_template_string(TEMPLATES['signup'])
-
-@app.route('/login', methods=['GET', 'POST'])
-def login():
-    if request.method == 'POST':
-        user = next((u for u in users if u['email'] == request.form['email']), None)
-        if user and check_password_hash(user['password'], request.form['password']):
-            session['user'] = user
-            return redirect(url_for('dashboard'))
-        return 'Invalid credentials. <a href="' + url_for('login') + '">Try again</a>'
-    return render_template_string(TEMPLATES['login'])
-
-@app.route('/dashboard')
-def dashboard():
-    if 'user' not in session:
-        return redirect(url_for('login'))
-    vehicle = request.args.get('vehicle')
-    route = request.args.get('route')
-    filtered = df.copy()
-    if vehicle:
-        filtered = filtered[filtered['Vehicle ID'] == vehicle]
-    if route:
-        filtered = filtered[filtered['Route'] == route]
-
-    total_trips = len(filtered)
-    ongoing = filtered[filtered['Trip Status'] == 'Pending Closure'].shape[0]
-    closed = filtered[filtered['Trip Status'] == 'Completed'].shape[0]
-    flags = filtered[filtered['Trip Status'] == 'Under Audit'].shape[0]
-    resolved = filtered[(filtered['Trip Status'] == 'Under Audit') & (filtered['POD Status'] == 'Yes')].shape[0]
-
-    rev = filtered['Freight Amount'].sum()
-    exp = filtered['Total Trip Expense'].sum()
-    profit = filtered['Net Profit'].sum()
-    kms = filtered['Actual Distance (KM)'].sum()
-
-    rev_m = round(rev / 1e6, 2)
-    exp_m = round(exp / 1e6, 2)
-    profit_m = round(profit / 1e6, 2)
-    kms_k = round(kms / 1e3, 1)
-    per_km = round(profit / kms, 2) if kms else 0
-    profit_pct = round((profit / rev) * 100, 1) if rev else 0
-
-    daily = filtered.groupby('Day')['Trip ID'].count().reindex(range(1, 32), fill_value=0).tolist()
-    audited = filtered[filtered['Trip Status'] == 'Under Audit'].groupby('Day')['Trip ID'].count().reindex(range(1, 32), fill_value=0).tolist()
-    audit_pct = [round(a / b * 100, 1) if b else 0 for a, b in zip(audited, daily)]
-
-    bar_labels = ['Revenue', 'Expense', 'Profit']
-    bar_values = [float(rev_m), float(exp_m), float(profit_m)]
-    ai_report = generate_ai_report(filtered)
-
-    return render_template_string(TEMPLATES['dashboard'],
-        total_trips=total_trips, ongoing=ongoing, closed=closed,
-        flags=flags, resolved=resolved, rev_m=rev_m, exp_m=exp_m,
-        profit_m=profit_m, kms_k=kms_k, per_km=per_km, profit_pct=profit_pct,
-        ai_report=ai_report, vehicles=vehicles, routes=routes,
-        selected_vehicle=vehicle, selected_route=route,
-        daily=daily, audited=audited, audit_pct=audit_pct,
-        bar_labels=bar_labels, bar_values=bar_values)
-
-@app.route('/trip-generator')
-def trip_generator():
-    data = df[['Trip ID', 'Vehicle ID', 'Trip Status']]
-    return render_template_string(TEMPLATES['table_page'], title="Trip Generator", table=data.to_html(classes='text-white', index=False))
-
-@app.route('/trip-closure')
-def trip_closure():
-    data = df[df['Trip Status'] == 'Pending Closure'][['Trip ID', 'Vehicle ID', 'Trip Status']]
-    return render_template_string(TEMPLATES['table_page'], title="Trip Closure", table=data.to_html(classes='text-white', index=False))
-
-@app.route('/trip-auditor')
-def trip_auditor():
-    data = df[df['Trip Status'] == 'Under Audit'][['Trip ID', 'Vehicle ID', 'POD Status']]
-    return render_template_string(TEMPLATES['table_page'], title="Trip Auditor", table=data.to_html(classes='text-white', index=False))
-
-@app.route('/trip-ongoing')
-def trip_ongoing():
-    data = df[df['Trip Status'] == 'Pending Closure'][['Trip ID', 'Vehicle ID', 'Trip Status']]
-    return render_template_string(TEMPLATES['table_page'], title="Ongoing Trips", table=data.to_html(classes='text-white', index=False))
-
-import json  # make sure you have this import at the top if not already present
-
-@app.route('/trip-stats')
-def trip_stats():
-    days = list(range(1, 32))
-    total = df.groupby('Day')['Trip ID'].count().reindex(days, fill_value=0).tolist()
-    ongoing = df[df['Trip Status'] == 'Pending Closure'].groupby('Day')['Trip ID'].count().reindex(days, fill_value=0).tolist()
-    closed = df[df['Trip Status'] == 'Completed'].groupby('Day')['Trip ID'].count().reindex(days, fill_value=0).tolist()
-
-    # JSON serialize for safe embedding in JS
-    total_json = json.dumps(total)
-    ongoing_json = json.dumps(ongoing)
-    closed_json = json.dumps(closed)
-
-    # Sum totals to display numeric counts
-    total_sum = sum(total)
-    ongoing_sum = sum(ongoing)
-    closed_sum = sum(closed)
+    ''',
 
-    return render_template_string("""
+    'trip_stats': """
     <!DOCTYPE html>
     <html>
     <head>
       <title>Trip Count Statistics</title>
-      <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+      <script src="{{ asset_url('vendor/chart.umd.js') }}"></script>
       <style>
         body {
           background-color: #0d1b2a;
@@ -362,6 +302,12 @@ def trip_stats():
     <body>
       <h2>Trip Count Statistics</h2>
 
+      <form method="get" class="legend">
+        <label>From <input type="date" name="from" value="{{ selected_from }}"></label>
+        <label>To <input type="date" name="to" value="{{ selected_to }}"></label>
+        <button type="submit">Apply</button>
+      </form>
+
       <div class="stats-summary">
         <div>Total Trips: {{ total_sum }}</div>
         <div>On-going Trips: {{ ongoing_sum }}</div>
@@ -377,7 +323,7 @@ def trip_stats():
 
       <script>
         const ctx = document.getElementById('tripChart').getContext('2d');
-        const labels = Array.from({ length: 31 }, (_, i) => i + 1);
+        const labels = {{ labels_data | safe }};
 
         const datasets = [
           {
@@ -439,36 +385,14 @@ def trip_stats():
     </body>
     </html>
     """,
-    total_data=total_json, ongoing_data=ongoing_json, closed_data=closed_json,
-    total_sum=total_sum, ongoing_sum=ongoing_sum, closed_sum=closed_sum)
-
-
 
-@app.route('/financial-dashboard')
-def financial_dashboard():
-    # Use closure_df for financial stats
-    df_fin = closure_df.copy()
-
-    recent_days = sorted(df_fin['Day'].dropna().unique())[-10:]
-    day_labels = [f"Day {int(d)}" for d in recent_days]
-
-    daily = df_fin[df_fin['Day'].isin(recent_days)]
-
-    revenue_data = daily.groupby('Day')['Freight Amount'].sum().reindex(recent_days, fill_value=0).astype(int).tolist()
-    expense_data = daily.groupby('Day')['Total Trip Expense'].sum().reindex(recent_days, fill_value=0).astype(int).tolist()
-    profit_data = [r - e for r, e in zip(revenue_data, expense_data)]
-
-    total_revenue = round(df_fin['Freight Amount'].sum() / 1e6, 2)
-    total_profit = round(df_fin['Net Profit'].sum() / 1e6, 2)
-    total_km = round(df_fin['Actual Distance (KM)'].sum() / 1e3, 1)
-
-    return render_template_string("""
+    'financial_dashboard': """
 <!DOCTYPE html>
 <html lang="en">
 <head>
   <meta charset="UTF-8">
   <title>Financial Dashboard</title>
-  <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+  <script src="{{ asset_url('vendor/chart.umd.js') }}"></script>
   <style>
     body {
       background-color: #0d1b2a;
@@ -508,6 +432,20 @@ def financial_dashboard():
   </style>
 </head>
 <body>
+  <form method="get" class="legend">
+    <label>From <input type="date" name="from" value="{{ selected_from }}"></label>
+    <label>To <input type="date" name="to" value="{{ selected_to }}"></label>
+    <label>Rolling
+      <select name="rolling">
+        <option value="">Daily</option>
+        {% for n in rolling_windows %}<option value="{{ n }}" {% if n == rolling %}selected{% endif %}>{{ n }}-day sum</option>{% endfor %}
+      </select>
+    </label>
+    <button type="submit">Apply</button>
+    <a href="?window=7" style="color: white">Last 7 days</a>
+    <a href="?window=30" style="color: white">Last 30 days</a>
+    <a href="?window=mtd" style="color: white">Month to date</a>
+  </form>
   <div class="stats">
     <div class="stat-block">
       <h1>₹{{ total_revenue }} M</h1>
@@ -594,21 +532,380 @@ def financial_dashboard():
   </script>
 </body>
 </html>
-    """, days=day_labels, revenue=revenue_data, expense=expense_data, profit=profit_data,
-         total_revenue=total_revenue, total_profit=total_profit, total_km=total_km)
+    """,
+}
+
+# Self-hosted CSS/JS under content-hashed URLs (see static_assets.py).
+assets = StaticAssets(app)
+templates = TemplateRegistry(app, TEMPLATES)
+# Part of every page ETag, so a deploy that changes the markup or assets is refetched.
+app.config['BUILD_TAG'] = build_tag(templates.digest, assets.digest)
+
+def generate_ai_report(data, vehicle=None, route=None, start=None, end=None):
+    cube = data.cube
+    filtered = vehicle or route or start is not None or end is not None
+    cells = cube.cells(vehicle, route, start, end) if filtered else None
+    stats = cube.totals(cells)
+    total_trips = stats['total_trips']
+    if not total_trips:
+        return "No data available for AI report."
+    most_profitable_vehicle = cube.top_by_sum('vehicle', 'Net Profit', cells)
+    top_routes = ", ".join(cube.most_common('route', cells, 2)) if data.trips.route_rows else "N/A"
+    rev, exp, profit, kms = stats['rev'], stats['exp'], stats['profit'], stats['kms']
+    avg_profit_per_trip = round(profit / total_trips, 2)
+    profit_pct = round((profit / rev * 100), 1) if rev else 0
+    per_km = round(profit / kms, 2) if kms else 0
+    return f"""
+📊 AI Report Highlights:
+
+Total Trips: {total_trips}
+On-going Trips: {stats['ongoing']}
+Completed Trips: {stats['closed']}
+Profit Percentage: {profit_pct}%
+
+Financials:
+- Revenue: ₹{round(rev / 1e6, 2)}M
+- Expense: ₹{round(exp / 1e6, 2)}M
+- Profit: ₹{round(profit / 1e6, 2)}M
+- KMs Travelled: {round(kms / 1e3, 1)}K
+- Cost per KM: ₹{per_km}
 
+AI Insights:
+- Top Vehicle: {most_profitable_vehicle}
+- Average Profit per Trip: ₹{avg_profit_per_trip}
+- Top Routes: {top_routes}
+"""
+
+def ai_report(data, vehicle=None, route=None, start=None, end=None):
+    """The AI report for one filter, memoised per dataset version."""
+    key = (vehicle, route, start, end, data.version)
+    report = ai_report_cache.get(key)
+    if report is None:
+        report = ai_report_cache.set(key, generate_ai_report(data, vehicle, route, start, end))
+    return report
+
+@app.route('/')
+def home():
+    return redirect(url_for('signup'))
+
+@app.route('/signup', methods=['GET', 'POST'])
+def signup():
+    if request.method == 'POST':
+        try:
+            users.add(request.form['fullname'], request.form['email'],
+                      passwords.hash(request.form['password']), role='Owner')
+        except DuplicateEmail:
+            return templates.render('signup', error="Email already registered!"), 409
+        return redirect(url_for('login'))
+    return templates.shell('signup')
+
+@app.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        user = users.get(request.form['email'])
+        if user and passwords.check(user['password'], request.form['password']):
+            session.regenerate()
+            session['user'] = {'name': user['name'], 'email': user['email'], 'role': user['role']}
+            return redirect(url_for('dashboard'))
+        return 'Invalid credentials. <a href="' + url_for('login') + '">Try again</a>'
+    return templates.shell('login')
+
+def login_required(view):
+    """Send anonymous requests to the login page (a JSON 401 under /api/).
+
+    Goes above ``@conditional`` so that only signed-in requests get validators or a 304.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if 'user' not in session:
+            if request.path.startswith('/api/'):
+                return json_response({'error': 'login required'}, 401)
+            return redirect(url_for('login'))
+        return view(*args, **kwargs)
+    return wrapper
+
+@app.route('/dashboard')
+@login_required
+def dashboard():
+    data = g.dataset
+    try:
+        filters = dashboard_filters()
+    except ValueError as exc:
+        return str(exc), 400
+    key = filters + (data.version,)
+    page = dashboard_cache.get(key)
+    if page is None:
+        page = dashboard_cache.set(key, render_dashboard(data, *filters))
+    return page
+
+def dashboard_filters():
+    """(vehicle, route, start, end, bucket) from the query args; ValueError on bad dates."""
+    start, end = parse_range(request.args)
+    return (request.args.get('vehicle') or None, request.args.get('route') or None,
+            start, end, request.args.get('bucket') or None)
+
+def dashboard_context(data, vehicle, route, start=None, end=None, bucket=None):
+    stats = data.cube.summary(vehicle, route, start, end, bucket)
+    rev = stats['rev']
+    exp = stats['exp']
+    profit = stats['profit']
+    kms = stats['kms']
+
+    rev_m = round(rev / 1e6, 2)
+    exp_m = round(exp / 1e6, 2)
+    profit_m = round(profit / 1e6, 2)
+    kms_k = round(kms / 1e3, 1)
+    per_km = round(profit / kms, 2) if kms else 0
+    profit_pct = round((profit / rev) * 100, 1) if rev else 0
+
+    daily = stats['daily']
+    audited = stats['audited']
+    audit_pct = [round(a / b * 100, 1) if b else 0 for a, b in zip(audited, daily)]
+
+    return {
+        'summary': {
+            'total_trips': stats['total_trips'], 'ongoing': stats['ongoing'], 'closed': stats['closed'],
+            'flags': stats['flags'], 'resolved': stats['resolved'], 'rev_m': rev_m, 'exp_m': exp_m,
+            'profit_m': profit_m, 'kms_k': kms_k, 'per_km': per_km, 'profit_pct': profit_pct,
+        },
+        'daily': {'labels': stats['labels'], 'daily': daily, 'audited': audited, 'audit_pct': audit_pct},
+        'finance': {
+            'bar_labels': ['Revenue', 'Expense', 'Profit'],
+            'bar_values': [float(rev_m), float(exp_m), float(profit_m)],
+        },
+    }
+
+def cached_context(data, filters):
+    key = filters + (data.version,)
+    context = context_cache.get(key)
+    if context is None:
+        context = context_cache.set(key, dashboard_context(data, *filters))
+    return context
+
+def render_dashboard(data, vehicle, route, start=None, end=None, bucket=None):
+    context = cached_context(data, (vehicle, route, start, end, bucket))
+    return templates.render('dashboard',
+        vehicles=data.vehicles, routes=data.routes,
+        selected_vehicle=vehicle, selected_route=route,
+        selected_from=request.args.get('from', ''), selected_to=request.args.get('to', ''),
+        export_args={k: request.args[k] for k in ('vehicle', 'route', 'from', 'to') if request.args.get(k)},
+        **context['summary'], **context['daily'], **context['finance'])
+
+def api_context(part):
+    try:
+        filters = dashboard_filters()
+    except ValueError as exc:
+        return json_response({'error': str(exc)}, 400)
+    data = g.dataset
+    return json_response(cached_context(data, filters)[part])
+
+@app.route('/dashboard/ai-report')
+@login_required
+@conditional
+def ai_report_fragment():
+    try:
+        filters = dashboard_filters()
+    except ValueError as exc:
+        return str(exc), 400
+    return Response(ai_report(g.dataset, *filters[:4]), mimetype='text/plain')
+
+@app.route('/api/v1/summary')
+@login_required
+@conditional
+def api_summary():
+    return api_context('summary')
+
+@app.route('/api/v1/daily')
+@login_required
+@conditional
+def api_daily():
+    return api_context('daily')
+
+@app.route('/api/v1/finance')
+@login_required
+@conditional
+def api_finance():
+    return api_context('finance')
+
+def render_table(title, name, rows, columns):
+    """Render one page of ``rows`` (sorted/paged per the query args)."""
+    data = g.dataset
+    page = data.table.page(name, rows, columns, request.args)
+    table = data.df.take(page.rows)[columns].to_html(classes='text-white', index=False)
+
+    def link(**changes):
+        args = {'sort': page.sort, 'order': 'desc' if page.descending else None, 'page_size': page.page_size}
+        args.update(changes)
+        return url_for(request.endpoint, **{k: v for k, v in args.items() if v})
+
+    sort_links = [
+        (column + (' ↓' if page.descending else ' ↑') * (column == page.sort),
+         link(sort=column, order='desc' if column == page.sort and not page.descending else None),
+         column == page.sort)
+        for column in columns
+    ]
+    return templates.render('table_page', title=title, table=table, page=page,
+        sort_links=sort_links,
+        prev_url=link(cursor=page.prev_cursor) if page.prev_cursor else None,
+        next_url=link(cursor=page.next_cursor) if page.next_cursor else None)
+
+@app.route('/trip-generator')
+@conditional
+def trip_generator():
+    return render_table("Trip Generator", 'all', slice(None), ['Trip ID', 'Vehicle ID', 'Trip Status'])
+
+@app.route('/trip-closure')
+@conditional
+def trip_closure():
+    trips = g.dataset.trips
+    return render_table("Trip Closure", ONGOING, trips.with_status(ONGOING), ['Trip ID', 'Vehicle ID', 'Trip Status'])
+
+@app.route('/trip-auditor')
+@conditional
+def trip_auditor():
+    trips = g.dataset.trips
+    return render_table("Trip Auditor", UNDER_AUDIT, trips.with_status(UNDER_AUDIT), ['Trip ID', 'Vehicle ID', 'POD Status'])
+
+@app.route('/trip-ongoing')
+@conditional
+def trip_ongoing():
+    trips = g.dataset.trips
+    return render_table("Ongoing Trips", ONGOING, trips.with_status(ONGOING), ['Trip ID', 'Vehicle ID', 'Trip Status'])
+
+import json  # make sure you have this import at the top if not already present
+
+@app.route('/trip-stats')
+@conditional
+def trip_stats():
+    try:
+        start, end = parse_range(request.args)
+    except ValueError as exc:
+        return str(exc), 400
+    cube = g.dataset.cube
+    bucket = request.args.get('bucket')
+    labels, total = cube.daily(start=start, end=end, granularity=bucket)
+    ongoing = cube.daily(ONGOING, start=start, end=end, granularity=bucket)[1]
+    closed = cube.daily(CLOSED, start=start, end=end, granularity=bucket)[1]
+
+    # JSON serialize for safe embedding in JS
+    labels_json = json.dumps(labels)
+    total_json = json.dumps(total)
+    ongoing_json = json.dumps(ongoing)
+    closed_json = json.dumps(closed)
+
+    # Sum totals to display numeric counts
+    total_sum = sum(total)
+    ongoing_sum = sum(ongoing)
+    closed_sum = sum(closed)
+
+    return templates.render('trip_stats',
+        labels_data=labels_json, total_data=total_json, ongoing_data=ongoing_json, closed_data=closed_json,
+        selected_from=request.args.get('from', ''), selected_to=request.args.get('to', ''),
+        total_sum=total_sum, ongoing_sum=ongoing_sum, closed_sum=closed_sum)
+
+
+
+ROLLING_WINDOWS = (7, 30)
+
+@app.route('/financial-dashboard')
+@conditional
+def financial_dashboard():
+    # Financial stats come from the closure sheet's per-day series.
+    data = g.dataset
+    try:
+        start, end = parse_range(request.args)
+    except ValueError as exc:
+        return str(exc), 400
+    finance = data.finance
+    window = request.args.get('window', '')
+    rolling = request.args.get('rolling', type=int)
+    rolling = rolling if rolling in ROLLING_WINDOWS else None
+    if start is None and end is None:
+        if window == 'mtd':
+            start, end = finance.month_to_date()
+        elif window.isdigit() and int(window) > 0:
+            start, end = finance.last_days(int(window))
+
+    if start is None and end is None:
+        # Default view: the last 10 dates that have trips; totals over the whole sheet.
+        recent_days = finance.trip_days(10)
+        first, last = (int(recent_days[0]), int(recent_days[-1])) if len(recent_days) else (None, None)
+        bucket = 'day'
+    else:
+        first, last = data.closure_calendar.span(start, end)
+        bucket = 'day' if rolling else request.args.get('bucket')
+
+    series = {}
+    for name in ('revenue', 'expense'):
+        days, values = finance.window(name, first, last)
+        if rolling:
+            values = finance.rolling(name, rolling, first, last)
+        day_labels, series[name] = data.closure_calendar.series(days, values, first, last, bucket)
+    if start is None and end is None and len(day_labels):
+        keep = recent_days - first
+        day_labels = [day_labels[i] for i in keep]
+        series = {name: values[keep] for name, values in series.items()}
+
+    revenue_data = np.asarray(series['revenue']).astype(int).tolist()
+    expense_data = np.asarray(series['expense']).astype(int).tolist()
+    profit_data = [r - e for r, e in zip(revenue_data, expense_data)]
+
+    total_revenue = round(finance.total('revenue', start, end) / 1e6, 2)
+    total_profit = round(finance.total('profit', start, end) / 1e6, 2)
+    total_km = round(finance.total('km', start, end) / 1e3, 1)
+
+    return templates.render('financial_dashboard',
+        days=day_labels, revenue=revenue_data, expense=expense_data, profit=profit_data,
+        total_revenue=total_revenue, total_profit=total_profit, total_km=total_km,
+        selected_from=request.args.get('from', ''), selected_to=request.args.get('to', ''),
+        rolling=rolling, rolling_windows=ROLLING_WINDOWS)
+
+
+EXPORT_FORMATS = {
+    'csv': (iter_csv, 'text/csv'),
+    'xlsx': (iter_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+@app.route('/export.<fmt>')
+@login_required
+def export_trips(fmt):
+    if fmt not in EXPORT_FORMATS:
+        return 'Unsupported export format', 404
+    data = g.dataset
+    try:
+        rows = select_rows(data, request.args)
+    except ExportError as exc:
+        return str(exc), 400
+    writer, mimetype = EXPORT_FORMATS[fmt]
+    return Response(stream_with_context(writer(data.df, rows)), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename=trips.{fmt}'})
 
 @app.route('/logout')
 def logout():
     session.pop('user', None)
     return redirect(url_for('login'))
 
+@app.route('/metrics')
+def metrics():
+    # Schema errors include raw cell values from the sheets; same login as the dashboard.
+    if 'user' not in session:
+        return json_response({'error': 'login required'}, 401)
+    schema_errors = {name: errors.as_dict() for name, errors in g.dataset.schema_errors.items()}
+    return jsonify(dataset=datasets.metrics, dashboard_cache=dashboard_cache.stats(), schema_errors=schema_errors,
+                   passwords=passwords.stats(), sessions=app.session_interface.store.stats(),
+                   compression=compression.stats())
+
 @app.route('/download-summary')
+@login_required
+@conditional
 def download_summary():
-    filtered = df
-    report = generate_ai_report(filtered)
-    with open("AI_Report_Summary.txt", 'w', encoding='utf-8') as f:
-        f.write(report)
-    return send_file("AI_Report_Summary.txt", as_attachment=True)
+    # Served from the memoised report; nothing is written to disk, so parallel downloads cannot race.
+    try:
+        filters = dashboard_filters()
+    except ValueError as exc:
+        return str(exc), 400
+    report = ai_report(g.dataset, *filters[:4]).encode('utf-8')
+    return send_file(io.BytesIO(report), mimetype='text/plain', as_attachment=True,
+                     download_name='AI_Report_Summary.txt')
 if __name__ == "__main__":
     app.run(host='0.0.0.0', port=7860)
@@ -0,0 +1,69 @@
+"""AI report cost: row scans vs the dashboard cube vs the memoised report.
+
+For a replayed mix of dashboard filters, times building the report the way
+the app used to (``TripFilter`` row scans: counts, sums, a per-vehicle
+bincount and route counts over the selected rows), from the cube's
+per-cell aggregates (``generate_ai_report``), and through ``ai_report``
+where repeated filters hit the LRU. Also times a dashboard render, which no
+longer builds the report at all.
+
+Usage: ``python -m benchmarks.bench_ai_report [rows] [requests]``.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault('TRIP_RELOAD_INTERVAL', '0')
+
+import app  # noqa: E402
+from benchmarks.bench_dashboard_cache import request_mix  # noqa: E402
+from benchmarks.synth import install_dataset  # noqa: E402
+from benchmarks.legacy_scan import ScanFilter  # noqa: E402
+from trip_metrics import status_summary  # noqa: E402
+
+
+def scan_report(data, trips, vehicle=None, route=None):
+    rows = data.rows(vehicle, route)
+    return (trips.count(rows), trips.top_by_sum('Vehicle ID', 'Net Profit', rows),
+            trips.most_common('Route', rows, 2), trips.total('Freight Amount', rows),
+            trips.total('Total Trip Expense', rows), trips.total('Net Profit', rows),
+            trips.total('Actual Distance (KM)', rows), status_summary(trips.df, rows))
+
+
+def timed(fn, filters):
+    latencies = []
+    for vehicle, route in filters:
+        t0 = time.perf_counter()
+        fn(vehicle, route)
+        latencies.append(time.perf_counter() - t0)
+    return np.mean(latencies) * 1e3, np.percentile(latencies, 99) * 1e3
+
+
+def main(argv):
+    rows = int(argv[0]) if argv else 200_000
+    count = int(argv[1]) if len(argv) > 1 else 1_000
+    data = install_dataset(app, rows)
+    filters = [tuple(arg.split('=')[1] or None for arg in url.split('?')[1].split('&'))
+               for url in request_mix(data, count)]
+    print(f"rows={rows} requests={count} distinct={len(set(filters))}")
+
+    def render(vehicle, route):
+        with app.app.test_request_context():
+            app.render_dashboard(data, vehicle, route)
+
+    trips = ScanFilter(data.df)
+    app.ai_report_cache.clear()
+    app.context_cache.maxsize = 0
+    for label, fn in (('row scans', lambda v, r: scan_report(data, trips, v, r)),
+                      ('cube', lambda v, r: app.generate_ai_report(data, v, r)),
+                      ('memoised', lambda v, r: app.ai_report(data, v, r)),
+                      ('page', render)):
+        mean, p99 = timed(fn, filters)
+        print(f"{label:>10}: mean={mean:.3f}ms p99={p99:.3f}ms", flush=True)
+    print(f"report cache: {app.ai_report_cache.stats()}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
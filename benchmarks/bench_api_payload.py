@@ -0,0 +1,44 @@
+"""Bytes and server time per filter change: full dashboard page vs JSON API.
+
+Usage: ``python -m benchmarks.bench_api_payload [rows] [repeat]``.
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault('TRIP_RELOAD_INTERVAL', '0')
+
+import app  # noqa: E402
+from benchmarks.synth import install_dataset, logged_in_client  # noqa: E402
+
+API = ('/api/v1/summary', '/api/v1/daily', '/api/v1/finance')
+
+
+def fetch(client, urls, repeat):
+    size, best = 0, float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        size = sum(len(client.get(url).data) for url in urls)
+        best = min(best, time.perf_counter() - t0)
+    return size, best
+
+
+def main(argv):
+    rows = int(argv[0]) if argv else 200_000
+    repeat = int(argv[1]) if len(argv) > 1 else 20
+    dataset = install_dataset(app, rows)
+    app.dashboard_cache.maxsize = app.context_cache.maxsize = 0  # measure the compute, not the caches
+    client = logged_in_client(app)
+
+    print(f"rows={rows}")
+    print(f"{'filter':>14} {'page bytes':>11} {'page ms':>8} {'api bytes':>10} {'api ms':>7}")
+    for vehicle in ('', dataset.vehicles[0]):
+        query = f"?vehicle={vehicle}&route="
+        page_size, page_time = fetch(client, ['/dashboard' + query], repeat)
+        api_size, api_time = fetch(client, [url + query for url in API], repeat)
+        print(f"{vehicle or 'all':>14} {page_size:>11} {page_time * 1e3:>8.2f} {api_size:>10} {api_time * 1e3:>7.2f}")
+    print("(page bytes exclude the Tailwind and Chart.js downloads a full reload also repeats)")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,62 @@
+"""Response compression throughput at levels 1, 6 and 9.
+
+Wraps the app's Flask ``wsgi_app`` in a fresh ``CompressionMiddleware`` per
+level and requests each route ``repeat`` times through werkzeug's test
+client: the dashboard (from the page cache), a 500-row ``to_html`` trip
+table, the daily API and the streamed CSV export of one vehicle. ``identity`` sends no
+Accept-Encoding; ``gzip-N``/``br-N`` compress every response (compressed
+cache off), and ``cached`` is gzip at the app's level with the cache on, as
+repeat hits on an unchanged page get it. Reports responses per second, bytes
+on the wire and the time those bytes take over a 10 Mbit/s link.
+
+Usage: ``python -m benchmarks.bench_compression [repeat] [rows]``.
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault('TRIP_RELOAD_INTERVAL', '0')
+
+from werkzeug.test import Client  # noqa: E402
+
+import app  # noqa: E402
+import compression  # noqa: E402
+from benchmarks.synth import install_dataset, logged_in_client  # noqa: E402
+
+ROUTES = ['/dashboard', '/trip-generator?page_size=500', '/api/v1/daily', '/export.csv?vehicle=VH001']
+LINK = 10e6 / 8  # bytes/s
+
+
+def measure(client, path, encoding, cookie, repeat):
+    client.set_cookie('session', cookie)
+    headers = {'Accept-Encoding': encoding}
+    size = len(client.get(path, headers=headers).data)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        client.get(path, headers=headers).data
+    return repeat / (time.perf_counter() - started), size
+
+
+def main(argv):
+    repeat = int(argv[0]) if argv else 50
+    rows = int(argv[1]) if len(argv) > 1 else 20_000
+    install_dataset(app, rows)
+    cookie = logged_in_client(app).get_cookie('session').value
+    inner = app.compression.app
+    modes = [('identity', 'identity', 0, 0)]
+    modes += [(f"{name}-{level}", name, level, 0) for name in compression.ENCODERS for level in (1, 6, 9)]
+    modes.append(('cached', 'gzip', compression.COMPRESS_LEVEL, 256))
+    print(f"repeat={repeat} rows={rows} encodings={list(compression.ENCODERS)}")
+    print(f"{'route':>30} {'mode':>9} {'req/s':>8} {'bytes':>9} {'ratio':>6} {'wire@10M':>9}")
+    for path in ROUTES:
+        baseline = None
+        for label, encoding, level, cache_size in modes:
+            middleware = compression.CompressionMiddleware(inner, level=level or 6, cache_size=cache_size)
+            rate, size = measure(Client(middleware), path, encoding, cookie, repeat)
+            baseline = baseline or size
+            print(f"{path:>30} {label:>9} {rate:>8.0f} {size:>9} {size / baseline:>6.2f} "
+                  f"{size / LINK * 1e3:>7.1f}ms", flush=True)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
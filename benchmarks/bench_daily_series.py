@@ -0,0 +1,56 @@
+"""Financial window queries and reload cost: per-row scan vs the daily series.
+
+Compares a month-to-date total over the raw closure rows with the same
+total from ``DailySeries``, and a full rebuild of the series with extending
+it by a 1% append (what a reload does when rows are only added).
+
+Usage: ``python -m benchmarks.bench_daily_series [rows ...]``.
+"""
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synth import make_trips
+from trip_calendar import Calendar
+from trip_daily import DailySeries
+from trip_dataset import prepare_frame
+
+
+def best_of(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def scan_total(frame, start, end):
+    days = Calendar(frame['Trip Date']).day
+    inside = (days >= start) & (days <= end)
+    return np.nansum(frame['Freight Amount'].to_numpy(dtype=float)[inside])
+
+
+def main(argv):
+    sizes = [int(a) for a in argv] or (100_000, 1_000_000)
+    print(f"{'rows':>8} {'scan mtd':>10} {'series mtd':>11} {'rolling 30':>11} {'rebuild':>9} {'append 1%':>10}")
+    for rows in sizes:
+        frame = prepare_frame(make_trips(rows))
+        old = frame.iloc[:rows - rows // 100]
+        series = DailySeries.from_frame(old)
+        full = DailySeries.from_frame(frame)
+        start, end = full.month_to_date()
+        assert np.isclose(scan_total(frame, start, end), full.total('revenue', start, end))
+
+        scan = best_of(lambda: scan_total(frame, start, end))
+        query = best_of(lambda: full.total('revenue', start, end), repeat=50)
+        rolling = best_of(lambda: full.rolling('revenue', 30, start, end), repeat=50)
+        rebuild = best_of(lambda: DailySeries.from_frame(frame), repeat=3)
+        append = best_of(lambda: series.follow(old, frame), repeat=3)
+        print(f"{rows:>8} {scan * 1e3:>8.1f}ms {query * 1e6:>9.1f}us {rolling * 1e6:>9.1f}us "
+              f"{rebuild * 1e3:>7.1f}ms {append * 1e3:>8.1f}ms")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,59 @@
+"""Dashboard compute time: per-request pandas scans vs the aggregate cube.
+
+Usage: ``python -m benchmarks.bench_dashboard [rows]`` (default 1,000,000).
+"""
+import sys
+import time
+
+from benchmarks.synth import make_trips
+from trip_calendar import Calendar
+from trip_cube import TripCube
+from trip_dataset import prepare_frame
+
+
+def legacy_dashboard(df, vehicle, route):
+    """The pre-cube ``/dashboard`` computation (``df`` carries the old ``Day`` column)."""
+    filtered = df.copy()
+    if vehicle:
+        filtered = filtered[filtered['Vehicle ID'] == vehicle]
+    if route:
+        filtered = filtered[filtered['Route'] == route]
+    for status in ('Pending Closure', 'Completed', 'Under Audit'):
+        filtered[filtered['Trip Status'] == status].shape[0]
+    filtered[(filtered['Trip Status'] == 'Under Audit') & (filtered['POD Status'] == 'Yes')].shape[0]
+    for column in ('Freight Amount', 'Total Trip Expense', 'Net Profit', 'Actual Distance (KM)'):
+        filtered[column].sum()
+    filtered.groupby('Day')['Trip ID'].count().reindex(range(1, 32), fill_value=0).tolist()
+    filtered[filtered['Trip Status'] == 'Under Audit'].groupby('Day')['Trip ID'].count().reindex(range(1, 32), fill_value=0).tolist()
+
+
+def timed(fn, *args, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv):
+    rows = int(argv[0]) if argv else 1_000_000
+    df = prepare_frame(make_trips(rows))
+    t0 = time.perf_counter()
+    cube = TripCube(df, Calendar(df['Trip Date']))
+    build = time.perf_counter() - t0
+    print(f"rows={rows} cube cells={cube.size} build={build:.3f}s")
+
+    route = df['Route'].iloc[0]
+    filters = [(None, None), ('VH007', None), (None, route), ('VH007', route)]
+    print(f"{'vehicle':>8} {'route':>22} {'legacy':>10} {'cube':>10} {'speedup':>8}")
+    # The day-of-month column the app used to add to every frame at load.
+    legacy = df.assign(Day=df['Trip Date'].dt.day)
+    for vehicle, route in filters:
+        old = timed(legacy_dashboard, legacy, vehicle, route)
+        new = timed(cube.summary, vehicle, route)
+        print(f"{vehicle or '-':>8} {route or '-':>22} {old * 1e3:>8.2f}ms {new * 1e3:>8.3f}ms {old / new:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,54 @@
+"""p50/p99 ``/dashboard`` latency for a replayed request mix, cache off vs on.
+
+Usage: ``python -m benchmarks.bench_dashboard_cache [rows] [requests]``.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault('TRIP_RELOAD_INTERVAL', '0')
+
+import app  # noqa: E402
+from benchmarks.synth import install_dataset, logged_in_client  # noqa: E402
+
+
+def request_mix(dataset, count, seed=0):
+    """Zipf-skewed vehicle/route selections, like owners re-opening favourites."""
+    rng = np.random.default_rng(seed)
+    vehicles = [''] + list(dataset.vehicles[:30])
+    routes = [''] + list(dataset.routes[:5])
+    ranks = np.minimum(rng.zipf(1.3, size=(count, 2)), [len(vehicles), len(routes)]) - 1
+    return [f"/dashboard?vehicle={vehicles[v]}&route={routes[r]}" for v, r in ranks]
+
+
+def replay(client, urls):
+    latencies = []
+    for url in urls:
+        t0 = time.perf_counter()
+        client.get(url)
+        latencies.append(time.perf_counter() - t0)
+    return np.percentile(latencies, [50, 99]) * 1e3
+
+
+def main(argv):
+    rows = int(argv[0]) if argv else 200_000
+    count = int(argv[1]) if len(argv) > 1 else 2_000
+    dataset = install_dataset(app, rows)
+    urls = request_mix(dataset, count)
+    client = logged_in_client(app)
+
+    print(f"rows={rows} requests={count} distinct={len(set(urls))}")
+    for label, maxsize in (('no cache', 0), ('lru 256', 256)):
+        app.dashboard_cache.clear()
+        app.context_cache.clear()
+        app.dashboard_cache.maxsize = app.context_cache.maxsize = maxsize
+        app.dashboard_cache.hits = app.dashboard_cache.misses = app.dashboard_cache.evictions = 0
+        p50, p99 = replay(client, urls)
+        stats = app.dashboard_cache.stats()
+        print(f"{label:>9}: p50={p50:.2f}ms p99={p99:.2f}ms hits={stats['hits']} misses={stats['misses']}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
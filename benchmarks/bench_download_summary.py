@@ -0,0 +1,94 @@
+"""100 parallel ``/download-summary`` requests: shared file on disk vs in memory.
+
+Serves the app with the threaded werkzeug server and fires ``downloads``
+concurrent downloads spread over several vehicle filters. ``disk`` is the
+old handler, registered here under another URL: it writes the report to
+``AI_Report_Summary.txt`` in the working directory (a temporary one) and
+``send_file``s it, so downloads overwrite each other's file. ``memory`` is
+the app's ``/download-summary``, served from the memoised report. Reports
+wall time, p50/p99 latency and how many responses did not match the report
+for their own filter (another filter's report, or a body cut short because
+the file changed size under ``send_file``).
+
+Usage: ``python -m benchmarks.bench_download_summary [downloads] [rows]``.
+"""
+import http.client
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+import numpy as np
+
+os.environ.setdefault('TRIP_RELOAD_INTERVAL', '0')
+
+import app  # noqa: E402
+from benchmarks.synth import install_dataset, logged_in_client  # noqa: E402
+
+
+@app.app.route('/bench-disk-summary')
+def disk_summary():
+    vehicle = app.request.args.get('vehicle') or None
+    report = app.generate_ai_report(app.g.dataset, vehicle)
+    with open("AI_Report_Summary.txt", 'w', encoding='utf-8') as f:
+        f.write(report)
+    return app.send_file(os.path.abspath("AI_Report_Summary.txt"), as_attachment=True, etag=False)
+
+
+def run(base, path, vehicles, downloads, cookie, expected):
+    results = [None] * downloads
+
+    def download(i):
+        vehicle = vehicles[i % len(vehicles)]
+        request = urllib.request.Request(f"{base}{path}?{urllib.parse.urlencode({'vehicle': vehicle})}",
+                                         headers={'Cookie': f"session={cookie}"})
+        t0 = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                body = response.read().decode('utf-8')
+        except (http.client.HTTPException, UnicodeDecodeError):
+            body = None
+        results[i] = (time.perf_counter() - t0, body != expected[vehicle])
+
+    threads = [threading.Thread(target=download, args=(i,)) for i in range(downloads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    latencies = [r[0] for r in results]
+    return elapsed, np.percentile(latencies, [50, 99]) * 1e3, sum(r[1] for r in results)
+
+
+def main(argv):
+    from werkzeug.serving import make_server
+
+    downloads = int(argv[0]) if argv else 100
+    rows = int(argv[1]) if len(argv) > 1 else 200_000
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    data = install_dataset(app, rows)
+    vehicles = list(data.vehicles[:10])
+    expected = {v: app.generate_ai_report(data, v) for v in vehicles}
+    cookie = logged_in_client(app).get_cookie('session').value
+    server = make_server('127.0.0.1', 0, app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    os.chdir(tempfile.mkdtemp(prefix='summary-bench-'))
+    print(f"downloads={downloads} rows={rows} filters={len(vehicles)}")
+    for label, path in (('disk', '/bench-disk-summary'), ('memory', '/download-summary')):
+        for name in os.listdir('.'):
+            os.remove(name)
+        elapsed, (p50, p99), wrong = run(base, path, vehicles, downloads, cookie, expected)
+        print(f"{label:>7}: wall={elapsed * 1e3:.0f}ms p50={p50:.1f}ms p99={p99:.1f}ms "
+              f"wrong={wrong}/{downloads} files written={os.listdir('.')}", flush=True)
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
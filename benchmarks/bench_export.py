@@ -0,0 +1,43 @@
+"""Export throughput and peak RSS for /export.csv and /export.xlsx.
+
+Each format runs in its own process so the peak RSS numbers are separate.
+Usage: ``python -m benchmarks.bench_export [rows]`` (default 1,000,000).
+"""
+import os
+import resource
+import subprocess
+import sys
+import time
+
+os.environ.setdefault('TRIP_RELOAD_INTERVAL', '0')
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_one(fmt, rows):
+    import app
+    from benchmarks.synth import install_dataset, logged_in_client
+
+    install_dataset(app, rows)
+    client = logged_in_client(app)
+    before = peak_rss_mb()
+    t0 = time.perf_counter()
+    response = client.get(f'/export.{fmt}', buffered=False)
+    size = sum(len(chunk) for chunk in response.response)
+    elapsed = time.perf_counter() - t0
+    print(f"{fmt:>5} rows={rows} bytes={size} time={elapsed:.1f}s "
+          f"peak RSS before={before:.0f}MB after={peak_rss_mb():.0f}MB")
+
+
+def main(argv):
+    if argv and argv[0] == '--one':
+        return run_one(argv[1], int(argv[2]))
+    rows = argv[0] if argv else '1000000'
+    for fmt in ('csv', 'xlsx'):
+        subprocess.run([sys.executable, '-m', 'benchmarks.bench_export', '--one', fmt, rows], check=True)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
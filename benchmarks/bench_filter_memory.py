@@ -0,0 +1,67 @@
+"""Peak allocation per dashboard request: copy + chained masks vs row scans.
+
+The row-scan side is ``benchmarks.legacy_scan`` over a ``TripFilter`` row
+selection, as the AI report worked before it moved to the cube.
+
+Usage: ``python -m benchmarks.bench_filter_memory [rows]`` (default 300,000).
+"""
+import sys
+import tracemalloc
+
+from benchmarks.synth import make_trips
+from benchmarks.legacy_scan import ScanFilter
+from trip_dataset import prepare_frame
+from trip_metrics import status_summary
+
+
+def legacy_request(df, vehicle, route):
+    """Filtering + AI report numbers as the dashboard did them before."""
+    filtered = df.copy()
+    if vehicle:
+        filtered = filtered[filtered['Vehicle ID'] == vehicle]
+    if route:
+        filtered = filtered[filtered['Route'] == route]
+    if not filtered.empty:
+        filtered.groupby('Vehicle ID')['Net Profit'].sum().idxmax()
+        filtered['Route'].value_counts().head(2)
+        for column in ('Freight Amount', 'Total Trip Expense', 'Net Profit', 'Actual Distance (KM)'):
+            filtered[column].sum()
+        filtered[filtered['Trip Status'] == 'Pending Closure'].shape[0]
+        filtered[filtered['Trip Status'] == 'Completed'].shape[0]
+
+
+def filter_request(trips, vehicle, route):
+    rows = trips.rows(vehicle, route)
+    if trips.count(rows):
+        trips.top_by_sum('Vehicle ID', 'Net Profit', rows)
+        trips.most_common('Route', rows, 2)
+        for column in ('Freight Amount', 'Total Trip Expense', 'Net Profit', 'Actual Distance (KM)'):
+            trips.total(column, rows)
+        status_summary(trips.df, rows)
+
+
+def peak(fn, *args):
+    tracemalloc.start()
+    fn(*args)
+    _, top = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return top
+
+
+def main(argv):
+    rows = int(argv[0]) if argv else 300_000
+    df = prepare_frame(make_trips(rows))
+    trips = ScanFilter(df)
+    filter_request(trips, None, None)  # warm the per-version column caches
+
+    route = df['Route'].iloc[0]
+    print(f"rows={rows}")
+    print(f"{'vehicle':>8} {'route':>22} {'legacy peak':>12} {'filter peak':>12}")
+    for vehicle, route in [(None, None), ('VH007', None), (None, route), ('VH007', route)]:
+        old = peak(legacy_request, df, vehicle, route)
+        new = peak(filter_request, trips, vehicle, route)
+        print(f"{vehicle or '-':>8} {route or '-':>22} {old / 2**20:>10.1f}MB {new / 2**20:>10.2f}MB")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,136 @@
+"""First paint over a throttled link: render-blocking bytes and time per page.
+
+Serves the app with the threaded werkzeug server behind a local proxy that
+emulates a slow depot link: one shared downstream bandwidth, a round trip
+per new connection and one-way latency on every chunk (profiles below match
+the browser dev-tools presets). A minimal "browser" fetches a page, then
+fetches the stylesheets and scripts in its ``<head>`` (which block the first
+paint) six at a time, and reports when the last of them arrived.
+
+``cold`` has an empty cache; ``gzip``/``br`` also send Accept-Encoding;
+``warm`` is a later visit: assets under ``/assets/<name>.<hash>`` are
+``immutable`` and are not requested again. Blocking resources on other hosts
+(e.g. Chart.js before ``python -m static_assets build --fetch``) cannot be
+fetched from here and are listed instead of timed.
+
+Usage: ``python -m benchmarks.bench_first_paint [path ...]``.
+"""
+import concurrent.futures
+import logging
+import os
+import re
+import socket
+import sys
+import threading
+import time
+import urllib.parse
+
+os.environ.setdefault('TRIP_RELOAD_INTERVAL', '0')
+
+import app  # noqa: E402
+from benchmarks.synth import logged_in_client  # noqa: E402
+
+PROFILES = {'fast-3g': (1.6e6 / 8, 0.150), 'slow-3g': (0.4e6 / 8, 0.400)}  # bytes/s, RTT
+ENCODINGS = {'cold': 'identity', 'gzip': 'gzip', 'br': 'br, gzip', 'warm': 'br, gzip'}
+
+
+class Link:
+    """A proxy on ``port`` to ``upstream``: shared downstream bandwidth plus latency."""
+
+    def __init__(self, upstream, rate, rtt):
+        self.upstream, self.rate, self.rtt = upstream, rate, rtt
+        self.free_at = 0.0
+        self.lock = threading.Lock()
+        self.sock = socket.create_server(('127.0.0.1', 0))
+        self.port = self.sock.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            client, _ = self.sock.accept()
+            threading.Thread(target=self._handle, args=(client,), daemon=True).start()
+
+    def _handle(self, client):
+        time.sleep(self.rtt)  # TCP handshake
+        server = socket.create_connection(self.upstream)
+        threading.Thread(target=self._pipe, args=(client, server, False), daemon=True).start()
+        self._pipe(server, client, True)
+
+    def _pipe(self, source, target, downstream):
+        try:
+            while True:
+                chunk = source.recv(16384)
+                if not chunk:
+                    break
+                arrival = time.monotonic() + self.rtt / 2
+                if downstream:
+                    with self.lock:
+                        start = max(arrival, self.free_at)
+                        self.free_at = start + len(chunk) / self.rate
+                        arrival = self.free_at
+                time.sleep(max(0.0, arrival - time.monotonic()))
+                target.sendall(chunk)
+        except OSError:
+            pass
+        finally:
+            for s in (source, target):
+                try:
+                    s.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+
+def fetch(port, path, cookie, encoding):
+    with socket.create_connection(('127.0.0.1', port)) as sock:
+        sock.sendall(f"GET {path} HTTP/1.0\r\nHost: localhost\r\nCookie: session={cookie}\r\n"
+                     f"Accept-Encoding: {encoding}\r\n\r\n".encode())
+        data = b''
+        while chunk := sock.recv(65536):
+            data += chunk
+    return data.partition(b'\r\n\r\n')[2], len(data)
+
+
+def blocking_resources(html):
+    head = html.split(b'</head>', 1)[0].decode('utf-8', 'replace')
+    urls = re.findall(r'<link rel="stylesheet" href="([^"]+)"', head)
+    urls += re.findall(r'<script src="([^"]+)"></script>', head)
+    return urls
+
+
+def first_paint(port, path, cookie, mode):
+    encoding = ENCODINGS[mode]
+    started = time.perf_counter()
+    html, total = fetch(port, path, cookie, encoding)
+    local, external = [], []
+    for url in blocking_resources(html):
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.netloc:
+            external.append(parsed.netloc)
+        elif not (mode == 'warm' and re.search(r'\.[0-9a-f]{12}\.\w+$', parsed.path)):
+            local.append(url)
+    with concurrent.futures.ThreadPoolExecutor(6) as pool:
+        total += sum(size for _, size in pool.map(lambda u: fetch(port, u, cookie, encoding), local))
+    return time.perf_counter() - started, total, len(local), external
+
+
+def main(argv):
+    from werkzeug.serving import make_server
+
+    paths = argv or ['/login', '/dashboard', '/trip-generator']
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    cookie = logged_in_client(app).get_cookie('session').value
+    server = make_server('127.0.0.1', 0, app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"{'profile':>8} {'page':>16} {'mode':>5} {'first paint':>12} {'bytes':>8} {'requests':>9}  external")
+    for profile, (rate, rtt) in PROFILES.items():
+        link = Link(('127.0.0.1', server.server_port), rate, rtt)
+        for path in paths:
+            for mode in ENCODINGS:
+                elapsed, size, count, external = first_paint(link.port, path, cookie, mode)
+                print(f"{profile:>8} {path:>16} {mode:>5} {elapsed * 1e3:>10.0f}ms {size:>8} {count + 1:>9}  "
+                      f"{' '.join(external) or '-'}", flush=True)
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,124 @@
+"""Dashboard latency during a burst of logins: inline hashing vs ``PasswordPool``.
+
+Serves the app with the threaded werkzeug server and polls ``/dashboard``
+from one client thread, first on its own and then while ``logins``
+concurrent ``POST /login`` requests arrive at once (a shift change). Each
+mode runs in a fresh process: ``inline`` hashes on the request threads like
+the app used to (``PASSWORD_WORKERS=0 PASSWORD_QUEUE=0``), ``pool`` uses the
+default bounded pool and ``pool-q`` the same pool with a queue long enough
+for the whole burst. Reports dashboard p50/p99 before and during the burst
+and how the logins were answered (302 signed in, 429 rejected).
+
+Usage: ``python -m benchmarks.bench_login_burst [logins] [rows]``.
+"""
+import collections
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import numpy as np
+
+MODES = {
+    'inline': {'PASSWORD_WORKERS': '0', 'PASSWORD_QUEUE': '0'},
+    'pool': {},
+    'pool-q': {'PASSWORD_QUEUE': 'LOGINS'},
+}
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def fetch(opener, url, data=None):
+    t0 = time.perf_counter()
+    try:
+        status = opener.open(url, data=data, timeout=120).status
+    except urllib.error.HTTPError as exc:
+        status = exc.code
+    return status, time.perf_counter() - t0
+
+
+def poll(opener, url, stop):
+    latencies = []
+    while not stop.is_set():
+        latencies.append(fetch(opener, url)[1])
+    return latencies
+
+
+def measure(mode, logins, rows):
+    from werkzeug.security import generate_password_hash
+    from werkzeug.serving import make_server
+
+    import app
+    from benchmarks.synth import install_dataset, logged_in_client
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    install_dataset(app, rows)
+    app.users.add('Bench', 'bench@example.com', generate_password_hash('secret'))
+    server = make_server('127.0.0.1', 0, app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    cookie = logged_in_client(app).get_cookie('session').value
+    opener = urllib.request.build_opener(NoRedirect)
+    opener.addheaders = [('Cookie', f"session={cookie}")]
+    dashboard = base + '/dashboard'
+    fetch(opener, dashboard)
+
+    stop = threading.Event()
+    timer = threading.Timer(2.0, stop.set)
+    timer.start()
+    idle = poll(opener, dashboard, stop)
+
+    statuses = collections.Counter()
+    body = urllib.parse.urlencode({'email': 'bench@example.com', 'password': 'secret'}).encode()
+
+    def login():
+        statuses[fetch(urllib.request.build_opener(NoRedirect), base + '/login', body)[0]] += 1
+
+    stop.clear()
+    burst = []
+    prober = threading.Thread(target=lambda: burst.extend(poll(opener, dashboard, stop)))
+    clients = [threading.Thread(target=login) for _ in range(logins)]
+    started = time.perf_counter()
+    prober.start()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    prober.join()
+    server.shutdown()
+
+    (p50, p99), (b50, b99) = (np.percentile(x, [50, 99]) * 1e3 for x in (idle, burst))
+    answered = ' '.join(f"{code}x{n}" for code, n in sorted(statuses.items()))
+    print(f"{mode:>7} {p50:>8.1f}ms {p99:>8.1f}ms {b50:>9.1f}ms {b99:>9.1f}ms {elapsed:>7.1f}s  {answered}",
+          flush=True)
+
+
+def main(argv):
+    if argv and argv[0] == '--measure':
+        return measure(argv[1], int(argv[2]), int(argv[3]))
+    logins = int(argv[0]) if argv else 200
+    rows = int(argv[1]) if len(argv) > 1 else 20_000
+    print(f"logins={logins} rows={rows} cpus={os.cpu_count()}")
+    print(f"{'mode':>7} {'idle p50':>10} {'idle p99':>10} {'burst p50':>11} {'burst p99':>11} {'burst':>8}  logins")
+    for mode, env in MODES.items():
+        with tempfile.TemporaryDirectory() as workdir:
+            env = {name: value.replace('LOGINS', str(logins)) for name, value in env.items()}
+            env = dict(os.environ, TRIP_RELOAD_INTERVAL='0', USER_DB=os.path.join(workdir, 'users.db'), **env)
+            subprocess.run([sys.executable, '-m', 'benchmarks.bench_login_burst', '--measure', mode,
+                            str(logins), str(rows)], env=env, check=True)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,48 @@
+"""Memory of the trip frames as read vs after the compact schema.
+
+Scales each sample workbook to N rows, then compares ``memory_usage(deep=True)``
+of the frame as ``pd.read_excel`` returns it with the same frame after
+``prepare_frame`` (which applies ``trip_schema.normalize``), per column
+kind and in total.
+
+Usage: ``python -m benchmarks.bench_schema_memory [rows]``.
+"""
+import os
+import sys
+import time
+
+from benchmarks.synth import ROOT, make_trips
+from trip_dataset import prepare_frame
+from trip_schema import SCHEMA, ErrorLog
+
+SAMPLES = ('fleet_50_entries.xlsx', 'Trip_Closure_Sheet_Oct2024_Mar2025.xlsx')
+
+
+def by_kind(frame):
+    usage = frame.memory_usage(deep=True, index=False)
+    totals = {}
+    for name, size in usage.items():
+        kind = SCHEMA.get(name, 'derived')
+        totals[kind] = totals.get(kind, 0) + size
+    return totals
+
+
+def main(argv):
+    rows = int(argv[0]) if argv else 1_000_000
+    mb = 2 ** 20
+    for sample in SAMPLES:
+        raw = make_trips(rows, sample=os.path.join(ROOT, sample))
+        before = by_kind(raw)
+        started = time.perf_counter()
+        errors = ErrorLog()
+        prepared = prepare_frame(raw.copy(), errors)
+        elapsed = time.perf_counter() - started
+        after = by_kind(prepared)
+        print(f"{sample} x {rows} rows (normalised in {elapsed:.2f}s, {errors.count} schema errors)")
+        for kind in sorted(set(before) | set(after)):
+            print(f"  {kind:>9}: {before.get(kind, 0) / mb:>8.1f}MB -> {after.get(kind, 0) / mb:>8.1f}MB")
+        print(f"  {'total':>9}: {sum(before.values()) / mb:>8.1f}MB -> {sum(after.values()) / mb:>8.1f}MB")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,161 @@
+"""Load test of ``/dashboard``: development server vs the production servers.
+
+Starts each server as a subprocess on the bundled workbooks, with a fresh
+user and session database. Each run signs up one user and logs in, then
+``clients`` threads keep their own keep-alive connection busy for
+``seconds``. They cycle through the unfiltered dashboard and ten vehicle
+filters, with ``Accept-Encoding: gzip`` as a browser sends. Reports boot
+time (until ``/login`` answers), requests per second, p50/p99 latency,
+failed requests and the RSS of the whole server process tree (pages the
+workers share after a preloading fork are counted once per process).
+
+* ``dev``: ``flask run``, which ``start.sh`` and the Dockerfiles used to run;
+* ``waitress``: ``python wsgi.py`` (``WEB_THREADS`` threads, one process);
+* ``gunicorn``: ``gunicorn -c server_config.py wsgi:application``
+  (``WEB_WORKERS`` preloaded processes x ``WEB_THREADS``).
+
+Servers that are not installed are skipped. The load generator runs on the
+same machine, so on few cores it competes with the server for CPU.
+
+Usage: ``python -m benchmarks.bench_serving [seconds] [clients] [server ...]``.
+"""
+import http.client
+import importlib.util
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synth import ROOT
+
+SERVERS = {
+    'dev': [sys.executable, '-m', 'flask', '--app', 'app', 'run', '--host', '127.0.0.1', '--port', '{port}'],
+    'waitress': [sys.executable, 'wsgi.py'],
+    'gunicorn': [sys.executable, '-m', 'gunicorn', '-c', 'server_config.py', 'wsgi:application'],
+}
+REQUIRES = {'waitress': 'waitress', 'gunicorn': 'gunicorn'}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def request(conn, method, path, body=None, headers=None):
+    conn.request(method, path, body, headers or {})
+    response = conn.getresponse()
+    response.read()
+    return response
+
+
+def wait_ready(port, timeout=120):
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            request(http.client.HTTPConnection('127.0.0.1', port, timeout=5), 'GET', '/login')
+            return time.perf_counter() - started
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def login(port):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    form = {'Content-Type': 'application/x-www-form-urlencoded'}
+    credentials = {'email': 'load@test', 'password': 'load-test'}
+    request(conn, 'POST', '/signup', urllib.parse.urlencode({'fullname': 'Load', **credentials}), form)
+    response = request(conn, 'POST', '/login', urllib.parse.urlencode(credentials), form)
+    return response.getheader('Set-Cookie').split(';', 1)[0]
+
+
+def rss_kb(pid):
+    """RSS of ``pid`` and its descendants."""
+    children = subprocess.run(['pgrep', '-P', str(pid)], capture_output=True, text=True).stdout.split()
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            own = next(int(line.split()[1]) for line in f if line.startswith('VmRSS'))
+    except (OSError, StopIteration):
+        own = 0
+    return own + sum(rss_kb(int(child)) for child in children)
+
+
+def load(port, cookie, paths, clients, seconds):
+    latencies = [[] for _ in range(clients)]
+    failures = [0] * clients
+    deadline = time.perf_counter() + seconds
+
+    def client(i):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        headers = {'Cookie': cookie, 'Accept-Encoding': 'gzip'}
+        n = i
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            try:
+                ok = request(conn, 'GET', paths[n % len(paths)], headers=headers).status == 200
+            except (OSError, http.client.HTTPException):
+                ok = False
+                conn.close()
+            if ok:
+                latencies[i].append(time.perf_counter() - t0)
+            else:
+                failures[i] += 1
+            n += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done = np.concatenate([np.array(l) for l in latencies]) if any(latencies) else np.zeros(1)
+    return len(done) / elapsed, np.percentile(done, [50, 99]) * 1e3, sum(failures)
+
+
+def run(name, seconds, clients, paths):
+    port = free_port()
+    scratch = tempfile.mkdtemp(prefix='serving-bench-')
+    env = dict(os.environ, WEB_BIND=f'127.0.0.1:{port}', USER_DB=os.path.join(scratch, 'users.db'),
+               SESSION_DB=os.path.join(scratch, 'sessions.db'))
+    command = [part.format(port=port) for part in SERVERS[name]]
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        boot = wait_ready(port)
+        cookie = login(port)
+        rate, (p50, p99), failed = load(port, cookie, paths, clients, seconds)
+        rss = rss_kb(server.pid)
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(scratch, ignore_errors=True)
+    print(f"{name:>9} {boot:>6.1f}s {rate:>8.0f} {p50:>8.1f}ms {p99:>8.1f}ms {failed:>7} {rss / 1024:>8.0f}MB",
+          flush=True)
+
+
+def main(argv):
+    seconds = float(argv[0]) if argv else 10
+    clients = int(argv[1]) if len(argv) > 1 else 16
+    names = argv[2:] or list(SERVERS)
+    vehicles = pd.read_excel(os.path.join(ROOT, 'fleet_50_entries.xlsx'))['Vehicle ID'].dropna().unique()[:10]
+    paths = ['/dashboard'] + [f"/dashboard?{urllib.parse.urlencode({'vehicle': v})}" for v in vehicles]
+    print(f"seconds={seconds} clients={clients} cpus={os.cpu_count()} "
+          f"WEB_WORKERS={os.environ.get('WEB_WORKERS', 'default')} WEB_THREADS={os.environ.get('WEB_THREADS', 'default')}")
+    print(f"{'server':>9} {'boot':>7} {'req/s':>8} {'p50':>10} {'p99':>10} {'failed':>7} {'rss':>10}")
+    for name in names:
+        if name in REQUIRES and importlib.util.find_spec(REQUIRES[name]) is None:
+            print(f"{name:>9}  not installed")
+            continue
+        run(name, seconds, clients, paths)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
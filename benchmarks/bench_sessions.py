@@ -0,0 +1,88 @@
+"""Per-request session overhead: signed-cookie session vs server-side stores.
+
+A bare Flask app with one route that checks ``'user' in session`` is hit
+``requests`` times by a test client that has signed in once. ``cookie`` is
+Flask's default session holding the whole user record (with its password
+hash, as login used to store it); ``memory`` and ``sqlite`` are
+``ServerSessionInterface`` over ``MemorySessionStore`` and
+``SQLiteSessionStore`` holding only name, email and role. Reports the
+cookie size sent with every request, mean time per request and the time
+spent in ``open_session`` (the part that differs between the modes).
+
+Usage: ``python -m benchmarks.bench_sessions [requests] [live sessions]``.
+"""
+import os
+import secrets
+import sys
+import tempfile
+import time
+
+from flask import Flask, session
+from werkzeug.security import generate_password_hash
+
+from session_store import MemorySessionStore, ServerSessionInterface, SQLiteSessionStore
+
+USER = {'name': 'Bench User', 'email': 'bench@example.com', 'role': 'Owner'}
+
+
+def make_app(interface):
+    app = Flask(__name__)
+    app.secret_key = 'bench'
+    if interface is not None:
+        app.session_interface = interface
+
+    @app.route('/login')
+    def login():
+        session['user'] = dict(USER, password=generate_password_hash('secret')) if interface is None else USER
+        return 'ok'
+
+    @app.route('/page')
+    def page():
+        return 'yes' if 'user' in session else 'no'
+
+    return app
+
+
+def timed_open(interface):
+    calls = []
+    original = interface.open_session
+
+    def open_session(app, request):
+        t0 = time.perf_counter()
+        result = original(app, request)
+        calls.append(time.perf_counter() - t0)
+        return result
+    interface.open_session = open_session
+    return calls
+
+
+def run(label, interface, requests, live):
+    app = make_app(interface)
+    store = getattr(interface, 'store', None)
+    for _ in range(live if store is not None else 0):
+        store.set(secrets.token_urlsafe(32), USER)  # other users' sessions
+    client = app.test_client()
+    client.get('/login')
+    cookie = client.get_cookie('session').value
+    calls = timed_open(app.session_interface)
+    started = time.perf_counter()
+    for _ in range(requests):
+        assert client.get('/page').data == b'yes'
+    per_request = (time.perf_counter() - started) / requests * 1e6
+    per_open = sum(calls) / len(calls) * 1e6
+    print(f"{label:>7} {len(cookie):>7}B {per_request:>10.1f}us {per_open:>10.1f}us", flush=True)
+
+
+def main(argv):
+    requests = int(argv[0]) if argv else 5_000
+    live = int(argv[1]) if len(argv) > 1 else 10_000
+    workdir = tempfile.mkdtemp(prefix='session-bench-')
+    print(f"requests={requests} live sessions={live}")
+    print(f"{'mode':>7} {'cookie':>8} {'request':>12} {'open':>12}")
+    run('cookie', None, requests, live)
+    run('memory', ServerSessionInterface(MemorySessionStore(maxsize=live * 2)), requests, live)
+    run('sqlite', ServerSessionInterface(SQLiteSessionStore(os.path.join(workdir, 'sessions.db'))), requests, live)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,86 @@
+"""Per-worker memory and boot time with private vs shared (mmap) trip data.
+
+Starts N independent worker processes (like gunicorn without ``--preload``)
+that each build a ``DatasetManager`` over the same synthetic workbooks, once
+with every worker holding its own frames and once with
+``TRIP_SHARED_DATASET``-style shared columns. Reports mean boot time and
+mean RSS / PSS / private memory per worker; PSS splits shared pages between
+the processes mapping them, so N x PSS is the real footprint. The shared
+column files are removed before each run, so the shared boot includes the
+one-off publish by whichever worker gets there first.
+
+Linux only (reads ``/proc/self/smaps_rollup``).
+Usage: ``python -m benchmarks.bench_shared_workers [rows] [workers ...]``.
+"""
+import glob
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks.synth import make_trips, write_workbook
+
+
+def memory_kb():
+    fields = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return fields['Rss'], fields['Pss'], fields['Private_Clean'] + fields['Private_Dirty']
+
+
+def worker(fleet, closure, shared, ready, done, results):
+    started = time.perf_counter()
+    from trip_dataset import DatasetManager
+    DatasetManager(fleet, closure, interval=0, shared=shared)
+    boot = time.perf_counter() - started
+    ready.wait()  # every worker is up before memory is read, so PSS sees all sharers
+    results.put((boot,) + memory_kb())
+    done.wait()
+
+
+def run(fleet, closure, shared, workers):
+    for path in glob.glob(os.path.join(os.environ['TRIP_CACHE_DIR'], '*.cols*')):
+        shutil.rmtree(path, ignore_errors=True) if os.path.isdir(path) else os.remove(path)
+    ctx = multiprocessing.get_context('spawn')
+    ready, done, results = ctx.Barrier(workers + 1), ctx.Barrier(workers + 1), ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(fleet, closure, shared, ready, done, results))
+             for _ in range(workers)]
+    for p in procs:
+        p.start()
+    ready.wait()
+    samples = [results.get() for _ in procs]
+    done.wait()
+    for p in procs:
+        p.join()
+    return [sum(column) / len(samples) for column in zip(*samples)]
+
+
+def main(argv):
+    rows = int(argv[0]) if argv else 100_000
+    counts = [int(a) for a in argv[1:]] or (1, 4, 16)
+    workdir = os.path.join(tempfile.gettempdir(), f'trip-bench-{rows}')
+    os.makedirs(workdir, exist_ok=True)
+    os.environ['TRIP_CACHE_DIR'] = os.path.join(workdir, 'cache')
+    fleet, closure = (os.path.join(workdir, name) for name in ('fleet.xlsx', 'closure.xlsx'))
+    for seed, path in enumerate((fleet, closure)):
+        if not os.path.exists(path):
+            print(f"writing {path} ({rows} rows)...", flush=True)
+            write_workbook(make_trips(rows, seed=seed), path)
+    run(fleet, closure, False, 1)  # warm the .npz workbook cache
+
+    print(f"rows={rows}")
+    print(f"{'mode':>8} {'workers':>7} {'boot':>8} {'RSS/worker':>11} {'PSS/worker':>11} {'private':>9} {'total PSS':>10}")
+    for workers in counts:
+        for label, shared in (('private', False), ('shared', True)):
+            boot, rss, pss, private = run(fleet, closure, shared, workers)
+            print(f"{label:>8} {workers:>7} {boot:>7.2f}s {rss / 1024:>9.1f}MB {pss / 1024:>9.1f}MB "
+                  f"{private / 1024:>7.1f}MB {pss * workers / 1024:>8.1f}MB", flush=True)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
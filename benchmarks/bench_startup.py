@@ -0,0 +1,51 @@
+"""Cold vs warm startup cost of loading a trip workbook.
+
+Cold = openpyxl parse plus writing the columnar cache; warm = reload from
+the cache. Usage: ``python -m benchmarks.bench_startup [rows ...]``.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+import trip_cache
+from benchmarks.synth import make_trips, write_workbook
+
+DEFAULT_SIZES = (300, 30_000, 300_000)
+
+
+def measure(rows, workdir):
+    path = write_workbook(make_trips(rows), os.path.join(workdir, f'trips_{rows}.xlsx'))
+    shutil.rmtree(trip_cache.cache_dir_for(path), ignore_errors=True)
+
+    t0 = time.perf_counter()
+    pd.read_excel(path)
+    plain = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    trip_cache.load_workbook(path)
+    cold = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    trip_cache.load_workbook(path)
+    warm = time.perf_counter() - t0
+    return plain, cold, warm
+
+
+def main(argv):
+    sizes = [int(a) for a in argv] or DEFAULT_SIZES
+    workdir = tempfile.mkdtemp(prefix='trip-bench-')
+    try:
+        print(f"{'rows':>9} {'read_excel':>11} {'cold':>9} {'warm':>9} {'speedup':>8}")
+        for rows in sizes:
+            plain, cold, warm = measure(rows, workdir)
+            print(f"{rows:>9} {plain:>10.3f}s {cold:>8.3f}s {warm:>8.3f}s {plain / warm:>7.1f}x")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
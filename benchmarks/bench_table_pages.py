@@ -0,0 +1,40 @@
+"""Trip table page latency as the fleet grows: full to_html vs one page.
+
+Usage: ``python -m benchmarks.bench_table_pages [rows ...]``.
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault('TRIP_RELOAD_INTERVAL', '0')
+
+import app  # noqa: E402
+from benchmarks.synth import install_dataset, logged_in_client  # noqa: E402
+
+COLUMNS = ['Trip ID', 'Vehicle ID', 'Trip Status']
+
+
+def best_of(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv):
+    sizes = [int(a) for a in argv] or (10_000, 100_000, 500_000)
+    print(f"{'rows':>8} {'full to_html':>13} {'page 1':>9} {'page 50 sorted':>15}")
+    for rows in sizes:
+        dataset = install_dataset(app, rows)
+        client = logged_in_client(app)
+        full = best_of(lambda: dataset.df[COLUMNS].to_html(classes='text-white', index=False), repeat=1)
+        client.get('/trip-generator?sort=Vehicle+ID')  # first hit builds the sorted row cache
+        first = best_of(lambda: client.get('/trip-generator'))
+        sorted_page = best_of(lambda: client.get('/trip-generator?sort=Vehicle+ID&page=50'))
+        print(f"{rows:>8} {full * 1e3:>11.1f}ms {first * 1e3:>7.2f}ms {sorted_page * 1e3:>13.2f}ms")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
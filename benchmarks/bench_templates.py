@@ -0,0 +1,91 @@
+"""Render cost per route: ``render_template_string`` vs the compiled registry.
+
+Requests each page once through the test client while recording the context
+every ``templates.render`` call receives, then replays those contexts
+``repeat`` times per route three ways: ``render_template_string`` on the
+source (what the routes used to do, compiling on every call), the compiled
+template from ``TemplateRegistry`` and, for the login/signup forms, the
+stored shell. Also times building a registry cold, and with a warm
+``FileSystemBytecodeCache`` as a new worker would.
+
+Usage: ``python -m benchmarks.bench_templates [repeat]``.
+"""
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('TRIP_RELOAD_INTERVAL', '0')
+
+from flask import render_template_string  # noqa: E402
+
+import app  # noqa: E402
+from benchmarks.synth import logged_in_client  # noqa: E402
+from template_registry import TemplateRegistry  # noqa: E402
+
+ROUTES = {
+    'login': '/login',
+    'signup': '/signup',
+    'dashboard': '/dashboard',
+    'table_page': '/trip-generator',
+    'trip_stats': '/trip-stats',
+    'financial_dashboard': '/financial-dashboard',
+}
+
+
+def record_contexts(client):
+    contexts = {}
+    render = app.templates.render
+
+    def recording(name, **context):
+        contexts[name] = dict(context)
+        return render(name, **context)
+    app.templates.render = recording
+    try:
+        for path in ROUTES.values():
+            client.get(path)
+    finally:
+        app.templates.render = render
+    return contexts
+
+
+def per_call_us(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def registry_ms(cache_dir):
+    flask_app = type(app.app)('bench')
+    started = time.perf_counter()
+    TemplateRegistry(flask_app, app.TEMPLATES, cache_dir=cache_dir)
+    return (time.perf_counter() - started) * 1e3
+
+
+def main(argv):
+    repeat = int(argv[0]) if argv else 200
+    app.dashboard_cache.maxsize = 0
+    contexts = record_contexts(logged_in_client(app))
+    contexts.setdefault('login', {})
+    contexts.setdefault('signup', {})
+    print(f"repeat={repeat}")
+    print(f"{'template':>20} {'string':>10} {'compiled':>10} {'shell':>10}")
+    with app.app.test_request_context():
+        for name in ROUTES:
+            context = contexts[name]
+            source = app.TEMPLATES[name]
+            string = per_call_us(lambda: render_template_string(source, **context), repeat)
+            compiled = per_call_us(lambda: app.templates.render(name, **context), repeat)
+            shell = f"{per_call_us(lambda: app.templates.shell(name), repeat):>8.1f}us" if not context else '-'
+            print(f"{name:>20} {string:>8.1f}us {compiled:>8.1f}us {shell:>10}", flush=True)
+
+    cache_dir = tempfile.mkdtemp(prefix='template-bench-')
+    cold = registry_ms(None)
+    registry_ms(cache_dir)
+    warm = registry_ms(cache_dir)
+    print(f"registry startup: compile={cold:.1f}ms bytecode cache={warm:.1f}ms")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
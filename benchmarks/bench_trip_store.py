@@ -0,0 +1,84 @@
+"""Peak memory of the dashboard cube: in-memory frame vs memory-mapped store.
+
+Writes an N-row synthetic closure history into a ``TripStore`` chunk by
+chunk, then in a fresh process per mode builds the dashboard cube either
+from the whole history loaded as a pandas frame or directly over the
+store's mapped columns, and reports build time, peak RSS and the RSS split
+into anonymous (private heap) and file-backed pages. File-backed pages are
+the mapped store, which the OS can drop and re-read under memory pressure.
+The overall revenue is printed so the two modes can be checked against each
+other. Linux only (reads ``/proc/self/smaps_rollup``).
+
+Usage: ``python -m benchmarks.bench_trip_store [rows] [chunk_rows]``.
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synth import make_trips
+
+
+def store_dir(rows):
+    return os.path.join(tempfile.gettempdir(), f'trip-store-{rows}')
+
+
+def write_store(rows, chunk_rows):
+    from trip_dataset import prepare_frame
+    from trip_store import StoreWriter
+
+    with StoreWriter(store_dir(rows)) as writer:
+        for seed, start in enumerate(range(0, rows, chunk_rows)):
+            chunk = make_trips(min(chunk_rows, rows - start), seed=seed)
+            chunk['Trip ID'] = [f"T{i:09d}" for i in range(start, start + len(chunk))]
+            writer.append(prepare_frame(chunk))
+
+
+def rss_split_mb():
+    fields = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return fields['Anonymous'] / 1024, (fields['Rss'] - fields['Anonymous']) / 1024
+
+
+def measure(mode, rows):
+    from trip_calendar import Calendar
+    from trip_cube import TripCube
+    from trip_store import TripStore
+
+    started = time.perf_counter()
+    frame = TripStore(store_dir(rows)).frame()
+    if mode == 'pandas':
+        # What a worker holds without the store: every column materialised, text as objects.
+        frame = frame.astype({c: object for c in frame.columns if frame[c].dtype == 'category'}).copy()
+    cube = TripCube(frame, Calendar(frame['Trip Date']))
+    elapsed = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    anon, mapped = rss_split_mb()
+    print(f"{mode:>7} {elapsed:>8.2f}s {peak:>9.1f}MB {anon:>8.1f}MB {mapped:>9.1f}MB  "
+          f"cells={cube.size} revenue={cube.summary()['rev']:.2f}")
+
+
+def main(argv):
+    if argv and argv[0] == '--measure':
+        return measure(argv[1], int(argv[2]))
+    rows = int(argv[0]) if argv else 2_000_000
+    chunk_rows = int(argv[1]) if len(argv) > 1 else 250_000
+    if not os.path.isdir(store_dir(rows)):
+        print(f"writing {store_dir(rows)} ...", flush=True)
+        write_store(rows, chunk_rows)
+    size = sum(e.stat().st_size for e in os.scandir(store_dir(rows)))
+    print(f"rows={rows} store={size / 2 ** 20:.1f}MB on disk")
+    print(f"{'mode':>7} {'build':>9} {'peak RSS':>11} {'anon':>10} {'file':>11}")
+    for mode in ('pandas', 'mmap'):
+        subprocess.run([sys.executable, '-m', 'benchmarks.bench_trip_store', '--measure', mode, str(rows)],
+                       check=True)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,92 @@
+"""Login lookup and signup cost: in-memory list / JSON file vs ``UserStore``.
+
+For N registered users, times the old ``next(u for u in users ...)`` login
+scan against a ``UserStore.get`` probe, and the old signup (append + rewrite
+the whole JSON file) against ``UserStore.add``. Then runs concurrent signups
+from several threads against both and counts the accounts that survive: the
+JSON rewrite loses accounts whenever two signups interleave, and a signup
+that reads a half-written file fails outright. Passwords are a fixed
+pre-computed hash so only storage is measured.
+
+Usage: ``python -m benchmarks.bench_user_store [users ...]``.
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from user_store import UserStore
+
+HASH = 'scrypt:32768:8:1$salt$' + '0' * 128
+
+
+def per_op_us(fn, n):
+    started = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - started) / n * 1e6
+
+
+def json_signup(path, users, i):
+    users.append({'name': f'New {i}', 'email': f'new{i}@example.com', 'password': HASH, 'role': 'Owner'})
+    with open(path, 'w') as f:
+        json.dump(users, f)
+
+
+def race(threads, per_thread, signup):
+    failed = []
+
+    def run(t):
+        for i in range(per_thread):
+            try:
+                signup(t * per_thread + i)
+            except ValueError:
+                failed.append(i)
+    workers = [threading.Thread(target=run, args=(t,)) for t in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return len(failed)
+
+
+def main(argv):
+    counts = [int(a) for a in argv] or (1_000, 10_000, 100_000)
+    workdir = tempfile.mkdtemp(prefix='user-bench-')
+    print(f"{'users':>8} {'list login':>11} {'db login':>10} {'json signup':>12} {'db signup':>10}")
+    for n in counts:
+        users = [{'name': f'User {i}', 'email': f'user{i}@example.com', 'password': HASH, 'role': 'Owner'}
+                 for i in range(n)]
+        store = UserStore(os.path.join(workdir, f'users-{n}.db'))
+        store.import_users(users)
+        probes = [f'user{(i * 7919) % n}@example.com' for i in range(200)]
+        scan = per_op_us(lambda i: next((u for u in users if u['email'] == probes[i]), None), len(probes))
+        probe = per_op_us(lambda i: store.get(probes[i]), len(probes))
+        path = os.path.join(workdir, f'users-{n}.json')
+        rewrite = per_op_us(lambda i: json_signup(path, users, i), 20)
+        insert = per_op_us(lambda i: store.add(f'New {i}', f'new{i}@example.com', HASH), 20)
+        print(f"{n:>8} {scan:>9.1f}us {probe:>8.1f}us {rewrite / 1000:>10.2f}ms {insert / 1000:>8.2f}ms",
+              flush=True)
+
+    threads, per_thread = 8, 25
+    path = os.path.join(workdir, 'race.json')
+    with open(path, 'w') as f:
+        json.dump([], f)
+
+    def file_signup(i):
+        with open(path) as f:
+            users = json.load(f)
+        json_signup(path, users, i)
+    json_failed = race(threads, per_thread, file_signup)
+    with open(path) as f:
+        kept = len(json.load(f))
+    store = UserStore(os.path.join(workdir, 'race.db'))
+    db_failed = race(threads, per_thread, lambda i: store.add(f'New {i}', f'new{i}@example.com', HASH))
+    print(f"concurrent signups={threads * per_thread}: json kept {kept} ({json_failed} failed), "
+          f"sqlite kept {len(store)} ({db_failed} failed)")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,48 @@
+"""Row-scan metrics the AI report used before it moved to the cube.
+
+Kept as the baseline ``bench_ai_report`` and ``bench_filter_memory`` compare
+against: ``ScanFilter`` adds NumPy column views and count/sum/top-N over a
+``TripFilter`` row selection.
+"""
+import numpy as np
+
+from trip_filter import ALL_ROWS, TripFilter
+
+class ScanFilter(TripFilter):
+    def __init__(self, df):
+        super().__init__(df)
+        self._columns = {}
+        self.route_counts = np.array([len(p) for p in self.route_rows.values()], dtype=np.int64)
+
+    def column(self, name):
+        """Float view of a numeric column (cached)."""
+        if name not in self._columns:
+            self._columns[name] = self.df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+        return self._columns[name]
+
+    def count(self, rows):
+        return self.size if rows is ALL_ROWS else len(rows)
+
+    def total(self, name, rows):
+        return np.nansum(self.column(name)[rows])
+
+    def top_by_sum(self, name, weights, rows):
+        """Label of ``name`` with the largest summed ``weights`` (groupby-idxmax)."""
+        codes, labels = self.codes(name)
+        codes = codes[rows]
+        keep = codes >= 0
+        sums = np.bincount(codes[keep], weights=np.nan_to_num(self.column(weights)[rows][keep]),
+                           minlength=len(labels))
+        return labels[int(np.argmax(sums))]
+
+    def most_common(self, name, rows, n):
+        """Up to ``n`` most frequent labels of ``name`` (value_counts().head)."""
+        codes, labels = self.codes(name)
+        if rows is ALL_ROWS and name == 'Route':
+            counts = self.route_counts
+        else:
+            codes = codes[rows]
+            counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+        order = np.argsort(-counts, kind='stable')
+        return [labels[i] for i in order[:n] if counts[i]]
+
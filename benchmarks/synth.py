@@ -0,0 +1,55 @@
+"""Synthetic trip sheets scaled up from the bundled sample workbook.
+
+Run benchmarks from the repository root, e.g.
+``python -m benchmarks.bench_startup``.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE = os.path.join(ROOT, 'Trip_Closure_Sheet_Oct2024_Mar2025.xlsx')
+
+
+def make_trips(rows, seed=0, sample=SAMPLE):
+    """Return ``rows`` trips resampled from the sample sheet.
+
+    Trip IDs are made unique and trip dates are spread across the sample's
+    Oct 2024 - Mar 2025 window so day/month groupings stay realistic.
+    """
+    base = pd.read_excel(sample)
+    rng = np.random.default_rng(seed)
+    frame = base.iloc[rng.integers(0, len(base), rows)].reset_index(drop=True)
+    frame['Trip ID'] = [f"T{i:07d}" for i in range(rows)]
+    start = pd.Timestamp('2024-10-01')
+    offsets = pd.to_timedelta(rng.integers(0, 182, rows), unit='D')
+    frame['Trip Date'] = start + offsets
+    frame['Actual Delivery Date'] = frame['Trip Date'] + pd.to_timedelta(rng.integers(1, 6, rows), unit='D')
+    frame['Vehicle ID'] = [f"VH{v:03d}" for v in rng.integers(1, 201, rows)]
+    return frame
+
+
+def write_workbook(frame, path):
+    frame.to_excel(path, index=False)
+    return path
+
+
+def install_dataset(app_module, rows, seed=0):
+    """Swap a synthetic ``rows``-trip snapshot into an imported app module.
+
+    Set ``TRIP_RELOAD_INTERVAL=0`` before importing the app so the watcher
+    does not swap the sample workbooks back in.
+    """
+    from trip_dataset import prepare_frame
+
+    df = prepare_frame(make_trips(rows, seed=seed))
+    closure_df = prepare_frame(make_trips(rows, seed=seed + 1))
+    return app_module.datasets.install(df, closure_df)
+
+
+def logged_in_client(app_module):
+    client = app_module.app.test_client()
+    with client.session_transaction() as sess:
+        sess['user'] = {'name': 'Bench', 'email': 'bench@example.com', 'role': 'Owner'}
+    return client
@@ -0,0 +1,209 @@
+"""Gzip/brotli compression of response bodies, as WSGI middleware.
+
+The trip tables (``DataFrame.to_html``), dashboards and JSON APIs are very
+repetitive text that neither the development server nor waitress compresses.
+``CompressionMiddleware`` wraps ``app.wsgi_app`` and, for a client whose
+``Accept-Encoding`` allows it, compresses 200 responses of a text-like type:
+
+* bodies known to be smaller than ``min_size`` are sent as they are;
+* bodies with a ``Content-Length`` up to ``buffer_limit`` are compressed in
+  one go, and the compressed bytes are kept in an LRU keyed by a digest of
+  the body, so repeated hits on a cached page (the dashboard cache, the
+  memoised AI report) hash it instead of compressing it again;
+* streamed bodies (the CSV export, large pages) are compressed chunk by chunk
+  as the app yields them and are never held in memory whole.
+
+Responses that already carry a ``Content-Encoding`` (the precompressed static
+assets) or ``Cache-Control: no-transform`` are passed through. Compressed
+responses get ``Vary: Accept-Encoding`` and their ETag suffixed with the
+encoding (``"abc-gzip"``); the suffix is stripped from ``If-None-Match``
+before the app sees it, so conditional GETs still end in 304.
+
+Brotli (preferred when the client accepts both) uses the same level number
+as gzip.
+"""
+import hashlib
+import os
+import re
+import threading
+import zlib
+from itertools import chain
+
+import brotli
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header
+from werkzeug.wsgi import ClosingIterator
+
+from response_cache import LRUCache
+
+COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', '6'))
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', '1024'))
+COMPRESS_CACHE_SIZE = int(os.environ.get('COMPRESS_CACHE_SIZE', '256'))
+COMPRESS_BUFFER_LIMIT = 4 << 20
+COMPRESSIBLE = ('text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml')
+
+
+class _Gzip:
+    def __init__(self, level):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)
+        self.compress, self.flush = self._z.compress, self._z.flush
+
+
+class _Brotli:
+    def __init__(self, level):
+        self._b = brotli.Compressor(quality=level)
+        self.compress, self.flush = self._b.process, self._b.finish
+
+
+ENCODERS = {'br': _Brotli, 'gzip': _Gzip}
+
+
+def compress(data, encoding, level):
+    encoder = ENCODERS[encoding](level)
+    return encoder.compress(data) + encoder.flush()
+
+
+class CompressionMiddleware:
+    """Compress ``app``'s responses for clients that accept gzip or brotli."""
+
+    def __init__(self, app, level=COMPRESS_LEVEL, min_size=COMPRESS_MIN_SIZE,
+                 cache_size=COMPRESS_CACHE_SIZE, buffer_limit=COMPRESS_BUFFER_LIMIT):
+        self.app = app
+        self.level = level
+        self.min_size = min_size
+        self.buffer_limit = buffer_limit
+        self.cache = LRUCache(maxsize=cache_size)
+        self.compressed = self.streamed = self.bytes_in = self.bytes_out = 0
+        self._lock = threading.Lock()
+
+    def negotiate(self, environ):
+        if environ.get('REQUEST_METHOD') == 'HEAD':
+            return None
+        accept = parse_accept_header(environ.get('HTTP_ACCEPT_ENCODING'))
+        encoding = max(ENCODERS, key=lambda name: accept[name])
+        return encoding if accept[encoding] else None
+
+    def eligible(self, status, headers):
+        if not status.startswith('200') or 'Content-Encoding' in headers:
+            return False
+        if 'no-transform' in headers.get('Cache-Control', ''):
+            return False
+        length = headers.get('Content-Length', type=int)
+        if length is not None and length < self.min_size:
+            return False
+        return headers.get('Content-Type', '').startswith(COMPRESSIBLE)
+
+    def __call__(self, environ, start_response):
+        encoding = self.negotiate(environ)
+        if encoding is None:
+            return self.app(environ, start_response)
+        suffix = f'-{encoding}"'
+        if_none_match = environ.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            environ['HTTP_IF_NONE_MATCH'] = if_none_match.replace(suffix, '"')
+
+        started = []
+        written = []
+
+        def capture(status, headers, exc_info=None):
+            started[:] = [status, headers, exc_info]
+            return written.append
+
+        app_iter = self.app(environ, capture)
+        status, header_list, exc_info = started
+        headers = Headers(header_list)
+        if status.startswith('304') and if_none_match and suffix in if_none_match and 'ETag' in headers:
+            headers['ETag'] = re.sub(r'"$', suffix, headers['ETag'])
+            start_response(status, headers.to_wsgi_list(), exc_info)
+            return _chain(written, app_iter)
+        if not self.eligible(status, headers):
+            start_response(status, header_list, exc_info)
+            return _chain(written, app_iter)
+
+        length = headers.get('Content-Length', type=int)
+        if length is not None and length <= self.buffer_limit:
+            try:
+                body = b''.join(chain(written, app_iter))
+            finally:
+                _close(app_iter)
+            data = self._compressed(body, encoding)
+            _encode_headers(headers, encoding, suffix)
+            headers['Content-Length'] = str(len(data))
+            start_response(status, headers.to_wsgi_list(), exc_info)
+            return [data]
+
+        # Unknown or large length: read up to min_size to rule out tiny bodies, then stream.
+        rest = iter(app_iter)
+        head = list(written)
+        for chunk in rest:
+            head.append(chunk)
+            if sum(map(len, head)) >= self.min_size:
+                break
+        else:
+            start_response(status, header_list, exc_info)
+            return _chain(head, app_iter, rest)
+        headers.remove('Content-Length')
+        _encode_headers(headers, encoding, suffix)
+        start_response(status, headers.to_wsgi_list(), exc_info)
+        return self._stream(chain(head, rest), app_iter, encoding)
+
+    def _compressed(self, body, encoding):
+        key = (encoding, self.level, hashlib.blake2b(body, digest_size=16).digest())
+        data = self.cache.get(key)
+        if data is None:
+            data = self.cache.set(key, compress(body, encoding, self.level))
+        with self._lock:
+            self.compressed += 1
+            self.bytes_in += len(body)
+            self.bytes_out += len(data)
+        return data
+
+    def _stream(self, chunks, app_iter, encoding):
+        encoder = ENCODERS[encoding](self.level)
+        size_in = size_out = 0
+        try:
+            for chunk in chunks:
+                size_in += len(chunk)
+                data = encoder.compress(chunk)
+                if data:
+                    size_out += len(data)
+                    yield data
+            data = encoder.flush()
+            size_out += len(data)
+            yield data
+        finally:
+            _close(app_iter)
+            with self._lock:
+                self.streamed += 1
+                self.bytes_in += size_in
+                self.bytes_out += size_out
+
+    def stats(self):
+        return {
+            'level': self.level,
+            'encodings': list(ENCODERS),
+            'compressed': self.compressed,
+            'streamed': self.streamed,
+            'ratio': round(self.bytes_out / self.bytes_in, 3) if self.bytes_in else None,
+            'cache': self.cache.stats(),
+        }
+
+
+def _encode_headers(headers, encoding, suffix):
+    headers['Content-Encoding'] = encoding
+    vary = headers.get('Vary')
+    headers['Vary'] = f"{vary}, Accept-Encoding" if vary else 'Accept-Encoding'
+    if 'ETag' in headers:
+        headers['ETag'] = re.sub(r'"$', suffix, headers['ETag'])
+
+
+def _close(app_iter):
+    if hasattr(app_iter, 'close'):
+        app_iter.close()
+
+
+def _chain(head, app_iter, rest=None):
+    """The already-read ``head`` chunks, then ``rest`` (default ``app_iter``), closing ``app_iter``."""
+    if not head and rest is None:
+        return app_iter
+    return ClosingIterator(chain(head, app_iter if rest is None else rest), getattr(app_iter, 'close', None))
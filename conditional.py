@@ -0,0 +1,70 @@
+"""Conditional GET (ETag / Last-Modified) for pages built from the trip data.
+
+A page's ETag is derived from the dataset snapshot, the request path and
+query args, the user's role and the app's ``BUILD_TAG`` (a digest of the
+templates and static assets, so a deploy that changes them invalidates the
+pages browsers hold). Last-Modified is never older than the process start.
+When the browser already holds that version the view is not run at all and a
+bare 304 goes back. Only 200 responses carry validators, and views that need a
+login check it in a decorator above this one, so anonymous requests never see
+an ETag or a 304.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import current_app, g, make_response, request, session
+
+STARTED = time.time()
+
+
+def dataset_tag(data):
+    """Identity of a dataset snapshot that is stable across worker processes."""
+    return data.tag
+
+
+def last_modified(data):
+    if data.signature is None:
+        stamp = data.loaded_at
+    else:
+        stamp = max(mtime_ns for mtime_ns, _ in data.signature) / 1e9
+    stamp = max(stamp, STARTED)
+    return datetime.fromtimestamp(int(stamp), tz=timezone.utc)
+
+
+def page_etag(data):
+    role = (session.get('user') or {}).get('role', '')
+    args = sorted(request.args.items(multi=True))
+    raw = repr((dataset_tag(data), current_app.config.get('BUILD_TAG', ''), request.path, args, role))
+    return hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+
+def build_tag(*digests):
+    """One tag for the deployed templates/assets, from their digests."""
+    return hashlib.sha1(repr(digests).encode()).hexdigest()[:16]
+
+
+def not_modified(etag, modified):
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    return request.if_modified_since is not None and request.if_modified_since >= modified
+
+
+def conditional(view):
+    """Answer repeat requests for an unchanged page with 304 Not Modified."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        data = g.dataset
+        etag, modified = page_etag(data), last_modified(data)
+        if not_modified(etag, modified):
+            response = make_response('', 304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response  # errors and redirects are not the page the validators describe
+        response.set_etag(etag)
+        response.last_modified = modified
+        response.cache_control.no_cache = True
+        return response
+    return wrapper
@@ -54,17 +54,23 @@ def dashboard():
     vehicle = request.args.get('vehicle')
     route = request.args.get('route')
 
-    filtered = df.copy()
+    # Compose the filters into one mask so only the matching rows are selected
+    # (no full-frame copy, no intermediate frame per filter).
+    mask = None
     if vehicle:
-        filtered = filtered[filtered['Vehicle ID'] == vehicle]
+        mask = df['Vehicle ID'] == vehicle
     if route:
-        filtered = filtered[filtered['Route'] == route]
+        route_mask = df['Route'] == route
+        mask = route_mask if mask is None else mask & route_mask
+    filtered = df if mask is None else df[mask]
 
+    status = filtered['Trip Status']
+    under_audit = status == 'Under Audit'
     total_trips = len(filtered)
-    ongoing = filtered[filtered['Trip Status'] == 'Pending Closure'].shape[0]
-    closed = filtered[filtered['Trip Status'] == 'Completed'].shape[0]
-    flags = filtered[filtered['Trip Status'] == 'Under Audit'].shape[0]
-    resolved = filtered[(filtered['Trip Status'] == 'Under Audit') & (filtered['POD Status'] == 'Yes')].shape[0]
+    ongoing = int((status == 'Pending Closure').sum())
+    closed = int((status == 'Completed').sum())
+    flags = int(under_audit.sum())
+    resolved = int((under_audit & (filtered['POD Status'] == 'Yes')).sum())
 
     rev = filtered['Freight Amount'].sum()
     exp = filtered['Total Trip Expense'].sum()
@@ -79,7 +85,7 @@ def dashboard():
     profit_pct = round((profit / rev) * 100, 1) if rev else 0
 
     daily = filtered.groupby('Day')['Trip ID'].count().reindex(range(1, 32), fill_value=0).tolist()
-    audited = filtered[filtered['Trip Status'] == 'Under Audit'].groupby('Day')['Trip ID'].count().reindex(range(1, 32), fill_value=0).tolist()
+    audited = filtered['Day'][under_audit].value_counts().reindex(range(1, 32), fill_value=0).tolist()
     audit_pct = [round(a / b * 100, 1) if b else 0 for a, b in zip(audited, daily)]
 
     bar_labels = ['Revenue', 'Expense', 'Profit']
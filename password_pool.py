@@ -0,0 +1,91 @@
+"""Password hashing off the request threads, with a bounded queue.
+
+werkzeug's scrypt/pbkdf2 hashes are slow on purpose (tens of milliseconds of
+CPU each), so a burst of logins hashed on the request threads starves every
+other request the worker is serving. ``PasswordPool`` hands hashing to a
+small process pool instead: at most ``workers`` hashes use the CPU at once,
+and at most ``max_pending`` may be queued or running. Beyond that ``PoolBusy``
+is raised straight away, so the route can answer 429 rather than piling up
+threads behind the pool.
+
+Workers are forked lazily on first use in each process, so a pool created
+before gunicorn forks its workers is rebuilt inside each of them (spawned
+workers would re-import the app module and load the trip data again).
+``workers=0`` hashes on the calling thread and ``max_pending=0`` removes the
+cap, which together is the old inline behaviour.
+"""
+import concurrent.futures
+import multiprocessing
+import os
+import threading
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+PASSWORD_WORKERS = int(os.environ.get('PASSWORD_WORKERS', min(2, os.cpu_count() or 1)))
+PASSWORD_QUEUE = int(os.environ.get('PASSWORD_QUEUE', '16'))
+
+
+class PoolBusy(RuntimeError):
+    """Raised when ``max_pending`` hashes are already queued or running."""
+
+
+class PasswordPool:
+    """Bounded pool for ``generate_password_hash`` / ``check_password_hash``."""
+
+    def __init__(self, workers=PASSWORD_WORKERS, max_pending=PASSWORD_QUEUE):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def _pool(self):
+        if self._pid != os.getpid():
+            if 'fork' in multiprocessing.get_all_start_methods():
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context('fork'))
+            else:  # Windows: hashlib releases the GIL, so threads still hash in parallel.
+                self._executor = concurrent.futures.ThreadPoolExecutor(self.workers, thread_name_prefix='password')
+            self._pid = os.getpid()
+            self.pending = 0
+        return self._executor
+
+    def _done(self, future=None):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    def _run(self, fn, *args):
+        with self._lock:
+            pool = self._pool() if self.workers else None
+            if self.max_pending and self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PoolBusy(f"{self.pending} password hashes already pending")
+            self.pending += 1
+        if pool is None:
+            try:
+                return fn(*args)
+            finally:
+                self._done()
+        try:
+            future = pool.submit(fn, *args)
+        except concurrent.futures.BrokenExecutor:
+            with self._lock:
+                self._pid = None  # a worker died; fork a fresh pool next time
+            self._done()
+            raise
+        future.add_done_callback(self._done)
+        return future.result()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password)
+
+    def check(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def stats(self):
+        return {'workers': self.workers, 'max_pending': self.max_pending, 'pending': self.pending,
+                'completed': self.completed, 'rejected': self.rejected}
@@ -1,6 +1,7 @@
 from flask import Flask, render_template_string, request, redirect, url_for, session, send_file
 from werkzeug.security import generate_password_hash, check_password_hash
 import pandas as pd
+import io
 import json
 import os
 
@@ -27,15 +28,16 @@ routes = sorted(df['Route'].dropna().unique()) if 'Route' in df.columns else []
 
 
 import os
-USER_FILE = os.path.join('/tmp', 'users.json')
+from user_store import DuplicateEmail, UserStore
 
+USER_FILE = os.path.join('/tmp', 'users.json')
+users = UserStore(os.environ.get('USER_DB', os.path.join('/tmp', 'users.db')))
 
-# Load users from file if exists
+# Carry over accounts saved by the old JSON user file
 if os.path.exists(USER_FILE):
     with open(USER_FILE, 'r') as f:
-        users = json.load(f)
-else:
-    users = []
+        users.import_users(json.load(f))
+    os.replace(USER_FILE, USER_FILE + '.imported')
 
 
 TEMPLATES = {
@@ -44,6 +46,7 @@ TEMPLATES = {
     <body class="bg-[#0B132B] text-white flex justify-center items-center h-screen">
       <form method="POST" class="bg-[#0E1A36] p-8 rounded-xl space-y-4 w-96">
         <h1 class="text-2xl font-bold text-center">Sign Up</h1>
+        {% if error %}<p class="text-red-400 text-center">{{ error }}</p>{% endif %}
         <input name="fullname" placeholder="Full Name" class="w-full p-2 rounded bg-[#1C2541]" required>
         <input name="email" type="email" placeholder="Email" class="w-full p-2 rounded bg-[#1C2541]" required>
         <input name="password" type="password" placeholder="Password" class="w-full p-2 rounded bg-[#1C2541]" required>
@@ -229,20 +232,12 @@ def home():
 @app.route('/signup', methods=['GET', 'POST'])
 def signup():
     if request.method == 'POST':
-        # Check if user already exists
-        email = request.form['email']
-        if any(u['email'] == email for u in users):
-            return render_template_string(TEMPLATES['signup'], error="Email already registered!")
-
-        users.append({
-            'name': request.form['fullname'],
-            'email': email,
-            'password': generate_password_hash(request.form['password']),
-            'role': 'Owner'
-        })
-        # Save to file
-        with open(USER_FILE, 'w') as f:
-            json.dump(users, f)
+        # The unique email index rejects an existing user atomically
+        try:
+            users.add(request.form['fullname'], request.form['email'],
+                      generate_password_hash(request.form['password']), role='Owner')
+        except DuplicateEmail:
+            return render_template_string(TEMPLATES['signup'], error="Email already registered!"), 409
 
         return redirect(url_for('login'))
 
@@ -252,7 +247,7 @@ def signup():
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
-        user = next((u for u in users if u['email'] == request.form['email']), None)
+        user = users.get(request.form['email'])
         if user and check_password_hash(user['password'], request.form['password']):
             session['user'] = user
             return redirect(url_for('dashboard'))
@@ -265,17 +260,23 @@ def dashboard():
         return redirect(url_for('login'))
     vehicle = request.args.get('vehicle')
     route = request.args.get('route')
-    filtered = df.copy()
+    # Compose the filters into one mask so only the matching rows are selected
+    # (no full-frame copy, no intermediate frame per filter).
+    mask = None
     if vehicle:
-        filtered = filtered[filtered['Vehicle ID'] == vehicle]
+        mask = df['Vehicle ID'] == vehicle
     if route:
-        filtered = filtered[filtered['Route'] == route]
+        route_mask = df['Route'] == route
+        mask = route_mask if mask is None else mask & route_mask
+    filtered = df if mask is None else df[mask]
 
+    status = filtered['Trip Status']
+    under_audit = status == 'Under Audit'
     total_trips = len(filtered)
-    ongoing = filtered[filtered['Trip Status'] == 'Pending Closure'].shape[0]
-    closed = filtered[filtered['Trip Status'] == 'Completed'].shape[0]
-    flags = filtered[filtered['Trip Status'] == 'Under Audit'].shape[0]
-    resolved = filtered[(filtered['Trip Status'] == 'Under Audit') & (filtered['POD Status'] == 'Yes')].shape[0]
+    ongoing = int((status == 'Pending Closure').sum())
+    closed = int((status == 'Completed').sum())
+    flags = int(under_audit.sum())
+    resolved = int((under_audit & (filtered['POD Status'] == 'Yes')).sum())
 
     rev = filtered['Freight Amount'].sum()
     exp = filtered['Total Trip Expense'].sum()
@@ -290,7 +291,7 @@ def dashboard():
     profit_pct = round((profit / rev) * 100, 1) if rev else 0
 
     daily = filtered.groupby('Day')['Trip ID'].count().reindex(range(1, 32), fill_value=0).tolist()
-    audited = filtered[filtered['Trip Status'] == 'Under Audit'].groupby('Day')['Trip ID'].count().reindex(range(1, 32), fill_value=0).tolist()
+    audited = filtered['Day'][under_audit].value_counts().reindex(range(1, 32), fill_value=0).tolist()
     audit_pct = [round(a / b * 100, 1) if b else 0 for a, b in zip(audited, daily)]
 
     bar_labels = ['Revenue', 'Expense', 'Profit']
@@ -628,10 +629,11 @@ def logout():
 
 @app.route('/download-summary')
 def download_summary():
-    filtered = df
-    report = generate_ai_report(filtered)
-    with open("AI_Report_Summary.txt", 'w', encoding='utf-8') as f:
-        f.write(report)
-    return send_file("AI_Report_Summary.txt", as_attachment=True)
+    if 'user' not in session:
+        return redirect(url_for('login'))
+    # Built in memory; nothing is written to disk, so parallel downloads cannot race.
+    report = generate_ai_report(df).encode('utf-8')
+    return send_file(io.BytesIO(report), mimetype='text/plain', as_attachment=True,
+                     download_name='AI_Report_Summary.txt')
 if __name__ == "__main__":
     app.run(host='0.0.0.0', port=7860)
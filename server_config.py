@@ -0,0 +1,78 @@
+"""Production server settings, read from the environment.
+
+This file is also gunicorn's config (``gunicorn -c server_config.py
+wsgi:application``), and ``python wsgi.py`` uses the same settings for
+waitress, which has no worker processes and no preload.
+
+* ``WEB_WORKERS`` processes (gunicorn), each with ``WEB_THREADS`` threads.
+  Page rendering holds the GIL, so processes serve pages in parallel. The
+  threads cover requests that wait on I/O, such as SQLite or slow clients.
+* ``WEB_PRELOAD`` imports the app and loads the trip data in the master
+  before forking. Workers then share the frames copy-on-write and boot
+  without reading the workbooks again. Threads do not survive ``fork``, so
+  the workbook watcher moves from the master to every worker (``post_fork``).
+* ``WEB_KEEPALIVE`` is how long an idle keep-alive connection is held open,
+  in seconds.
+* ``WEB_BACKLOG`` caps the listen queue. ``WEB_CONNECTIONS`` caps the
+  connections each worker accepts (waitress: the whole server). Past these
+  limits clients wait in the kernel or are refused, instead of queueing in
+  the app without bound.
+* ``WEB_TIMEOUT`` restarts a gunicorn worker stuck on one request this long.
+  ``WEB_MAX_REQUESTS`` recycles workers after that many requests (0: never).
+
+With more than one worker, sessions go to a shared SQLite file
+(``SESSION_DB``, default ``sessions.db``); the in-memory store is per process.
+"""
+import multiprocessing
+import os
+import sys
+
+WEB_BIND = os.environ.get('WEB_BIND', f"0.0.0.0:{os.environ.get('PORT', '7860')}")
+WEB_WORKERS = int(os.environ.get('WEB_WORKERS', min(2 * multiprocessing.cpu_count() + 1, 8)))
+WEB_THREADS = int(os.environ.get('WEB_THREADS', '4'))
+WEB_PRELOAD = os.environ.get('WEB_PRELOAD', '1').lower() in ('1', 'true', 'yes')
+WEB_KEEPALIVE = int(os.environ.get('WEB_KEEPALIVE', '5'))
+WEB_BACKLOG = int(os.environ.get('WEB_BACKLOG', '256'))
+WEB_CONNECTIONS = int(os.environ.get('WEB_CONNECTIONS', '100'))
+WEB_TIMEOUT = int(os.environ.get('WEB_TIMEOUT', '60'))
+WEB_MAX_REQUESTS = int(os.environ.get('WEB_MAX_REQUESTS', '0'))
+
+if WEB_WORKERS > 1:
+    os.environ.setdefault('SESSION_DB', 'sessions.db')
+
+# gunicorn settings
+bind = WEB_BIND
+workers = WEB_WORKERS
+threads = WEB_THREADS
+worker_class = 'gthread'
+preload_app = WEB_PRELOAD
+keepalive = WEB_KEEPALIVE
+backlog = WEB_BACKLOG
+worker_connections = WEB_CONNECTIONS
+timeout = WEB_TIMEOUT
+max_requests = WEB_MAX_REQUESTS
+max_requests_jitter = WEB_MAX_REQUESTS // 10
+
+
+def when_ready(server):
+    # The master only forks workers; its copy of the data must not keep reloading,
+    # and no reload may be in flight (holding the reload lock) when it forks.
+    if 'app' in sys.modules:
+        sys.modules['app'].datasets.stop_watcher()
+
+
+def post_fork(server, worker):
+    from app import datasets
+    datasets.reload()  # catch up on changes since the master loaded the data
+    datasets.start_watcher()
+
+
+def waitress_settings():
+    """``waitress.serve`` keyword arguments for the same settings."""
+    return {
+        'listen': WEB_BIND,
+        'threads': WEB_THREADS,
+        'backlog': WEB_BACKLOG,
+        'connection_limit': WEB_CONNECTIONS,
+        'channel_timeout': WEB_KEEPALIVE,
+    }
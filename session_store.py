@@ -0,0 +1,190 @@
+"""Server-side sessions: the cookie carries only a random session id.
+
+Flask's default session signs and serialises the whole session into the
+cookie, so every request ships the user record back and forth and verifies
+its HMAC. ``ServerSessionInterface`` keeps the data on the server instead,
+keyed by a 256-bit random id, and the cookie is just that id.
+
+Two stores are provided. ``MemorySessionStore`` is a per-process LRU dict
+(O(1) lookup, capped size), fine for a single worker. ``SQLiteSessionStore``
+keeps sessions in a SQLite table so every worker process shares them. Both
+expire sessions ``ttl`` seconds after they were last written and sweep
+expired entries every ``sweep_interval`` seconds.
+"""
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+SESSION_TTL = float(os.environ.get('SESSION_TTL', 12 * 3600))
+SESSION_CACHE_SIZE = int(os.environ.get('SESSION_CACHE_SIZE', '10000'))
+SESSION_DB = os.environ.get('SESSION_DB')
+
+
+class MemorySessionStore:
+    """Sessions in an LRU dict; the least recently used are evicted past ``maxsize``."""
+
+    def __init__(self, maxsize=SESSION_CACHE_SIZE, ttl=SESSION_TTL, sweep_interval=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._swept = time.monotonic()
+        self.evictions = self.expirations = 0
+
+    def get(self, sid):
+        now = time.monotonic()
+        with self._lock:
+            self._maybe_sweep(now)
+            entry = self._data.get(sid)
+            if entry is None:
+                return None
+            data, expires = entry
+            if expires < now:
+                del self._data[sid]
+                self.expirations += 1
+                return None
+            self._data.move_to_end(sid)
+            return data
+
+    def set(self, sid, data):
+        with self._lock:
+            self._data[sid] = (data, time.monotonic() + self.ttl)
+            self._data.move_to_end(sid)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, sid):
+        with self._lock:
+            self._data.pop(sid, None)
+
+    def _maybe_sweep(self, now):
+        if now - self._swept < self.sweep_interval:
+            return
+        self._swept = now
+        expired = [sid for sid, (_, expires) in self._data.items() if expires < now]
+        for sid in expired:
+            del self._data[sid]
+        self.expirations += len(expired)
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {'backend': 'memory', 'size': len(self._data), 'maxsize': self.maxsize, 'ttl': self.ttl,
+                'evictions': self.evictions, 'expirations': self.expirations}
+
+
+class SQLiteSessionStore:
+    """Sessions in a SQLite table shared by every worker process."""
+
+    def __init__(self, path, ttl=SESSION_TTL, sweep_interval=60.0):
+        self.path = path
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self._local = threading.local()
+        self._swept = time.time()
+        with self._connection() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS sessions "
+                         "(id TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL) WITHOUT ROWID")
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires)")
+
+    def _connection(self):
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30.0)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            local.conn, local.pid = conn, os.getpid()
+        return local.conn
+
+    def get(self, sid):
+        now = time.time()
+        if now - self._swept >= self.sweep_interval:
+            self._swept = now
+            with self._connection() as conn:
+                conn.execute("DELETE FROM sessions WHERE expires < ?", (now,))
+        row = self._connection().execute(
+            "SELECT data FROM sessions WHERE id = ? AND expires >= ?", (sid, now)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, sid, data):
+        with self._connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO sessions (id, data, expires) VALUES (?, ?, ?)",
+                         (sid, json.dumps(data), time.time() + self.ttl))
+
+    def delete(self, sid):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (sid,))
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def stats(self):
+        return {'backend': 'sqlite', 'size': len(self), 'ttl': self.ttl}
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None):
+        def on_update(session):
+            session.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = sid is None
+        self.modified = False
+        self.replaced = None
+
+    def regenerate(self):
+        """Move the data to a fresh session id (call on login, against session fixation)."""
+        if self.sid is not None:
+            self.replaced, self.sid = self.sid, None
+        self.modified = True
+
+
+class ServerSessionInterface(SessionInterface):
+    """Flask session interface over a ``MemorySessionStore`` or ``SQLiteSessionStore``."""
+
+    def __init__(self, store):
+        self.store = store
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        data = self.store.get(sid) if sid else None
+        if data is None:
+            return ServerSession()
+        return ServerSession(data, sid=sid)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain, path = self.get_cookie_domain(app), self.get_cookie_path(app)
+        if session.replaced is not None:
+            self.store.delete(session.replaced)
+        if not session:
+            if session.sid is not None or session.replaced is not None:
+                if session.sid is not None:
+                    self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        if not session.modified:
+            return
+        if session.sid is None:
+            session.sid = secrets.token_urlsafe(32)
+            response.set_cookie(name, session.sid, expires=self.get_expiration_time(app, session),
+                                httponly=self.get_cookie_httponly(app), domain=domain, path=path,
+                                secure=self.get_cookie_secure(app), samesite=self.get_cookie_samesite(app))
+            response.vary.add('Cookie')
+        self.store.set(session.sid, dict(session))
+
+
+def session_store_from_env():
+    """``SQLiteSessionStore`` at ``SESSION_DB`` if set, else a ``MemorySessionStore``."""
+    return SQLiteSessionStore(SESSION_DB) if SESSION_DB else MemorySessionStore()
@@ -3,7 +3,12 @@ import socketserver
 import os
 from urllib.parse import parse_qs
 
+from werkzeug.security import generate_password_hash
+
+from user_store import DuplicateEmail, UserStore
+
 PORT = 8000
+users = UserStore()
 
 HTML_FORM = """<!DOCTYPE html>
 <html lang="en">
@@ -56,8 +61,11 @@ class SimpleHandler(http.server.SimpleHTTPRequestHandler):
             self.respond_message("Passwords do not match!")
             return
 
-        with open("users.txt", "a") as f:
-            f.write(f"{fullname},{email},{phone}\n")
+        try:
+            users.add(fullname, email, generate_password_hash(password), phone=phone)
+        except DuplicateEmail:
+            self.respond_message("Email already registered!")
+            return
 
         self.respond_message("User registered successfully!")
 
@@ -1,4 +1,3 @@
 #!/bin/bash
-export FLASK_APP=final.py
-export FLASK_RUN_HOST=0.0.0.0
-flask run
+# Production server; settings (WEB_WORKERS, WEB_THREADS, PORT, ...) in server_config.py.
+exec gunicorn -c server_config.py wsgi:application
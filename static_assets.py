@@ -0,0 +1,282 @@
+"""Self-hosted static assets: purged utility CSS, vendored scripts, precompressed.
+
+The pages used to load the Tailwind Play CDN, which ships its whole JIT
+compiler to the browser and builds the stylesheet on every page load, and
+Chart.js from jsdelivr. ``python -m static_assets build [--fetch]`` replaces
+both:
+
+* ``static/css/app.css`` is generated from the ``class="..."`` attributes in
+  the app sources and holds only the utility classes they use (same values
+  as Tailwind v3) after a small preflight reset;
+* ``--fetch`` downloads the pinned Chart.js build into ``static/vendor``,
+  writing it only if its sha256 matches the one pinned in ``VENDOR``;
+* every text asset gets ``.gz`` and ``.br`` variants written next to it.
+
+``StaticAssets`` reads every file once at startup and serves it from memory
+under a content-hashed URL (``asset_url('css/app.css')`` in templates) with
+``Cache-Control: immutable``, choosing the precompressed variant the client
+accepts. Variants missing on disk are compressed at startup. A vendored file
+that has not been fetched yet falls back to its CDN URL.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import sys
+import urllib.request
+
+import brotli
+from flask import Response, abort, request
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+CHART_JS = 'vendor/chart.umd.js'
+# name -> (URL, sha256 of the file). A file whose sha256 is still None is not
+# written by ``build --fetch``, which prints its digest to check and pin here.
+# Chart.js is not pinned or committed yet, so pages still load it from the CDN
+# and the Docker images run ``build`` without ``--fetch``.
+VENDOR = {CHART_JS: ('https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.js', None)}
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.txt', '.html')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+SANS = ('ui-sans-serif, system-ui, sans-serif, "Apple Color Emoji", "Segoe UI Emoji", '
+        '"Segoe UI Symbol", "Noto Color Emoji"')
+
+PREFLIGHT = f"""*,::before,::after{{box-sizing:border-box;border:0 solid #e5e7eb}}
+html{{line-height:1.5;-webkit-text-size-adjust:100%;tab-size:4;font-family:{SANS}}}
+body{{margin:0;line-height:inherit}}
+h1,h2,h3,h4,h5,h6{{font-size:inherit;font-weight:inherit}}
+a{{color:inherit;text-decoration:inherit}}
+b,strong{{font-weight:bolder}}
+pre{{font-family:ui-monospace,SFMono-Regular,Menlo,Monaco,Consolas,monospace;font-size:1em}}
+table{{text-indent:0;border-color:inherit;border-collapse:collapse}}
+button,input,select{{font-family:inherit;font-size:100%;font-weight:inherit;line-height:inherit;color:inherit;margin:0;padding:0}}
+button,select{{text-transform:none}}
+button,[type='submit']{{-webkit-appearance:button;background-color:transparent;background-image:none;cursor:pointer}}
+h1,h2,h3,h4,h5,h6,p,pre,blockquote,figure,hr{{margin:0}}
+ol,ul{{list-style:none;margin:0;padding:0}}
+input::placeholder{{opacity:1;color:#9ca3af}}
+img,svg,canvas{{display:block;vertical-align:middle}}
+"""
+
+SPACING = {'0': '0px', 'px': '1px'}
+SPACING.update({f"{n:g}": f"{n / 4:g}rem" for n in (0.5, 1, 1.5, 2, 2.5, 3, 4, 5, 6, 8, 10, 12, 16, 20, 24,
+                                                     32, 40, 48, 64, 96)})
+PALETTE = {'white': '#fff', 'black': '#000', 'transparent': 'transparent'}
+for family, shades in {
+    'gray': ('#d1d5db', '#9ca3af', '#6b7280', '#4b5563', '#374151'),
+    'red': ('#fca5a5', '#f87171', '#ef4444', '#dc2626', '#b91c1c'),
+    'orange': ('#fdba74', '#fb923c', '#f97316', '#ea580c', '#c2410c'),
+    'yellow': ('#fde047', '#facc15', '#eab308', '#ca8a04', '#a16207'),
+    'green': ('#86efac', '#4ade80', '#22c55e', '#16a34a', '#15803d'),
+    'teal': ('#5eead4', '#2dd4bf', '#14b8a6', '#0d9488', '#0f766e'),
+    'blue': ('#93c5fd', '#60a5fa', '#3b82f6', '#2563eb', '#1d4ed8'),
+    'purple': ('#d8b4fe', '#c084fc', '#a855f7', '#9333ea', '#7e22ce'),
+    'pink': ('#f9a8d4', '#f472b6', '#ec4899', '#db2777', '#be185d'),
+}.items():
+    PALETTE.update({f"{family}-{shade}": value for shade, value in zip((300, 400, 500, 600, 700), shades)})
+
+_SP = '(' + '|'.join(re.escape(k) for k in SPACING) + ')'
+_COLOR = r'(\[#[0-9a-fA-F]{3,8}\]|' + '|'.join(PALETTE) + ')'
+_SIDES = {'': ('',), 'x': ('-left', '-right'), 'y': ('-top', '-bottom'),
+          't': ('-top',), 'r': ('-right',), 'b': ('-bottom',), 'l': ('-left',)}
+_FONT_SIZES = {'xs': ('0.75rem', '1rem'), 'sm': ('0.875rem', '1.25rem'), 'base': ('1rem', '1.5rem'),
+               'lg': ('1.125rem', '1.75rem'), 'xl': ('1.25rem', '1.75rem'), '2xl': ('1.5rem', '2rem'),
+               '3xl': ('1.875rem', '2.25rem'), '4xl': ('2.25rem', '2.5rem')}
+_RADII = {'': '0.25rem', '-none': '0px', '-sm': '0.125rem', '-md': '0.375rem', '-lg': '0.5rem',
+          '-xl': '0.75rem', '-2xl': '1rem', '-full': '9999px'}
+_WEIGHTS = {'normal': 400, 'medium': 500, 'semibold': 600, 'bold': 700}
+
+
+def _color(value):
+    return value[1:-1] if value.startswith('[') else PALETTE[value]
+
+
+def _spacing(prop, sides, value):
+    return ';'.join(f"{prop}{side}:{SPACING[value]}" for side in _SIDES[sides])
+
+
+# Utility families in cascade order (later families win, e.g. ``px-4`` over
+# ``p-2``): ``(pattern, declarations(match))``; ``space-*`` returns a
+# ``(selector suffix, declarations)`` pair.
+FAMILIES = [
+    (r'(block|inline-block|inline|flex|grid|hidden)',
+     lambda m: 'display:' + {'hidden': 'none'}.get(m[1], m[1])),
+    (r'grid-cols-(\d+)', lambda m: f"grid-template-columns:repeat({m[1]},minmax(0,1fr))"),
+    (r'flex-(wrap|col|row)', lambda m: 'flex-wrap:wrap' if m[1] == 'wrap' else
+     'flex-direction:' + {'col': 'column'}.get(m[1], m[1])),
+    (r'items-(start|center|end|stretch)',
+     lambda m: 'align-items:' + {'start': 'flex-start', 'end': 'flex-end'}.get(m[1], m[1])),
+    (r'justify-(start|center|end|between)', lambda m: 'justify-content:' + {
+        'start': 'flex-start', 'end': 'flex-end', 'between': 'space-between'}.get(m[1], m[1])),
+    (r'gap-' + _SP, lambda m: f"gap:{SPACING[m[1]]}"),
+    (r'space-(x|y)-' + _SP, lambda m: (' > :not([hidden]) ~ :not([hidden])',
+                                        f"margin-{'left' if m[1] == 'x' else 'top'}:{SPACING[m[2]]}")),
+    (r'overflow-(x-|y-)?(auto|hidden|scroll)', lambda m: f"overflow{'-' + m[1][0] if m[1] else ''}:{m[2]}"),
+    (r'rounded(|-none|-sm|-md|-lg|-xl|-2xl|-full)', lambda m: f"border-radius:{_RADII[m[1]]}"),
+    (r'border(|-t|-r|-b|-l)', lambda m: f"border{_SIDES[m[1][1:]][0]}-width:1px"),
+    (r'(w|h)-(full|screen|auto|' + _SP[1:],
+     lambda m: ('width:' if m[1] == 'w' else 'height:') + {
+         'full': '100%', 'auto': 'auto', 'screen': '100vw' if m[1] == 'w' else '100vh'}.get(m[2], SPACING.get(m[2]))),
+    (r'bg-' + _COLOR, lambda m: f"background-color:{_color(m[1])}"),
+    (r'border-' + _COLOR, lambda m: f"border-color:{_color(m[1])}"),
+    (r'p(|x|y)-' + _SP, lambda m: _spacing('padding', m[1], m[2])),
+    (r'p(t|r|b|l)-' + _SP, lambda m: _spacing('padding', m[1], m[2])),
+    (r'm(|x|y)-' + _SP, lambda m: _spacing('margin', m[1], m[2])),
+    (r'm(t|r|b|l)-' + _SP, lambda m: _spacing('margin', m[1], m[2])),
+    (r'text-(left|center|right)', lambda m: f"text-align:{m[1]}"),
+    (r'font-sans', lambda m: f"font-family:{SANS}"),
+    (r'text-(xs|sm|base|lg|xl|2xl|3xl|4xl)', lambda m: 'font-size:{};line-height:{}'.format(*_FONT_SIZES[m[1]])),
+    (r'font-(normal|medium|semibold|bold)', lambda m: f"font-weight:{_WEIGHTS[m[1]]}"),
+    (r'text-' + _COLOR, lambda m: f"color:{_color(m[1])}"),
+    (r'(no-)?underline', lambda m: 'text-decoration-line:' + ('none' if m[1] else 'underline')),
+    (r'outline-none', lambda m: 'outline:2px solid transparent;outline-offset:2px'),
+]
+FAMILIES = [(re.compile(pattern + '$'), rule) for pattern, rule in FAMILIES]
+VARIANTS = ('hover', 'focus')
+
+
+def used_classes(paths):
+    """Every token inside a ``class="..."`` attribute of the files at ``paths``."""
+    classes = set()
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for attr in re.findall(r'class="([^"]*)"', f.read()):
+                classes.update(re.sub(r'{[{%].*?[}%]}', ' ', attr).split())
+    return classes
+
+
+def _escape(name):
+    return re.sub(r'([^a-zA-Z0-9_-])', r'\\\1', name)
+
+
+def build_css(classes):
+    """``(css, unknown)``: rules for the known utilities in ``classes``, in cascade order."""
+    rules, unknown = [], []
+    for name in classes:
+        variant, _, utility = name.rpartition(':')
+        if variant and variant not in VARIANTS:
+            unknown.append(name)
+            continue
+        for rank, (pattern, rule) in enumerate(FAMILIES):
+            match = pattern.match(utility)
+            if match:
+                declarations = rule(match)
+                suffix = f":{variant}" if variant else ''
+                if isinstance(declarations, tuple):
+                    suffix, declarations = suffix + declarations[0], declarations[1]
+                rules.append(((bool(variant), rank, name), f".{_escape(name)}{suffix}{{{declarations}}}"))
+                break
+        else:
+            unknown.append(name)
+    return PREFLIGHT + '\n'.join(rule for _, rule in sorted(rules)) + '\n', sorted(unknown)
+
+
+def compress(path):
+    """Write ``path.gz`` and ``path.br`` next to ``path``."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path + '.gz', 'wb') as f:
+        f.write(gzip.compress(data, 9, mtime=0))
+    with open(path + '.br', 'wb') as f:
+        f.write(brotli.compress(data, quality=11))
+
+
+def build(sources=('app.py',), directory=STATIC_DIR, fetch=False):
+    css_path = os.path.join(directory, 'css', 'app.css')
+    os.makedirs(os.path.dirname(css_path), exist_ok=True)
+    css, unknown = build_css(used_classes(sources))
+    with open(css_path, 'w', encoding='utf-8') as f:
+        f.write(css)
+    print(f"{css_path}: {len(css)} bytes; not utilities: {' '.join(unknown) or '-'}")
+    if fetch:
+        for name, (url, sha256) in VENDOR.items():
+            with urllib.request.urlopen(url, timeout=60) as response:
+                data = response.read()
+            digest = hashlib.sha256(data).hexdigest()
+            if sha256 is None:
+                print(f"{name}: not pinned, not written; check {url} and pin sha256 {digest} in VENDOR")
+                continue
+            if digest != sha256:
+                sys.exit(f"{name}: sha256 of {url} is {digest}, pinned {sha256}")
+            target = os.path.join(directory, name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as f:
+                f.write(data)
+            print(f"{target}: fetched {url}")
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(COMPRESSIBLE):
+                compress(os.path.join(root, name))
+
+
+class Asset:
+    def __init__(self, path, name):
+        with open(path, 'rb') as f:
+            self.data = f.read()
+        digest = hashlib.sha1(self.data).hexdigest()[:12]
+        self.etag = digest
+        stem, ext = os.path.splitext(name)
+        self.url_name = f"{stem}.{digest}{ext}"
+        self.mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        self.variants = {}
+        if name.endswith(COMPRESSIBLE):
+            self.variants['gzip'] = self._variant(path + '.gz', lambda: gzip.compress(self.data, 9, mtime=0))
+            self.variants['br'] = self._variant(path + '.br', lambda: brotli.compress(self.data, quality=11))
+            self.variants = {k: v for k, v in self.variants.items() if len(v) < len(self.data)}
+
+    def _variant(self, path, make):
+        if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(path.rsplit('.', 1)[0]):
+            with open(path, 'rb') as f:
+                return f.read()
+        return make()
+
+
+class StaticAssets:
+    """Serves ``directory`` at ``url_path`` from memory and adds ``asset_url`` to the templates."""
+
+    def __init__(self, app, directory=STATIC_DIR, url_path='/assets'):
+        self.url_path = url_path
+        self.assets = {}
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.endswith(('.gz', '.br')):
+                    continue
+                path = os.path.join(root, name)
+                logical = os.path.relpath(path, directory).replace(os.sep, '/')
+                self.assets[logical] = Asset(path, logical)
+        self._by_url = {asset.url_name: asset for asset in self.assets.values()}
+        self.digest = hashlib.sha1(repr(sorted(self._by_url)).encode()).hexdigest()[:16]
+        app.add_url_rule(f"{url_path}/<path:filename>", 'assets', self.serve)
+        app.jinja_env.globals['asset_url'] = self.url
+
+    def url(self, name):
+        asset = self.assets.get(name)
+        if asset is None:
+            if name in VENDOR:
+                return VENDOR[name][0]
+            raise KeyError(f"Unknown static asset {name!r}")
+        return f"{request.script_root}{self.url_path}/{asset.url_name}"
+
+    def serve(self, filename):
+        asset = self._by_url.get(filename)
+        immutable = asset is not None
+        asset = asset or self.assets.get(filename) or abort(404)
+        headers = {'Cache-Control': IMMUTABLE if immutable else 'no-cache', 'ETag': f'"{asset.etag}"',
+                   'Vary': 'Accept-Encoding'}
+        if request.if_none_match.contains(asset.etag):
+            return Response(status=304, headers=headers)
+        body = asset.data
+        for encoding in ('br', 'gzip'):
+            if encoding in asset.variants and request.accept_encodings[encoding]:
+                body = asset.variants[encoding]
+                headers['Content-Encoding'] = encoding
+                break
+        return Response(body, mimetype=asset.mimetype, headers=headers)
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if not args or args[0] != 'build':
+        sys.exit("usage: python -m static_assets build [--fetch] [source.py ...]")
+    build([a for a in args[1:] if not a.startswith('--')] or ('app.py',), fetch='--fetch' in args)
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# The app is imported once for the whole run: no workbook watcher, and users
+# go to a scratch database instead of the repository's users.db.
+os.environ.setdefault('TRIP_RELOAD_INTERVAL', '0')
+os.environ.setdefault('USER_DB', os.path.join(os.environ.get('TMPDIR', '/tmp'), f'trip-tests-{os.getpid()}.db'))
+
+
+@pytest.fixture
+def app_module():
+    import app
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    """Test client with a signed-in Owner session."""
+    client = app_module.app.test_client()
+    with client.session_transaction() as sess:
+        sess['user'] = {'name': 'Test', 'email': 'test@example.com', 'role': 'Owner'}
+    return client
@@ -0,0 +1,62 @@
+"""Gzip/brotli responses from ``CompressionMiddleware``, and conditional GETs through it."""
+import gzip
+
+import brotli
+import pytest
+
+DECODE = {'gzip': gzip.decompress, 'br': brotli.decompress}
+
+
+@pytest.fixture
+def client(client, app_module, monkeypatch):
+    # The bundled workbooks give some API bodies below the default minimum.
+    monkeypatch.setattr(app_module.compression, 'min_size', 0)
+    app_module.compression.cache.clear()
+    return client
+
+
+@pytest.mark.parametrize('encoding', list(DECODE))
+@pytest.mark.parametrize('path', ['/trip-generator?page_size=500', '/api/v1/daily'])
+def test_conditional_get_round_trip(client, path, encoding):
+    plain = client.get(path, headers={'Accept-Encoding': 'identity'})
+    first = client.get(path, headers={'Accept-Encoding': encoding})
+    assert first.status_code == 200
+    assert first.headers['Content-Encoding'] == encoding
+    assert 'Accept-Encoding' in first.headers['Vary']
+    assert first.headers['ETag'] == plain.headers['ETag'][:-1] + f'-{encoding}"'
+    assert DECODE[encoding](first.data) == plain.data
+
+    again = client.get(path, headers={'Accept-Encoding': encoding, 'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == first.headers['ETag']
+    assert again.data == b''
+
+    # The identity ETag still validates the uncompressed copy.
+    assert client.get(path, headers={'If-None-Match': plain.headers['ETag']}).status_code == 304
+
+
+def test_changed_data_is_sent_again(client, app_module):
+    headers = {'Accept-Encoding': 'gzip'}
+    etag = client.get('/trip-generator', headers=headers).headers['ETag']
+    current = app_module.datasets.current()
+    app_module.datasets.install(current.df, current.closure_df)
+    try:
+        fresh = client.get('/trip-generator', headers={**headers, 'If-None-Match': etag})
+    finally:
+        app_module.datasets.reload(force=True)
+    assert fresh.status_code == 200
+    assert fresh.headers['ETag'] != etag
+    assert fresh.headers['Content-Encoding'] == 'gzip'
+
+
+def test_small_head_and_error_responses_pass_through(app_module):
+    client = app_module.app.test_client()
+    # Anonymous: a redirect to the login page is not compressed.
+    redirect = client.get('/dashboard/ai-report', headers={'Accept-Encoding': 'gzip'})
+    assert redirect.status_code == 302 and 'Content-Encoding' not in redirect.headers
+    # The login page is below the default minimum size.
+    login = client.get('/login', headers={'Accept-Encoding': 'gzip'})
+    assert login.status_code == 200 and len(login.data) < 1024
+    assert 'Content-Encoding' not in login.headers
+    head = client.head('/dashboard/ai-report', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in head.headers
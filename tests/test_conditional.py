@@ -0,0 +1,28 @@
+"""ETag / Last-Modified validators, and 304s only for signed-in requests."""
+import pytest
+
+FUTURE = 'Fri, 01 Jan 2100 00:00:00 GMT'
+PRIVATE = {'/dashboard/ai-report': 302, '/download-summary': 302, '/api/v1/summary': 401, '/api/v1/daily': 401}
+
+
+@pytest.mark.parametrize('path', list(PRIVATE))
+def test_anonymous_requests_get_no_validators(app_module, path):
+    client = app_module.app.test_client()
+    for headers in ({}, {'If-Modified-Since': FUTURE}, {'If-None-Match': '*'}):
+        response = client.get(path, headers=headers)
+        assert response.status_code == PRIVATE[path]
+        assert 'ETag' not in response.headers and 'Last-Modified' not in response.headers
+
+
+@pytest.mark.parametrize('path', list(PRIVATE))
+def test_signed_in_repeat_is_not_modified(client, path):
+    first = client.get(path)
+    assert first.status_code == 200 and first.headers['ETag']
+    assert client.get(path, headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+    assert client.get(path, headers={'If-Modified-Since': FUTURE}).status_code == 304
+
+
+def test_error_responses_get_no_validators(client):
+    response = client.get('/api/v1/daily?from=not-a-date')
+    assert response.status_code == 400
+    assert 'ETag' not in response.headers and 'Last-Modified' not in response.headers
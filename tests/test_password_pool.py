@@ -0,0 +1,51 @@
+"""Bounded password hashing and the 429 it answers when full."""
+import threading
+
+import pytest
+
+from password_pool import PasswordPool, PoolBusy
+
+
+@pytest.mark.parametrize('workers', [0, 1])
+def test_hash_and_check_round_trip(workers):
+    pool = PasswordPool(workers=workers, max_pending=4)
+    pwhash = pool.hash('secret')
+    assert pool.check(pwhash, 'secret') is True
+    assert pool.check(pwhash, 'wrong') is False
+    assert pool.stats()['completed'] == 3 and pool.pending == 0
+
+
+def test_full_pool_rejects_straight_away():
+    pool = PasswordPool(workers=0, max_pending=1)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(10)
+    worker = threading.Thread(target=pool._run, args=(slow,))
+    worker.start()
+    try:
+        assert started.wait(10)
+        with pytest.raises(PoolBusy):
+            pool.hash('secret')
+        assert pool.rejected == 1
+    finally:
+        release.set()
+        worker.join()
+    assert pool.pending == 0
+    assert pool.check(pool.hash('secret'), 'secret')
+
+
+def test_busy_pool_answers_429(app_module, monkeypatch):
+    client = app_module.app.test_client()
+    client.post('/signup', data={'fullname': 'Sam', 'email': 'queued@example.com', 'password': 'pw'})
+    busy = PasswordPool(workers=0, max_pending=1)
+    busy.pending = 1
+    monkeypatch.setattr(app_module, 'passwords', busy)
+    response = client.post('/login', data={'email': 'queued@example.com', 'password': 'pw'})
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '1'
+    response = client.post('/signup', data={'fullname': 'Sam', 'email': 'busy@example.com', 'password': 'pw'})
+    assert response.status_code == 429
+    assert app_module.users.get('busy@example.com') is None
+    assert busy.rejected == 2
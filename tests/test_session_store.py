@@ -0,0 +1,86 @@
+"""Server-side sessions: stores, and a fresh session id on every login."""
+import itertools
+
+import pytest
+
+from session_store import MemorySessionStore, SQLiteSessionStore
+
+emails = (f"session{i}@example.com" for i in itertools.count())
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return MemorySessionStore(maxsize=2, ttl=60)
+    return SQLiteSessionStore(str(tmp_path / 'sessions.db'), ttl=60)
+
+
+def test_store_round_trip(store):
+    store.set('a', {'user': {'name': 'A'}})
+    assert store.get('a') == {'user': {'name': 'A'}}
+    assert store.get('missing') is None
+    store.delete('a')
+    assert store.get('a') is None and len(store) == 0
+
+
+def test_expired_sessions_are_gone(store):
+    store.ttl = -1
+    store.set('a', {'x': 1})
+    assert store.get('a') is None
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemorySessionStore(maxsize=2, ttl=60)
+    store.set('a', {})
+    store.set('b', {})
+    store.get('a')
+    store.set('c', {})
+    assert store.get('b') is None and store.get('a') == {} and store.stats()['evictions'] == 1
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def app_store(request, app_module, monkeypatch, tmp_path):
+    store = MemorySessionStore() if request.param == 'memory' else SQLiteSessionStore(str(tmp_path / 's.db'))
+    monkeypatch.setattr(app_module.app.session_interface, 'store', store)
+    return store
+
+
+def sign_up(client):
+    email = next(emails)
+    response = client.post('/signup', data={'fullname': 'Sam', 'email': email, 'password': 'pw-123456'})
+    assert response.status_code == 302
+    return {'email': email, 'password': 'pw-123456'}
+
+
+def test_login_issues_a_fresh_session_id(app_module, app_store):
+    client = app_module.app.test_client()
+    credentials = sign_up(client)
+    # A session id the client already holds, e.g. one planted by an attacker.
+    with client.session_transaction() as sess:
+        sess['theme'] = 'dark'
+    planted = client.get_cookie('session').value
+    assert app_store.get(planted) == {'theme': 'dark'}
+
+    response = client.post('/login', data=credentials)
+    assert response.status_code == 302
+    assert 'session=' in response.headers['Set-Cookie']
+    fresh = client.get_cookie('session').value
+    assert fresh != planted
+    assert app_store.get(planted) is None
+    assert app_store.get(fresh)['user']['email'] == credentials['email']
+    assert app_store.get(fresh)['theme'] == 'dark'
+
+    # The planted id no longer grants anything.
+    attacker = app_module.app.test_client()
+    attacker.set_cookie('session', planted)
+    assert attacker.get('/dashboard').status_code == 302
+    assert client.get('/dashboard').status_code == 200
+
+
+def test_logout_deletes_the_session(app_module, app_store):
+    client = app_module.app.test_client()
+    client.post('/login', data=sign_up(client))
+    sid = client.get_cookie('session').value
+    client.get('/logout')
+    assert app_store.get(sid) is None
+    assert client.get('/dashboard').status_code == 302
@@ -0,0 +1,95 @@
+"""Hot reload of the workbooks, in private and shared (memory-mapped) mode."""
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import trip_daily
+from trip_dataset import DatasetManager
+from trip_shared import shared_path
+
+from conftest import ROOT
+
+FLEET = os.path.join(ROOT, 'fleet_50_entries.xlsx')
+CLOSURE = os.path.join(ROOT, 'Trip_Closure_Sheet_Oct2024_Mar2025.xlsx')
+
+
+@pytest.fixture(params=[False, True], ids=['private', 'shared'])
+def manager(request, tmp_path):
+    fleet = shutil.copy(FLEET, tmp_path / 'fleet.xlsx')
+    closure = shutil.copy(CLOSURE, tmp_path / 'closure.xlsx')
+    return DatasetManager(str(fleet), str(closure), interval=0, shared=request.param)
+
+
+def append_rows(path, n):
+    sheet = pd.read_excel(path)
+    extra = sheet.tail(n).copy()
+    extra['Trip ID'] = [f"NEW{i:04d}" for i in range(n)]
+    pd.concat([sheet, extra], ignore_index=True).to_excel(path, index=False)
+    return extra
+
+
+def rebuilds(monkeypatch):
+    calls = []
+    original = trip_daily.DailySeries.from_frame.__func__
+
+    def counting(cls, frame):
+        calls.append(len(frame))
+        return original(cls, frame)
+    monkeypatch.setattr(trip_daily.DailySeries, 'from_frame', classmethod(counting))
+    return calls
+
+
+def test_unchanged_workbooks_are_not_reloaded(manager):
+    old = manager.current()
+    assert manager.reload() is False
+    assert manager.current() is old
+
+
+def test_appended_closure_rows_extend_the_series(manager, monkeypatch):
+    old = manager.current()
+    swaps = []
+    manager.on_swap(lambda before, after: swaps.append((before, after)))
+    calls = rebuilds(monkeypatch)
+    extra = append_rows(manager.closure_file, 3)
+
+    assert manager.reload() is True
+    new = manager.current()
+    assert calls == []
+    assert swaps == [(old, new)]
+    assert new.version == old.version + 1
+    assert new.finance.rows == old.finance.rows + 3
+    assert new.finance.total('revenue') == pytest.approx(old.finance.total('revenue') + extra['Freight Amount'].sum())
+    rebuilt = trip_daily.DailySeries.from_frame(new.closure_df)
+    for name in new.finance.values:
+        assert new.finance.total(name) == pytest.approx(rebuilt.total(name))
+    if manager.shared:
+        assert os.path.isdir(shared_path(manager.closure_file))
+
+
+def test_edited_closure_rows_rebuild_the_series(manager, monkeypatch):
+    sheet = pd.read_excel(manager.closure_file)
+    sheet.loc[0, 'Freight Amount'] += 1000
+    calls = rebuilds(monkeypatch)
+    sheet.to_excel(manager.closure_file, index=False)
+
+    assert manager.reload() is True
+    assert calls == [len(sheet)]
+    assert manager.current().finance.total('revenue') == pytest.approx(sheet['Freight Amount'].sum())
+
+
+def test_install_swaps_in_prepared_frames(manager):
+    old = manager.current()
+    swaps = []
+    manager.on_swap(lambda before, after: swaps.append((before, after)))
+    new = manager.install(old.df.head(10), old.closure_df)
+
+    assert manager.current() is new
+    assert swaps == [(old, new)]
+    assert new.version == manager.metrics['version'] == old.version + 1
+    assert new.tag == f"v{new.version}" != old.tag
+    assert new.cube.summary()['total_trips'] == 10
+    # The workbooks did not change, but the installed snapshot has no signature.
+    assert manager.reload() is True
+    assert manager.current().tag == old.tag
@@ -0,0 +1,127 @@
+"""A store and cube built in several chunks must match one plain DataFrame."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from trip_calendar import Calendar
+from trip_cube import MEASURES, TripCube
+from trip_metrics import CLOSED, ONGOING, UNDER_AUDIT, status_summary
+from trip_store import StoreWriter, TripStore
+
+STATUSES = [ONGOING, CLOSED, UNDER_AUDIT]
+TEXT = ['Vehicle ID', 'Route', 'Trip Status', 'POD Status']
+
+
+def make_chunk(rng, rows, vehicles, routes, statuses, float_money=False):
+    money = rng.integers(1_000, 50_000, rows)
+    frame = pd.DataFrame({
+        'Trip Date': pd.Timestamp('2024-10-01') + pd.to_timedelta(rng.integers(0, 40, rows), unit='D'),
+        'Vehicle ID': rng.choice(vehicles, rows),
+        'Route': rng.choice(routes, rows),
+        'Trip Status': rng.choice(statuses, rows),
+        'POD Status': rng.choice(['Yes', 'No'], rows),
+        'Freight Amount': money + 0.25 if float_money else money,
+        'Total Trip Expense': rng.integers(500, 20_000, rows),
+        'Net Profit': rng.integers(-5_000, 30_000, rows),
+        'Actual Distance (KM)': rng.integers(50, 2_000, rows).astype(np.float64),
+    })
+    if float_money:
+        frame.loc[::5, 'Freight Amount'] = np.nan
+    return frame
+
+
+@pytest.fixture
+def chunks():
+    rng = np.random.default_rng(7)
+    return [
+        make_chunk(rng, 40, ['VH001', 'VH002'], ['Pune→Delhi'], [ONGOING, CLOSED]),
+        # Later chunks bring float money (int column widened), new vehicles,
+        # a new route and the first Under Audit trips.
+        make_chunk(rng, 25, ['VH002', 'VH003'], ['Pune→Delhi', 'Surat→Goa'], STATUSES, float_money=True),
+        make_chunk(rng, 33, ['VH001', 'VH004'], ['Surat→Goa'], STATUSES),
+    ]
+
+
+@pytest.fixture
+def plain(chunks):
+    return pd.concat(chunks, ignore_index=True)
+
+
+@pytest.fixture
+def store(chunks, tmp_path):
+    with StoreWriter(str(tmp_path / 'store')) as writer:
+        for chunk in chunks:
+            writer.append(chunk)
+    return TripStore(str(tmp_path / 'store'))
+
+
+def test_store_matches_plain_frame(store, plain):
+    frame = store.frame()
+    assert frame['Freight Amount'].dtype == np.float64
+    assert frame['Net Profit'].dtype == plain['Net Profit'].dtype
+    assert sorted(frame['Vehicle ID'].cat.categories) == ['VH001', 'VH002', 'VH003', 'VH004']
+    # Plain arrays: the store's columns are np.memmap, which pandas compares by class.
+    loaded = pd.DataFrame({name: frame[name].astype(plain[name].dtype) if name in TEXT else np.array(frame[name])
+                           for name in frame.columns})
+    pd.testing.assert_frame_equal(loaded, plain)
+
+
+def expected_totals(frame):
+    status = frame['Trip Status']
+    return {
+        'total_trips': len(frame),
+        'ongoing': int((status == ONGOING).sum()),
+        'closed': int((status == CLOSED).sum()),
+        'flags': int((status == UNDER_AUDIT).sum()),
+        'resolved': int(((status == UNDER_AUDIT) & (frame['POD Status'] == 'Yes')).sum()),
+        'rev': frame['Freight Amount'].sum(),
+        'exp': frame['Total Trip Expense'].sum(),
+        'profit': frame['Net Profit'].sum(),
+        'kms': frame['Actual Distance (KM)'].sum(),
+    }
+
+
+def test_status_summary_matches_plain_frame(store, plain):
+    expected = expected_totals(plain)
+    summary = status_summary(store.frame())
+    assert summary['total'] == expected['total_trips']
+    assert {name: summary[name] for name in ('ongoing', 'closed', 'flags', 'resolved')} == \
+        {name: expected[name] for name in ('ongoing', 'closed', 'flags', 'resolved')}
+    assert summary['pod_yes'] == int((plain['POD Status'] == 'Yes').sum())
+    rows = np.flatnonzero(plain['Vehicle ID'] == 'VH003')
+    assert status_summary(store.frame(), rows)['total'] == len(rows)
+
+
+@pytest.mark.parametrize('vehicle,route', [
+    (None, None), ('VH001', None), ('VH003', None), ('VH004', None), (None, 'Surat→Goa'), ('VH002', 'Pune→Delhi'),
+])
+def test_chunked_cube_matches_plain_frame(store, plain, vehicle, route):
+    frame = store.frame()
+    cube = TripCube(frame, Calendar(frame['Trip Date']), chunk_rows=16)
+    selected = plain
+    if vehicle:
+        selected = selected[selected['Vehicle ID'] == vehicle]
+    if route:
+        selected = selected[selected['Route'] == route]
+
+    summary = cube.summary(vehicle, route, granularity='week' if vehicle else None)
+    expected = expected_totals(selected)
+    assert {name: summary[name] for name in expected} == pytest.approx(expected)
+
+    first, last = cube.calendar.span()
+    days = pd.date_range(pd.Timestamp(first, unit='D'), pd.Timestamp(last, unit='D'))
+    labels, daily = cube.daily(vehicle=vehicle, route=route)
+    assert labels == [day.strftime('%Y-%m-%d') for day in days]
+    assert daily == selected.groupby('Trip Date').size().reindex(days, fill_value=0).tolist()
+    audited = selected[selected['Trip Status'] == UNDER_AUDIT].groupby('Trip Date').size()
+    assert cube.daily(UNDER_AUDIT, vehicle, route)[1] == audited.reindex(days, fill_value=0).tolist()
+
+
+def test_cube_size_does_not_depend_on_chunking(store, plain):
+    frame = store.frame()
+    whole = TripCube(plain, Calendar(plain['Trip Date']))
+    chunked = TripCube(frame, Calendar(frame['Trip Date']), chunk_rows=7)
+    assert chunked.size == whole.size == plain.groupby(['Trip Date', 'Vehicle ID', 'Route']).ngroups
+    assert chunked.top_by_sum('vehicle', 'Net Profit') == whole.top_by_sum('vehicle', 'Net Profit')
+    for name in MEASURES:
+        assert chunked.sums[name].sum() == pytest.approx(plain[name].sum())
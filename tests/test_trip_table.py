@@ -0,0 +1,70 @@
+"""Sorted, cursor-paged trip tables."""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from trip_dataset import DatasetManager
+from trip_table import TripTable
+
+from conftest import ROOT
+
+FLEET = os.path.join(ROOT, 'fleet_50_entries.xlsx')
+CLOSURE = os.path.join(ROOT, 'Trip_Closure_Sheet_Oct2024_Mar2025.xlsx')
+
+
+@pytest.fixture
+def table():
+    df = pd.DataFrame({'Trip ID': [f"T{i:03d}" for i in range(23)],
+                       'Vehicle ID': [f"VH{i % 4}" for i in range(23)]})
+    return TripTable(df, 'tag1', ['Trip ID', 'Vehicle ID'])
+
+
+def walk(table, rows, **args):
+    """Rows of every page, following the next cursors from the first page."""
+    seen, cursor = [], None
+    while True:
+        page = table.page('all', rows, ['Trip ID', 'Vehicle ID'], MultiDict({**args, 'cursor': cursor or ''}))
+        seen.extend(page.rows.tolist())
+        if not page.next_cursor:
+            return seen, page
+        cursor = page.next_cursor
+
+
+def test_cursors_visit_every_row_once_in_order(table):
+    seen, last = walk(table, slice(None), sort='Vehicle ID', page_size='5')
+    expected = table.df.sort_values('Vehicle ID', kind='stable').index.tolist()
+    assert seen == expected
+    assert (last.number, last.pages, last.first, last.last) == (5, 5, 21, 23)
+
+    back = table.page('all', slice(None), ['Trip ID'], MultiDict({'page_size': '5', 'cursor': last.prev_cursor}))
+    assert back.number == 4
+
+
+def test_descending_pages_reverse_the_order(table):
+    seen, _ = walk(table, np.arange(10), sort='Trip ID', order='desc', page_size='4')
+    assert seen == list(range(9, -1, -1))
+
+
+def test_stale_or_bad_cursor_falls_back_to_page(table):
+    for cursor in ('other.10', 'garbage', 'tag1.x'):
+        page = table.page('all', slice(None), ['Trip ID'], MultiDict({'cursor': cursor, 'page': '2', 'page_size': '5'}))
+        assert page.offset == 5
+    past_end = table.page('all', slice(None), ['Trip ID'], MultiDict({'cursor': 'tag1.999', 'page_size': '5'}))
+    assert past_end.offset == 20
+
+
+def test_cursor_survives_workers_with_different_versions():
+    # Two workers on the same workbooks, one of which has reloaded more often.
+    first = DatasetManager(FLEET, CLOSURE, interval=0, shared=False)
+    second = DatasetManager(FLEET, CLOSURE, interval=0, shared=False)
+    second.reload(force=True)
+    a, b = first.current(), second.current()
+    assert a.version != b.version and a.tag == b.tag
+
+    args = MultiDict({'page_size': '10'})
+    cursor = a.table.page('all', slice(None), ['Trip ID'], args).next_cursor
+    page = b.table.page('all', slice(None), ['Trip ID'], MultiDict({'page_size': '10', 'cursor': cursor}))
+    assert page.offset == 10
@@ -0,0 +1,45 @@
+"""SQLite user accounts and duplicate-email signups."""
+import pytest
+
+from user_store import DuplicateEmail, UserStore
+
+
+@pytest.fixture
+def users(tmp_path):
+    return UserStore(str(tmp_path / 'users.db'))
+
+
+def test_add_and_get(users):
+    users.add('Sam', 'sam@example.com', 'hash', phone='555')
+    assert users.get('sam@example.com') == {'name': 'Sam', 'email': 'sam@example.com', 'password': 'hash',
+                                            'role': 'Owner', 'phone': '555'}
+    assert users.get('nobody@example.com') is None
+    assert len(users) == 1
+
+
+def test_duplicate_email_is_rejected(users):
+    users.add('Sam', 'sam@example.com', 'hash')
+    with pytest.raises(DuplicateEmail):
+        users.add('Other', 'sam@example.com', 'other')
+    assert users.get('sam@example.com')['name'] == 'Sam'
+    assert len(users) == 1
+
+
+def test_import_skips_registered_emails(users):
+    users.add('Sam', 'sam@example.com', 'hash')
+    users.import_users([{'name': 'Again', 'email': 'sam@example.com'},
+                        {'name': 'Kim', 'email': 'kim@example.com', 'role': None},
+                        {'name': 'No email'}])
+    assert len(users) == 2
+    assert users.get('sam@example.com')['name'] == 'Sam'
+    assert users.get('kim@example.com')['role'] == 'Owner'
+
+
+def test_duplicate_signup_returns_409(app_module):
+    client = app_module.app.test_client()
+    form = {'fullname': 'Sam', 'email': 'duplicate@example.com', 'password': 'pw-123456'}
+    assert client.post('/signup', data=form).status_code == 302
+    again = client.post('/signup', data={**form, 'fullname': 'Someone else'})
+    assert again.status_code == 409
+    assert b'Email already registered!' in again.data
+    assert app_module.users.get('duplicate@example.com')['name'] == 'Sam'
@@ -0,0 +1,123 @@
+"""Columnar on-disk cache for the trip workbooks.
+
+Parsing the .xlsx sheets with openpyxl is by far the slowest part of starting
+a worker, so each workbook is converted once into a NumPy ``.npz`` bundle
+(one typed array per column) and every later start reloads from that bundle.
+The bundle name carries the workbook's mtime, size and content hash, so an
+edited sheet is picked up automatically and stale bundles are removed.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+CACHE_DIR = os.environ.get('TRIP_CACHE_DIR')
+CACHE_VERSION = 1
+
+
+def workbook_key(path):
+    """Return the cache key for ``path``: mtime + size + content hash."""
+    st = os.stat(path)
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return f"v{CACHE_VERSION}-{st.st_mtime_ns:x}-{st.st_size:x}-{digest.hexdigest()[:16]}"
+
+
+def cache_dir_for(path):
+    return CACHE_DIR or os.path.join(os.path.dirname(os.path.abspath(path)), '.trip_cache')
+
+
+def cache_path(path, key=None):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir_for(path), f"{stem}.{key or workbook_key(path)}.npz")
+
+
+def _frame_to_arrays(frame):
+    arrays = {'__columns__': np.array([str(c) for c in frame.columns])}
+    kinds = []
+    for i, name in enumerate(frame.columns):
+        col = frame[name]
+        if pd.api.types.is_datetime64_any_dtype(col):
+            kinds.append('datetime')
+            arrays[f'c{i}'] = col.to_numpy()
+        elif pd.api.types.is_bool_dtype(col) or pd.api.types.is_numeric_dtype(col):
+            kinds.append('numeric')
+            arrays[f'c{i}'] = col.to_numpy()
+        else:
+            kinds.append('text')
+            missing = col.isna().to_numpy()
+            arrays[f'c{i}'] = col.where(~missing, '').astype(str).to_numpy(dtype=str)
+            arrays[f'm{i}'] = missing
+    arrays['__kinds__'] = np.array(kinds)
+    return arrays
+
+
+def _arrays_to_frame(bundle):
+    columns = bundle['__columns__'].tolist()
+    kinds = bundle['__kinds__'].tolist()
+    data = {}
+    for i, (name, kind) in enumerate(zip(columns, kinds)):
+        values = bundle[f'c{i}']
+        if kind == 'text':
+            series = pd.Series(values.astype(object))
+            data[name] = series.where(~bundle[f'm{i}'])
+        else:
+            data[name] = values
+    return pd.DataFrame(data, columns=columns)
+
+
+def _write_bundle(target, frame):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **_frame_to_arrays(frame))
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _remove_stale(path, keep):
+    directory = cache_dir_for(path)
+    stem = os.path.splitext(os.path.basename(path))[0] + '.'
+    for name in os.listdir(directory):
+        full = os.path.join(directory, name)
+        if name.startswith(stem) and name.endswith('.npz') and full != keep:
+            try:
+                os.remove(full)
+            except OSError:
+                pass
+
+
+def load_workbook(path, use_cache=True):
+    """Load ``path`` like ``pd.read_excel``, going through the columnar cache.
+
+    A cache that cannot be read or written (read-only volume, corrupt file)
+    is never fatal: the workbook is parsed directly instead.
+    """
+    if not use_cache:
+        return pd.read_excel(path)
+    target = cache_path(path)
+    if os.path.exists(target):
+        try:
+            with np.load(target, allow_pickle=False) as bundle:
+                return _arrays_to_frame(bundle)
+        except Exception as exc:
+            log.warning("Ignoring unreadable trip cache %s: %s", target, exc)
+
+    frame = pd.read_excel(path)
+    try:
+        _write_bundle(target, frame)
+        _remove_stale(path, keep=target)
+    except OSError as exc:
+        log.warning("Could not write trip cache %s: %s", target, exc)
+    return frame
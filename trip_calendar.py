@@ -0,0 +1,118 @@
+"""Date dimension for the trip sheets.
+
+``Calendar`` turns a frame's ``Trip Date`` column into int32 day ordinals once
+at load time and keeps the rows in date order, so a ``from``/``to`` range is
+two binary searches that yield a contiguous run of row positions. It also
+keeps the int32 week and month ordinal of every day between the first and
+last trip date, and ``Calendar.series`` buckets per-day values by calendar
+day, ISO week or month from those, so trips from different months no longer
+collapse into the same day-of-month bar.
+"""
+import numpy as np
+import pandas as pd
+
+MISSING = np.iinfo(np.int32).max
+GRANULARITIES = ('day', 'week', 'month')
+
+
+def day_ordinal(value):
+    """Days since 1970-01-01 for a date-like value."""
+    return int(np.datetime64(pd.Timestamp(value), 'D').astype(np.int64))
+
+
+def parse_range(args):
+    """``(start, end)`` day ordinals from ``from``/``to`` query args.
+
+    Raises ``ValueError`` for dates that cannot be parsed.
+    """
+    bounds = []
+    for name in ('from', 'to'):
+        value = args.get(name)
+        if value:
+            try:
+                bounds.append(day_ordinal(value))
+            except ValueError:
+                raise ValueError(f"Invalid '{name}' date: {value!r}") from None
+        else:
+            bounds.append(None)
+    return tuple(bounds)
+
+
+def pick_granularity(first, last, requested=None):
+    if requested in GRANULARITIES:
+        return requested
+    span = last - first + 1
+    return 'day' if span <= 62 else 'week' if span <= 366 else 'month'
+
+
+def bucket_ordinals(days, granularity):
+    """Week (Monday-based) or month ordinals of the day ordinals ``days``."""
+    if granularity == 'week':
+        return (days + 3) // 7  # 1970-01-01 was a Thursday; weeks start Monday
+    return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+
+class Calendar:
+    def __init__(self, dates):
+        values = pd.to_datetime(dates, errors='coerce').to_numpy(dtype='datetime64[D]')
+        missing = np.isnat(values)
+        day = values.astype(np.int64)
+        self.day = np.where(missing, MISSING, day).astype(np.int32)
+
+        self.order = np.argsort(self.day, kind='stable')
+        self.valid = int(len(values) - missing.sum())
+        self.sorted_day = self.day[self.order][:self.valid]
+        self.first = int(self.sorted_day[0]) if self.valid else None
+        self.last = int(self.sorted_day[-1]) if self.valid else None
+        # Week/month ordinal of each day from first to last, for bucketing series.
+        span = np.arange(self.first, self.last + 1) if self.valid else np.zeros(0, dtype=np.int64)
+        self.week = bucket_ordinals(span, 'week').astype(np.int32)
+        self.month = bucket_ordinals(span, 'month').astype(np.int32)
+
+    def span(self, start=None, end=None):
+        """The requested range clipped to the data's first/last trip date."""
+        first = self.first if start is None or self.first is None else max(start, self.first)
+        last = self.last if end is None or self.last is None else min(end, self.last)
+        return first, last
+
+    def positions(self, start=None, end=None):
+        """Positions of rows dated within [start, end], in date order."""
+        lo = 0 if start is None else int(np.searchsorted(self.sorted_day, start, 'left'))
+        hi = self.valid if end is None else int(np.searchsorted(self.sorted_day, end, 'right'))
+        return self.order[lo:max(lo, hi)]
+
+    def _buckets(self, first, last, granularity):
+        span = np.arange(first, last + 1)
+        if granularity == 'day':
+            return span
+        if self.first is not None and first >= self.first and last <= self.last:
+            ordinals = self.week if granularity == 'week' else self.month
+            return ordinals[first - self.first:last - self.first + 1]
+        return bucket_ordinals(span, granularity)
+
+    def series(self, days, weights, first, last, granularity=None):
+        """Sum ``weights`` per bucket of the day ordinals ``days`` in [first, last].
+
+        Returns ``(labels, values)``; buckets with no trips are kept as zeros so
+        the chart axis is continuous.
+        """
+        if first is None or last is None or last < first:
+            return [], []
+        granularity = pick_granularity(first, last, granularity)
+        keys = self._buckets(first, last, granularity)
+        bucket_keys, bucket_start, bucket_of_day = np.unique(keys, return_index=True, return_inverse=True)
+
+        inside = (days >= first) & (days <= last)
+        per_day = np.bincount(days[inside] - first, weights=None if weights is None else weights[inside],
+                              minlength=len(keys))
+        values = np.bincount(bucket_of_day.reshape(-1), weights=per_day, minlength=len(bucket_keys))
+
+        dates = (first + bucket_start).astype('datetime64[D]')
+        if granularity == 'month':
+            labels = [pd.Timestamp(d).strftime('%b %Y') for d in dates]
+        elif granularity == 'week':
+            mondays = (bucket_keys.astype(np.int64) * 7 - 3).astype('datetime64[D]')
+            labels = [f"Wk {pd.Timestamp(d).strftime('%d %b %Y')}" for d in mondays]
+        else:
+            labels = [str(d) for d in dates]
+        return labels, values
@@ -0,0 +1,194 @@
+"""Precomputed aggregate cube behind the ``/dashboard`` route.
+
+Trips are grouped once per dataset version by (trip date, Vehicle ID, Route),
+the dimensions the pages filter and rank by. Trip Status and POD Status are
+not dimensions: each cell carries its trip count per status the pages read
+and its resolved audits (Under Audit with POD Yes) as measures, next to the
+money/distance sums, so the number of cells is bounded by days x vehicles x
+routes however many trips there are. Every dashboard metric is a sum over
+cube cells, and each vehicle/route value keeps the positions of its cells, so
+a filter is answered by a couple of index lookups plus sums over a bounded
+number of cells instead of scans over every trip. The date is the leading
+dimension, so every cell list is in date order and a ``from``/``to`` range is
+a binary search. The unfiltered summary is computed once at build time. Cells
+are aggregated in fixed-size row chunks and then merged, so building the cube
+over a memory-mapped frame never materialises whole columns.
+"""
+import numpy as np
+import pandas as pd
+
+from trip_calendar import MISSING
+from trip_metrics import CLOSED, ONGOING, UNDER_AUDIT, codes_of, tally_by
+
+SERIES = ('labels', 'daily', 'audited')
+MEASURES = ('Freight Amount', 'Total Trip Expense', 'Net Profit', 'Actual Distance (KM)')
+# Per-cell trip counts by Trip Status; 'resolved' is Under Audit with POD Yes.
+STATUS_COUNTS = {'ongoing': ONGOING, 'closed': CLOSED, 'flags': UNDER_AUDIT}
+COUNTS = ('total_trips', *STATUS_COUNTS, 'resolved')
+CHUNK_ROWS = 1 << 18
+
+
+def _codes(series):
+    """``(codes, labels)``; missing values belong to the last label.
+
+    Categorical codes are used as they are (no copy) and keep -1 for missing,
+    which ``_fill`` maps onto the extra trailing label chunk by chunk.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.array.codes, list(series.cat.categories) + [None]
+    codes, labels = pd.factorize(series, use_na_sentinel=False)
+    return codes.astype(np.int64), list(labels)
+
+
+def _fill(codes, missing):
+    return np.where(codes < 0, missing, codes)
+
+
+class TripCube:
+    def __init__(self, df, calendar, chunk_rows=CHUNK_ROWS):
+        n = len(df)
+        vehicle, vehicle_labels = _codes(df['Vehicle ID'])
+        if 'Route' in df.columns:
+            route, route_labels = _codes(df['Route'])
+        else:
+            route, route_labels = np.zeros(n, dtype=np.int64), [None]
+        status, status_labels = codes_of(df['Trip Status'])
+        pod, pod_labels = codes_of(df['POD Status'])
+        # Day offsets from the first trip date; undated trips sort after the last day.
+        self.calendar = calendar
+        first = calendar.first if calendar.first is not None else 0
+        span = calendar.last - first + 1 if calendar.first is not None else 0
+        dims = tuple(max(d, 1) for d in (span + 1, len(vehicle_labels), len(route_labels)))
+
+        parts = []
+        for start in range(0, n, chunk_rows):
+            rows = slice(start, start + chunk_rows)
+            day = calendar.day[rows].astype(np.int64)
+            day = np.where(day == MISSING, span, day - first)
+            flat = np.ravel_multi_index((day, _fill(vehicle[rows], len(vehicle_labels) - 1),
+                                         _fill(route[rows], len(route_labels) - 1)), dims)
+            keys, inverse = np.unique(flat, return_inverse=True)
+            tallied = tally_by(inverse, len(keys), status[rows], status_labels, pod[rows], pod_labels)
+            counts = [tallied['total']] + [tallied[name] for name in COUNTS[1:]]
+            weights = [df[name].iloc[rows].fillna(0).to_numpy(dtype=np.float64) for name in MEASURES]
+            parts.append((keys, counts, [np.bincount(inverse, weights=w, minlength=len(keys)) for w in weights]))
+
+        if parts:
+            keys, inverse = np.unique(np.concatenate([p[0] for p in parts]), return_inverse=True)
+        else:
+            keys, inverse = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        cells = np.unravel_index(keys, dims)
+
+        self.size = len(keys)
+        day, self.vehicle, self.route = cells
+        self.day = first + day
+        self.counts = {
+            name: np.bincount(inverse, weights=np.concatenate([p[1][i] for p in parts]) if parts else None,
+                              minlength=self.size).astype(np.int64)
+            for i, name in enumerate(COUNTS)
+        }
+        self.count = self.counts['total_trips']
+        self.sums = {
+            name: np.bincount(inverse, weights=np.concatenate([p[2][i] for p in parts]) if parts else None,
+                              minlength=self.size).astype(np.float64)
+            for i, name in enumerate(MEASURES)
+        }
+        self.vehicle_cells = self._index(self.vehicle, vehicle_labels)
+        self.route_cells = self._index(self.route, route_labels)
+        self.labels = {'vehicle': vehicle_labels, 'route': route_labels}
+        # Labels that occur in the data (and are not the missing label), for rankings.
+        self._seen = {dim: (np.bincount(getattr(self, dim), weights=self.count, minlength=len(labels)) > 0)
+                      & np.array([not pd.isna(label) for label in labels], dtype=bool)
+                      for dim, labels in self.labels.items()}
+        self._overall = self._summarise(np.arange(self.size), *calendar.span())
+
+    @staticmethod
+    def _index(codes, labels):
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+        return {label: order[bounds[i]:bounds[i + 1]] for i, label in enumerate(labels)}
+
+    def cells(self, vehicle=None, route=None, start=None, end=None):
+        """Positions of the cells matching the filter (``None`` means all).
+
+        Positions are ascending and therefore in date order, so the date
+        range is cut out of them with two binary searches.
+        """
+        empty = np.empty(0, dtype=np.int64)
+        selected = np.arange(self.size)
+        if vehicle:
+            selected = self.vehicle_cells.get(vehicle, empty)
+        if route:
+            by_route = self.route_cells.get(route, empty)
+            selected = by_route if not vehicle else np.intersect1d(selected, by_route, assume_unique=True)
+        if start is not None or end is not None:
+            first, last = self.calendar.span(start, end)
+            if first is None:
+                return empty
+            days = self.day[selected]
+            lo, hi = np.searchsorted(days, first, 'left'), np.searchsorted(days, last, 'right')
+            selected = selected[lo:max(lo, hi)]
+        return selected
+
+    def _ranked(self, dim, cells, weights):
+        """``(labels, sums)`` of ``weights`` per ``dim`` label seen in the data, missing left out."""
+        labels, seen, codes = self.labels[dim], self._seen[dim], getattr(self, dim)
+        if cells is not None:
+            codes, weights = codes[cells], weights[cells]
+        sums = np.bincount(codes, weights=weights, minlength=len(labels))
+        return [label for label, keep in zip(labels, seen) if keep], sums[seen]
+
+    def top_by_sum(self, dim, measure, cells=None):
+        """Label of ``dim`` ('vehicle' or 'route') with the largest summed ``measure`` in ``cells``.
+
+        ``cells=None`` ranks over the whole cube.
+        """
+        labels, sums = self._ranked(dim, cells, self.sums[measure])
+        return labels[int(np.argmax(sums))] if labels else None
+
+    def most_common(self, dim, cells, n):
+        """Up to ``n`` labels of ``dim`` with the most trips in ``cells``."""
+        labels, counts = self._ranked(dim, cells, self.count)
+        order = np.argsort(-counts, kind='stable')
+        return [labels[i] for i in order[:n] if counts[i]]
+
+    def _series(self, cells, first, last, status=None, granularity=None):
+        weights = self.count
+        if status is not None:
+            name = next((name for name, label in STATUS_COUNTS.items() if label == status), None)
+            weights = self.counts[name] if name else np.zeros(self.size, dtype=np.int64)
+        labels, values = self.calendar.series(self.day[cells], weights[cells], first, last, granularity)
+        return labels, np.asarray(values).astype(int).tolist()
+
+    def daily(self, status=None, vehicle=None, route=None, start=None, end=None, granularity=None):
+        """``(labels, trips per bucket)``, optionally for one of the ``STATUS_COUNTS`` statuses."""
+        cells = self.cells(vehicle, route, start, end)
+        return self._series(cells, *self.calendar.span(start, end), status=status, granularity=granularity)
+
+    def summary(self, vehicle=None, route=None, start=None, end=None, granularity=None):
+        """All dashboard numbers for one vehicle/route/date filter."""
+        if not vehicle and not route and start is None and end is None and granularity is None:
+            return dict(self._overall)
+        cells = self.cells(vehicle, route, start, end)
+        return self._summarise(cells, *self.calendar.span(start, end), granularity=granularity)
+
+    def totals(self, cells=None):
+        """Trip counts and measure sums over ``cells`` (all if None), without the chart series."""
+        if cells is None:
+            return {name: value for name, value in self._overall.items() if name not in SERIES}
+        return {
+            **{name: int(counts[cells].sum()) for name, counts in self.counts.items()},
+            'rev': float(self.sums['Freight Amount'][cells].sum()),
+            'exp': float(self.sums['Total Trip Expense'][cells].sum()),
+            'profit': float(self.sums['Net Profit'][cells].sum()),
+            'kms': float(self.sums['Actual Distance (KM)'][cells].sum()),
+        }
+
+    def _summarise(self, cells, first, last, granularity=None):
+        labels, daily = self._series(cells, first, last, granularity=granularity)
+        return {
+            **self.totals(cells),
+            'labels': labels,
+            'daily': daily,
+            'audited': self._series(cells, first, last, UNDER_AUDIT, granularity)[1],
+        }
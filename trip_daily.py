@@ -0,0 +1,156 @@
+"""Per-calendar-day financial time series for the closure sheet.
+
+``DailySeries`` keeps revenue, expense, profit, KM and trip count for every
+calendar day between the first and last trip date, plus running (prefix)
+sums. Any window total is two lookups, a window's daily values are one
+slice, and rolling N-day sums come from prefix differences over the window
+only. When a reload only appends rows to the closure sheet, the new snapshot's
+series is the old one plus the new rows instead of a rebuild.
+"""
+import numpy as np
+import pandas as pd
+
+from trip_calendar import MISSING, Calendar
+
+FIELDS = {
+    'revenue': 'Freight Amount',
+    'expense': 'Total Trip Expense',
+    'profit': 'Net Profit',
+    'km': 'Actual Distance (KM)',
+}
+COMPARE_COLUMNS = ('Trip ID', 'Trip Date') + tuple(FIELDS.values())
+
+
+class DailySeries:
+    def __init__(self):
+        self.first = None
+        self.values = {name: np.zeros(0) for name in FIELDS}
+        self.values['trips'] = np.zeros(0)
+        self.undated = dict.fromkeys(self.values, 0.0)
+        self.rows = 0
+        self._prefix = None
+
+    @classmethod
+    def from_frame(cls, frame):
+        series = cls()
+        series.extend(frame)
+        return series
+
+    @property
+    def last(self):
+        return None if self.first is None else self.first + len(self.values['trips']) - 1
+
+    def copy(self):
+        other = DailySeries()
+        other.first = self.first
+        other.values = {name: values.copy() for name, values in self.values.items()}
+        other.undated = dict(self.undated)
+        other.rows = self.rows
+        return other
+
+    def _grow(self, first, last):
+        """Widen the day axis to cover [first, last]."""
+        if self.first is None:
+            self.first = first
+            for name in self.values:
+                self.values[name] = np.zeros(last - first + 1)
+            return
+        before = max(self.first - first, 0)
+        after = max(last - self.last, 0)
+        if before or after:
+            for name, values in self.values.items():
+                self.values[name] = np.pad(values, (before, after))
+            self.first -= before
+
+    def extend(self, frame):
+        """Add the closure rows in ``frame``; returns ``self``."""
+        day = Calendar(frame['Trip Date']).day.astype(np.int64)
+        dated = day != MISSING
+        weights = {name: frame[column].to_numpy(dtype=np.float64, na_value=0.0) for name, column in FIELDS.items()}
+        weights['trips'] = np.ones(len(frame))
+        if dated.any():
+            self._grow(int(day[dated].min()), int(day[dated].max()))
+            offsets = day[dated] - self.first
+            size = len(self.values['trips'])
+            for name, values in weights.items():
+                self.values[name] += np.bincount(offsets, weights=values[dated], minlength=size)
+        for name, values in weights.items():
+            self.undated[name] += float(values[~dated].sum())
+        self.rows += len(frame)
+        self._prefix = None
+        return self
+
+    def prefix(self, name):
+        if self._prefix is None:
+            self._prefix = {key: np.concatenate(([0.0], np.cumsum(values))) for key, values in self.values.items()}
+        return self._prefix[name]
+
+    def _bounds(self, start, end):
+        if self.first is None:
+            return 0, 0
+        lo = 0 if start is None else min(max(start - self.first, 0), len(self.values['trips']))
+        hi = len(self.values['trips']) if end is None else min(max(end - self.first + 1, 0), len(self.values['trips']))
+        return lo, max(lo, hi)
+
+    def total(self, name, start=None, end=None):
+        """Sum of ``name`` over [start, end]; an open range includes undated trips."""
+        lo, hi = self._bounds(start, end)
+        prefix = self.prefix(name)
+        total = prefix[hi] - prefix[lo]
+        if start is None and end is None:
+            total += self.undated[name]
+        return float(total)
+
+    def window(self, name, start=None, end=None):
+        """``(day ordinals, daily values)`` for [start, end]."""
+        lo, hi = self._bounds(start, end)
+        first = self.first or 0
+        return np.arange(first + lo, first + hi), self.values[name][lo:hi]
+
+    def rolling(self, name, days, start=None, end=None):
+        """Trailing ``days``-day sums for each day in [start, end]."""
+        lo, hi = self._bounds(start, end)
+        prefix = self.prefix(name)
+        ends = np.arange(lo, hi) + 1
+        return prefix[ends] - prefix[np.maximum(ends - days, 0)]
+
+    def last_days(self, n):
+        """``(start, end)`` of the last ``n`` calendar days of data."""
+        return (None, None) if self.last is None else (self.last - n + 1, self.last)
+
+    def month_to_date(self):
+        if self.last is None:
+            return None, None
+        month_start = np.datetime64(int(self.last), 'D').astype('datetime64[M]').astype('datetime64[D]')
+        return int(month_start.astype(np.int64)), self.last
+
+    def trip_days(self, n):
+        """Day ordinals of the last ``n`` days that have at least one trip."""
+        if self.first is None:
+            return np.zeros(0, dtype=np.int64)
+        return self.first + np.flatnonzero(self.values['trips'])[-n:]
+
+    def follow(self, old_frame, new_frame):
+        """Series for ``new_frame`` derived from this one (built for ``old_frame``).
+
+        If ``new_frame`` only appends rows to ``old_frame`` the new rows are
+        added to a copy; otherwise the series is rebuilt from scratch.
+        """
+        n = len(old_frame)
+        if self.rows == n and len(new_frame) >= n and all(
+                c in old_frame.columns and c in new_frame.columns for c in COMPARE_COLUMNS):
+            head = new_frame.iloc[:n]
+            if all(_same_values(head[c], old_frame[c]) for c in COMPARE_COLUMNS):
+                return self.copy().extend(new_frame.iloc[n:])
+        return DailySeries.from_frame(new_frame)
+
+
+def _same_values(a, b):
+    """``a`` and ``b`` hold equal values (missing values match each other).
+
+    Columns mapped from a shared store are categoricals whose categories grow
+    when rows are appended, so those compare by label rather than by code.
+    """
+    if isinstance(a.dtype, pd.CategoricalDtype) or isinstance(b.dtype, pd.CategoricalDtype):
+        return pd.Series(a.to_numpy(object)).equals(pd.Series(b.to_numpy(object)))
+    return a.equals(b)
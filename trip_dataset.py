@@ -0,0 +1,240 @@
+"""Versioned trip dataset snapshots with hot reload.
+
+The fleet and closure sheets are loaded into an immutable ``TripDataset``.
+``DatasetManager`` polls the workbooks in a background thread, builds a new
+snapshot off the request path when either file changes and then swaps it in
+with a single reference assignment. A request pins the snapshot it started
+with, so a reload never changes data underneath it.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from trip_cache import load_workbook
+from trip_calendar import Calendar
+from trip_cube import TripCube
+from trip_daily import DailySeries
+from trip_filter import ALL_ROWS, TripFilter
+from trip_metrics import as_categories, codes_of
+from trip_schema import ErrorLog, normalize
+from trip_shared import SHARED_DATASET, load_shared
+from trip_table import TripTable
+
+log = logging.getLogger(__name__)
+
+RELOAD_INTERVAL = float(os.environ.get('TRIP_RELOAD_INTERVAL', '5'))
+TABLE_COLUMNS = ('Trip ID', 'Vehicle ID', 'Trip Status', 'POD Status')
+
+
+def file_signature(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def derive_route(frame):
+    """Categorical ``Origin→Destination`` key, one string per distinct pair."""
+    origin, origin_labels = codes_of(frame['Origin'])
+    destination, destination_labels = codes_of(frame['Destination'])
+    width = len(destination_labels)
+    pair = np.where((origin >= 0) & (destination >= 0), origin * width + destination, -1)
+    keys, codes = np.unique(pair, return_inverse=True)
+    if len(keys) and keys[0] < 0:
+        keys, codes = keys[1:], codes - 1
+    labels = np.array([f"{origin_labels[k // width]}→{destination_labels[k % width]}" for k in keys], dtype=object)
+    # Sorted labels, like ``astype('category')``, so categories agree however the rows were chunked.
+    order = np.argsort(labels, kind='stable')
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    codes = np.where(codes < 0, -1, rank[codes] if len(rank) else -1)
+    return pd.Categorical.from_codes(codes.reshape(-1), categories=list(labels[order]))
+
+
+def prepare_frame(frame, errors=None):
+    """Normalise a raw sheet (or chunk of one) in place; schema errors go to ``errors``."""
+    frame.columns = frame.columns.str.strip()
+    normalize(frame, errors)
+    if 'Route' not in frame.columns and {'Origin', 'Destination'} <= set(frame.columns):
+        frame['Route'] = derive_route(frame)
+    return as_categories(frame)
+
+
+def snapshot_tag(version, signature):
+    """Identity of a snapshot that is stable across worker processes.
+
+    Workers number their reloads independently, so snapshots of the same
+    workbooks are named by the files' signature; only snapshots without one
+    (installed in memory) fall back to the local version.
+    """
+    if signature is None:
+        return f"v{version}"
+    return hashlib.sha1(repr(signature).encode()).hexdigest()[:16]
+
+
+class TripDataset:
+    """One immutable version of the fleet + closure data."""
+
+    def __init__(self, version, df, closure_df, signature, finance=None, schema_errors=None):
+        self.version = version
+        self.df = df
+        self.closure_df = closure_df
+        self.signature = signature
+        self.tag = snapshot_tag(version, signature)
+        self.schema_errors = schema_errors or {}
+        self.loaded_at = time.time()
+        self.vehicles = sorted(df['Vehicle ID'].dropna().unique())
+        self.routes = sorted(df['Route'].dropna().unique()) if 'Route' in df.columns else []
+        self.calendar = Calendar(df['Trip Date'])
+        self.closure_calendar = Calendar(closure_df['Trip Date'])
+        self.finance = finance if finance is not None else DailySeries.from_frame(closure_df)
+        self.cube = TripCube(df, self.calendar)
+        self.trips = TripFilter(df)
+        self.table = TripTable(df, self.tag, TABLE_COLUMNS)
+
+    def rows(self, vehicle=None, route=None, start=None, end=None):
+        """Row selector for vehicle/route plus a ``start``..``end`` day-ordinal range."""
+        rows = self.trips.rows(vehicle, route)
+        if start is None and end is None:
+            return rows
+        dated = np.sort(self.calendar.positions(start, end))
+        return dated if rows is ALL_ROWS else np.intersect1d(rows, dated, assume_unique=True)
+
+
+class DatasetManager:
+    """Owns the current ``TripDataset`` and replaces it when the sheets change."""
+
+    def __init__(self, fleet_file, closure_file, interval=RELOAD_INTERVAL, shared=SHARED_DATASET):
+        self.fleet_file = fleet_file
+        self.closure_file = closure_file
+        self.interval = interval
+        self.shared = shared
+        self.metrics = {
+            'version': 0,
+            'reloads': 0,
+            'reload_failures': 0,
+            'last_reload_seconds': None,
+            'last_swap_seconds': None,
+            'last_reload_at': None,
+            'schema_errors': 0,
+        }
+        self._listeners = []
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._current = None
+        self.reload(force=True)
+
+    def current(self):
+        return self._current
+
+    def signature(self):
+        return (file_signature(self.fleet_file), file_signature(self.closure_file))
+
+    def on_swap(self, callback):
+        """Register ``callback(old, new)`` to run after each snapshot swap."""
+        self._listeners.append(callback)
+        return callback
+
+    def _load(self, path, errors):
+        if self.shared:
+            return load_shared(path, prepare_frame, errors)
+        return prepare_frame(load_workbook(path), errors)
+
+    def _build(self, version, signature, previous=None):
+        schema_errors = {os.path.basename(path): ErrorLog() for path in (self.fleet_file, self.closure_file)}
+        df = self._load(self.fleet_file, schema_errors[os.path.basename(self.fleet_file)])
+        closure_df = self._load(self.closure_file, schema_errors[os.path.basename(self.closure_file)])
+        for name, errors in schema_errors.items():
+            if errors.count:
+                first = errors.errors[0]
+                log.warning("%s: %d schema problem(s), first at row %d (%s: %s)",
+                            name, errors.count, first.row, first.column, first.message)
+        finance = None
+        if previous is not None:
+            # Appended closure rows extend the previous daily series instead of rebuilding it.
+            finance = previous.finance.follow(previous.closure_df, closure_df)
+        return TripDataset(version, df, closure_df, signature, finance, schema_errors)
+
+    def reload(self, force=False):
+        """Rebuild the snapshot if the workbooks changed; return True on swap."""
+        with self._reload_lock:
+            old = self._current
+            signature = self.signature()
+            if not force and old is not None and signature == old.signature:
+                return False
+            started = time.perf_counter()
+            new = self._build(self.metrics['version'] + 1, signature, old)
+            if self.signature() != signature:
+                # A sheet is still being written; pick it up on the next poll.
+                return False
+            built = time.perf_counter()
+            self._current = new
+            swapped = time.perf_counter()
+
+            self.metrics.update(
+                version=new.version,
+                reloads=self.metrics['reloads'] + (old is not None),
+                last_reload_seconds=round(swapped - started, 6),
+                last_swap_seconds=round(swapped - built, 9),
+                last_reload_at=new.loaded_at,
+                schema_errors=sum(errors.count for errors in new.schema_errors.values()),
+            )
+        self._notify(old, new)
+        return True
+
+    def install(self, df, closure_df, signature=None):
+        """Swap in a snapshot of already prepared frames and return it.
+
+        For benchmarks and tests. A snapshot without a ``signature`` is
+        replaced by the workbooks again on the watcher's next poll.
+        """
+        with self._reload_lock:
+            old = self._current
+            new = TripDataset(self.metrics['version'] + 1, df, closure_df, signature)
+            self._current = new
+            self.metrics.update(version=new.version, reloads=self.metrics['reloads'] + 1,
+                                last_reload_at=new.loaded_at)
+        self._notify(old, new)
+        return new
+
+    def _notify(self, old, new):
+        for callback in self._listeners:
+            try:
+                callback(old, new)
+            except Exception:
+                log.exception("Dataset swap listener failed")
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if self.reload():
+                    log.info("Trip data reloaded as version %s in %.3fs",
+                             self.metrics['version'], self.metrics['last_reload_seconds'])
+            except Exception:
+                self.metrics['reload_failures'] += 1
+                log.exception("Trip data reload failed; keeping version %s", self.metrics['version'])
+
+    def start_watcher(self):
+        """Start polling the workbooks (no-op if disabled or already running)."""
+        if self.interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name='trip-data-watcher', daemon=True)
+        self._thread.start()
+
+    def stop_watcher(self, timeout=30):
+        """Stop polling and wait up to ``timeout`` seconds for a reload in progress.
+
+        Call it before forking: a child forked mid-reload inherits a held
+        ``_reload_lock`` and its first ``reload()`` would block forever.
+        """
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+            if thread.is_alive():
+                log.warning("Trip data watcher still reloading after %ss", timeout)
@@ -0,0 +1,77 @@
+"""Streaming CSV / Excel export of the trips behind a dashboard view.
+
+Rows are selected with the same vehicle/route/date filters as the dashboard
+plus an optional ``status``, then written out in fixed-size chunks. CSV chunks are yielded as they are produced; XLSX goes
+through openpyxl's write-only mode into a spooled temp file and is streamed
+from there, since a zip archive can only be sent once it is complete.
+"""
+import csv
+import io
+import tempfile
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+from trip_calendar import parse_range
+
+CHUNK_ROWS = 5000
+SPOOL_BYTES = 8 << 20
+
+
+class ExportError(ValueError):
+    pass
+
+
+def select_rows(data, args):
+    """Row positions matching the export filters in ``args``."""
+    try:
+        start, end = parse_range(args)
+    except ValueError as exc:
+        raise ExportError(str(exc)) from None
+    rows = data.rows(args.get('vehicle'), args.get('route'), start, end)
+    rows = np.arange(data.trips.size) if isinstance(rows, slice) else rows
+    status = args.get('status')
+    if status:
+        rows = np.intersect1d(rows, data.trips.with_status(status), assume_unique=True)
+    return rows
+
+
+def _chunks(df, rows, columns):
+    for i in range(0, len(rows), CHUNK_ROWS):
+        yield df.take(rows[i:i + CHUNK_ROWS])[columns]
+
+
+def iter_csv(df, rows):
+    columns = list(df.columns)
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(columns)
+    yield buffer.getvalue().encode('utf-8')
+    for chunk in _chunks(df, rows, columns):
+        yield chunk.to_csv(header=False, index=False).encode('utf-8')
+
+
+def _cell(value):
+    if value is None or value is pd.NaT or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def iter_xlsx(df, rows, block=1 << 16):
+    columns = list(df.columns)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Trips')
+    sheet.append(columns)
+    for chunk in _chunks(df, rows, columns):
+        for name in chunk.columns[chunk.dtypes == np.float32]:
+            # Via the shortest float32 repr, so 140.24 is written as 140.24 rather than 140.24000549.
+            chunk[name] = chunk[name].to_numpy().astype(str).astype(np.float64)
+        for record in chunk.itertuples(index=False, name=None):
+            sheet.append([_cell(v) for v in record])
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES) as out:
+        workbook.save(out)
+        out.seek(0)
+        for data in iter(lambda: out.read(block), b''):
+            yield data
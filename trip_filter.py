@@ -0,0 +1,50 @@
+"""Copy-free vehicle/route/status row selection over a trip frame.
+
+``TripFilter`` is built once per dataset version. It keeps the sorted row
+positions of every Vehicle ID, Route and Trip Status value. A filter resolves
+to either ``slice(None)`` (all rows, a plain view) or an array of row
+positions, which the exports and table pages index the frame with, so no
+intermediate DataFrame is built per request.
+"""
+import numpy as np
+import pandas as pd
+
+ALL_ROWS = slice(None)
+
+
+class TripFilter:
+    def __init__(self, df):
+        self.df = df
+        self.size = len(df)
+        self._codes = {}
+        self.vehicle_rows = self._positions('Vehicle ID')
+        self.route_rows = self._positions('Route') if 'Route' in df.columns else {}
+        self.status_rows = self._positions('Trip Status')
+
+    def codes(self, name):
+        """``(codes, labels)`` for a text column; labels sorted, NaN coded -1."""
+        if name not in self._codes:
+            codes, labels = pd.factorize(self.df[name], sort=True)
+            self._codes[name] = (codes, labels)
+        return self._codes[name]
+
+    def _positions(self, name):
+        codes, labels = self.codes(name)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+        return {label: order[bounds[i]:bounds[i + 1]] for i, label in enumerate(labels)}
+
+    def rows(self, vehicle=None, route=None):
+        """Row selector for the filter: ``ALL_ROWS`` or sorted positions."""
+        empty = np.empty(0, dtype=np.intp)
+        selected = ALL_ROWS
+        if vehicle:
+            selected = self.vehicle_rows.get(vehicle, empty)
+        if route:
+            by_route = self.route_rows.get(route, empty)
+            selected = by_route if selected is ALL_ROWS else np.intersect1d(selected, by_route, assume_unique=True)
+        return selected
+
+    def with_status(self, status):
+        """Sorted positions of the rows whose Trip Status is ``status``."""
+        return self.status_rows.get(status, np.empty(0, dtype=np.intp))
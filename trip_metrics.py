@@ -0,0 +1,77 @@
+"""Shared trip status counting.
+
+``Trip Status`` and ``POD Status`` are stored as categoricals at load time,
+so status/POD counts come from a single ``bincount`` over the combined
+(status, POD) codes instead of one boolean scan per number: ``status_summary``
+for a frame, and ``tally_by`` for the per-cell counts the cube builds the
+pages from.
+"""
+import numpy as np
+import pandas as pd
+
+STATUS_COLUMNS = ('Trip Status', 'POD Status')
+ONGOING = 'Pending Closure'
+CLOSED = 'Completed'
+UNDER_AUDIT = 'Under Audit'
+
+
+def as_categories(frame):
+    """Convert the status columns of ``frame`` to categoricals in place."""
+    for name in STATUS_COLUMNS:
+        if name in frame.columns and not isinstance(frame[name].dtype, pd.CategoricalDtype):
+            frame[name] = frame[name].astype('category')
+    return frame
+
+
+def codes_of(series):
+    """``(codes, labels)`` of a categorical (or any) column; NaN coded -1."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), list(series.cat.categories)
+    codes, labels = pd.factorize(series)
+    return codes, list(labels)
+
+
+def tally_by(groups, n_groups, status, status_labels, pod, pod_labels, weights=None):
+    """Status/POD counts per group from one ``bincount``.
+
+    ``groups`` holds each row's group code in ``[0, n_groups)`` (e.g. its cube
+    cell); every count comes back as an array of length ``n_groups``.
+    ``weights`` lets pre-aggregated rows count as many trips.
+    """
+    n_status, n_pod = len(status_labels) + 1, len(pod_labels) + 1
+    # -1 (missing) codes land in the extra last slot of each axis.
+    status = np.where(status < 0, n_status - 1, status)
+    combined = (groups * n_status + status) * n_pod + np.where(pod < 0, n_pod - 1, pod)
+    grid = np.bincount(combined, weights=weights, minlength=n_groups * n_status * n_pod)
+    grid = grid.astype(np.int64).reshape(n_groups, n_status, n_pod)
+    none = np.zeros(n_groups, dtype=np.int64)
+
+    def status_count(label, pod_label=None):
+        if label not in status_labels:
+            return none
+        i = status_labels.index(label)
+        if pod_label is None:
+            return grid[:, i].sum(axis=1)
+        return grid[:, i, pod_labels.index(pod_label)] if pod_label in pod_labels else none
+
+    return {
+        'total': grid.sum(axis=(1, 2)),
+        'ongoing': status_count(ONGOING),
+        'closed': status_count(CLOSED),
+        'flags': status_count(UNDER_AUDIT),
+        'resolved': status_count(UNDER_AUDIT, 'Yes'),
+        'pod_yes': grid[:, :, pod_labels.index('Yes')].sum(axis=1) if 'Yes' in pod_labels else none,
+    }
+
+
+def tally(status, status_labels, pod, pod_labels, weights=None):
+    """Status/POD counts of all rows, from one ``bincount``."""
+    counts = tally_by(np.zeros(len(status), dtype=np.int64), 1, status, status_labels, pod, pod_labels, weights)
+    return {name: int(values[0]) for name, values in counts.items()}
+
+
+def status_summary(frame, rows=slice(None)):
+    """Trip status and POD counts of ``frame`` (optionally only ``rows``)."""
+    status, status_labels = codes_of(frame['Trip Status'])
+    pod, pod_labels = codes_of(frame['POD Status'])
+    return tally(status[rows], status_labels, pod[rows], pod_labels)
@@ -0,0 +1,160 @@
+"""Column schema of the 30-column trip sheet and compact dtypes at load time.
+
+``pd.read_excel`` leaves every text column as Python strings and every
+amount as int64/float64. ``normalize`` applies ``SCHEMA`` instead:
+
+* IDs, statuses and other repeated labels become categoricals; ``Trip ID``
+  is unique per row, so it stays a string column, where codes would only
+  add to it.
+* Amounts in whole rupees become int32. Amounts with paise stay float64:
+  float32 cannot hold two-decimal values exactly, and int64 paise would be
+  no smaller than float64.
+* Distances and fuel become int32 when they are whole numbers and float32
+  otherwise.
+
+Values that cannot be converted become missing and are reported, together
+with missing required fields and unknown statuses, as one ``SchemaError``
+per cell with its spreadsheet row number.
+"""
+import collections
+
+import numpy as np
+import pandas as pd
+
+from trip_metrics import CLOSED, ONGOING, UNDER_AUDIT
+
+CATEGORY, TEXT, DATE, MONEY, MEASURE = 'category', 'text', 'date', 'money', 'measure'
+
+SCHEMA = {
+    'Trip ID': TEXT,
+    'Trip Date': DATE,
+    'Vehicle ID': CATEGORY,
+    'Driver ID': CATEGORY,
+    'Planned Distance (KM)': MEASURE,
+    'Actual Distance (KM)': MEASURE,
+    'Actual Delivery Date': DATE,
+    'Trip Delay Reason': CATEGORY,
+    'Advance Given': MONEY,
+    'Fuel Quantity (L)': MEASURE,
+    'Fuel Rate': MEASURE,
+    'Fuel Cost': MONEY,
+    'Toll Charges': MONEY,
+    'Food Expense': MONEY,
+    'Lodging Expense': MONEY,
+    'Miscellaneous Expense': MONEY,
+    'Maintenance Cost': MONEY,
+    'Loading Charges': MONEY,
+    'Unloading Charges': MONEY,
+    'Penalty/Fine': MONEY,
+    'Total Trip Expense': MONEY,
+    'Freight Amount': MONEY,
+    'Incentives': MONEY,
+    'Net Profit': MONEY,
+    'Payment Mode': CATEGORY,
+    'POD Status': CATEGORY,
+    'Origin': CATEGORY,
+    'Destination': CATEGORY,
+    'Vehicle Type': CATEGORY,
+    'Trip Status': CATEGORY,
+}
+REQUIRED = ('Trip ID', 'Trip Date', 'Vehicle ID')
+ALLOWED = {
+    'Trip Status': {ONGOING, CLOSED, UNDER_AUDIT},
+    'POD Status': {'Yes', 'No'},
+}
+NON_NEGATIVE = ('Planned Distance (KM)', 'Actual Distance (KM)', 'Fuel Quantity (L)', 'Fuel Rate')
+HEADER_ROWS = 1
+
+SchemaError = collections.namedtuple('SchemaError', 'row column value message')
+
+
+class ErrorLog:
+    """Collects schema errors; keeps the first ``limit`` but counts them all."""
+
+    def __init__(self, limit=1000):
+        self.limit = limit
+        self.count = 0
+        self.errors = []
+
+    def add(self, rows, column, values, message):
+        """Record ``message`` for each spreadsheet row in ``rows``."""
+        self.count += len(rows)
+        room = self.limit - len(self.errors)
+        for row, value in list(zip(rows, values))[:max(room, 0)]:
+            value = value.item() if isinstance(value, np.generic) else value
+            self.errors.append(SchemaError(int(row), column, value if value is None else str(value), message))
+
+    def extend(self, other):
+        self.count += other.count
+        self.errors.extend(other.errors[:max(self.limit - len(self.errors), 0)])
+
+    def as_dict(self):
+        return {'count': self.count, 'errors': [error._asdict() for error in self.errors]}
+
+    @classmethod
+    def from_dict(cls, data, limit=1000):
+        log = cls(limit)
+        log.count = data.get('count', 0)
+        log.errors = [SchemaError(**error) for error in data.get('errors', [])][:limit]
+        return log
+
+
+def _sheet_rows(frame, mask):
+    """Spreadsheet row numbers (header is row 1) of the rows selected by ``mask``."""
+    return frame.index.to_numpy()[mask] + HEADER_ROWS + 1
+
+
+def _report(errors, frame, name, mask, values, message):
+    mask = np.asarray(mask, dtype=bool)
+    if errors is not None and mask.any():
+        errors.add(_sheet_rows(frame, mask), name, np.asarray(values, dtype=object)[mask], message)
+
+
+def _number(frame, name, errors):
+    raw = frame[name]
+    if not pd.api.types.is_numeric_dtype(raw):
+        values = pd.to_numeric(raw, errors='coerce')
+        _report(errors, frame, name, values.isna() & raw.notna(), raw, 'not a number')
+        raw = values
+    return raw.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def compact_number(values, fractional):
+    """int32 for whole numbers in range without gaps, else ``fractional``."""
+    finite = np.isfinite(values)
+    info = np.iinfo(np.int32)
+    if finite.all() and (values == np.round(values)).all() \
+            and (len(values) == 0 or (values.min() >= info.min and values.max() <= info.max)):
+        return values.astype(np.int32)
+    return values.astype(fractional)
+
+
+def normalize(frame, errors=None):
+    """Convert the columns of ``frame`` named in ``SCHEMA`` in place; returns it.
+
+    ``errors`` is an ``ErrorLog`` (or None) that receives every problem found.
+    """
+    for name in REQUIRED:
+        if name in frame.columns:
+            missing = frame[name].isna().to_numpy()
+            _report(errors, frame, name, missing, [None] * len(frame), 'missing')
+    for name, kind in SCHEMA.items():
+        if name not in frame.columns:
+            continue
+        raw = frame[name]
+        if kind == DATE:
+            values = pd.to_datetime(raw, errors='coerce')
+            _report(errors, frame, name, values.isna() & raw.notna(), raw, 'not a date')
+            frame[name] = values
+        elif kind in (MONEY, MEASURE):
+            values = _number(frame, name, errors)
+            if name in NON_NEGATIVE:
+                _report(errors, frame, name, values < 0, raw, 'negative value')
+            frame[name] = compact_number(values, np.float64 if kind == MONEY else np.float32)
+        elif kind == CATEGORY and not isinstance(raw.dtype, pd.CategoricalDtype):
+            frame[name] = raw.astype('category')
+        if name in ALLOWED:
+            present = frame[name].notna().to_numpy()
+            unknown = present & ~frame[name].isin(ALLOWED[name]).to_numpy()
+            _report(errors, frame, name, unknown, frame[name].astype(object), 'unknown value')
+    return frame
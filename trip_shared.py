@@ -0,0 +1,85 @@
+"""Trip frames shared by all worker processes through memory-mapped files.
+
+In shared mode the first worker to load a workbook streams the prepared
+sheet into a ``TripStore`` under the trip cache directory; every worker
+(including that one) then maps the store read-only and wraps it in a
+DataFrame without copying. Numbers and dates are used in place, and text
+columns are stored as categorical codes, so the column data sits once in the
+OS page cache no matter how many gunicorn/waitress workers serve it. Only
+the category labels and the per-snapshot indexes are private to each worker.
+"""
+import logging
+import os
+import shutil
+
+from trip_cache import cache_dir_for, workbook_key
+from trip_schema import ErrorLog
+from trip_store import STORE_VERSION, StoreWriter, TripStore, read_chunks
+
+try:
+    import fcntl
+except ImportError:  # Windows: concurrent first loads may build twice.
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+SHARED_DATASET = os.environ.get('TRIP_SHARED_DATASET', '').lower() in ('1', 'true', 'yes')
+# Bumped when ``prepare_frame`` changes the columns it writes, so older stores are rebuilt.
+PREPARED_VERSION = 2
+
+
+def shared_path(path, key=None):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir_for(path), f"{stem}.{key or workbook_key(path)}.s{STORE_VERSION}p{PREPARED_VERSION}.cols")
+
+
+def _remove_stale(path, keep):
+    directory = cache_dir_for(path)
+    stem = os.path.splitext(os.path.basename(path))[0] + '.'
+    for name in os.listdir(directory):
+        full = os.path.join(directory, name)
+        if not name.startswith(stem) or full in (keep, keep + '.lock'):
+            continue
+        if name.endswith('.cols'):
+            # Workers still mapping the old files keep them until they unmap.
+            shutil.rmtree(full, ignore_errors=True)
+        elif name.endswith('.cols.lock'):
+            try:
+                os.remove(full)
+            except OSError:
+                pass
+
+
+def _publish(path, target, prepare):
+    errors = ErrorLog()
+    with StoreWriter(target) as writer:
+        for chunk in read_chunks(path):
+            writer.append(prepare(chunk, errors))
+        writer.meta['schema_errors'] = errors.as_dict()
+
+
+def load_shared(path, prepare, errors=None):
+    """The sheet at ``path`` with ``prepare(chunk, errors)`` applied, built once and mapped by every worker.
+
+    Schema errors found by whichever process built the store are kept with
+    it and added to ``errors`` in every worker.
+    """
+    target = shared_path(path)
+    if not os.path.isdir(target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target + '.lock', 'w') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            if not os.path.isdir(target):
+                try:
+                    _publish(path, target, prepare)
+                except OSError:
+                    if not os.path.isdir(target):
+                        raise
+                    # Another process (without flock) published the same key first.
+                _remove_stale(path, keep=target)
+                log.info("Published shared trip columns %s", target)
+    store = TripStore(target)
+    if errors is not None:
+        errors.extend(ErrorLog.from_dict(store.meta.get('schema_errors', {})))
+    return store.frame()
@@ -0,0 +1,285 @@
+"""Memory-mapped columnar trip store.
+
+A store is a directory holding one raw typed file per column plus
+``schema.json``. Numbers and dates are fixed-width arrays; text columns are
+dictionary-encoded as integer codes, with their sorted labels in a ``.npy``
+file next to them. Every file is opened with ``np.memmap``, so the OS pages
+column data in and out on demand and a store can be far larger than RAM.
+
+``StoreWriter`` builds a store chunk by chunk, and ``build_store`` streams a
+workbook or CSV through it, so the source never has to fit in memory either.
+``TripStore.frame`` wraps the mapped columns in a read-only DataFrame without
+copying them.
+"""
+import itertools
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+STORE_VERSION = 1
+CHUNK_ROWS = 1 << 18
+
+
+def code_dtype(n_labels):
+    """Smallest code type pandas uses for ``n_labels`` categories, so codes map without a copy."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_labels < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _sorted_labels(labels):
+    try:
+        return sorted(labels)
+    except TypeError:
+        return sorted(labels, key=str)
+
+
+def _label_array(labels):
+    values = np.asarray(labels)
+    return values.astype(str) if values.dtype == object else values
+
+
+class StoreWriter:
+    """Append DataFrame chunks into a new store at ``directory``.
+
+    Column kinds and types come from the first chunk; numeric columns are
+    widened (e.g. int to float) if a later chunk needs it. ``meta`` is saved
+    in the schema as JSON. The store only appears at ``directory`` once
+    ``close`` has written its schema.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        parent = os.path.dirname(os.path.abspath(directory))
+        os.makedirs(parent, exist_ok=True)
+        self._tmp = tempfile.mkdtemp(dir=parent, suffix='.tmp')
+        self.rows = 0
+        self.columns = None
+        self.meta = {}
+        self._labels = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _path(self, entry):
+        return os.path.join(self._tmp, entry['file'])
+
+    def _start(self, frame):
+        self.columns = []
+        for i, name in enumerate(frame.columns):
+            col = frame.iloc[:, i]
+            entry = {'name': str(name), 'file': f"c{i}.bin"}
+            if isinstance(col.dtype, pd.CategoricalDtype):
+                entry.update(kind='dict', dtype='int32', ordered=bool(col.cat.ordered))
+            elif pd.api.types.is_datetime64_any_dtype(col):
+                entry.update(kind='array', dtype=str(col.dtype))
+            elif pd.api.types.is_bool_dtype(col) or pd.api.types.is_numeric_dtype(col):
+                entry.update(kind='array', dtype=str(col.to_numpy().dtype))
+            else:
+                entry.update(kind='dict', dtype='int32', ordered=False)
+            if entry['kind'] == 'dict':
+                self._labels[entry['name']] = {}
+            self.columns.append(entry)
+            open(self._path(entry), 'wb').close()
+
+    def _encode(self, entry, col):
+        if entry['kind'] == 'dict':
+            if isinstance(col.dtype, pd.CategoricalDtype):
+                codes, labels = col.array.codes, col.cat.categories
+            else:
+                codes, labels = pd.factorize(col)
+            known = self._labels[entry['name']]
+            lookup = np.array([known.setdefault(label, len(known)) for label in labels], dtype=np.int32)
+            out = np.full(len(col), -1, dtype=np.int32)
+            present = codes >= 0
+            out[present] = lookup[codes[present]]
+            return out
+        if col.dtype == object and col.isna().all():
+            values = np.full(len(col), np.nan)
+        else:
+            values = col.to_numpy()
+        dtype = np.dtype(entry['dtype'])
+        if dtype.kind not in 'Mm':
+            wider = np.result_type(dtype, values.dtype)
+            if wider != dtype:
+                self._widen(entry, wider)
+                dtype = wider
+        return values.astype(dtype, copy=False)
+
+    def _widen(self, entry, dtype):
+        """Rewrite an already written numeric column as ``dtype``."""
+        source = self._path(entry)
+        target = source + '.widen'
+        old = np.dtype(entry['dtype'])
+        if self.rows:
+            mapped = np.memmap(source, dtype=old, mode='r', shape=(self.rows,))
+            with open(target, 'wb') as f:
+                for start in range(0, self.rows, CHUNK_ROWS):
+                    mapped[start:start + CHUNK_ROWS].astype(dtype).tofile(f)
+            del mapped
+            os.replace(target, source)
+        entry['dtype'] = str(dtype)
+
+    def append(self, frame):
+        if self.columns is None:
+            self._start(frame)
+        if [str(c) for c in frame.columns] != [e['name'] for e in self.columns]:
+            raise ValueError("Chunk columns do not match the store's columns")
+        for i, entry in enumerate(self.columns):
+            values = self._encode(entry, frame.iloc[:, i])
+            with open(self._path(entry), 'ab') as f:
+                values.tofile(f)
+        self.rows += len(frame)
+
+    def _finish_dict(self, entry):
+        """Sort the labels, renumber the codes and shrink them to ``code_dtype``."""
+        known = self._labels[entry['name']]
+        labels = list(known) if entry['ordered'] else _sorted_labels(known)
+        remap = np.empty(len(labels), dtype=np.int64)
+        remap[[known[label] for label in labels]] = np.arange(len(labels))
+        dtype = code_dtype(len(labels))
+        source = self._path(entry)
+        target = source + '.codes'
+        if self.rows:
+            codes = np.memmap(source, dtype=np.int32, mode='r', shape=(self.rows,))
+            with open(target, 'wb') as f:
+                for start in range(0, self.rows, CHUNK_ROWS):
+                    chunk = codes[start:start + CHUNK_ROWS]
+                    np.where(chunk < 0, -1, remap[chunk]).astype(dtype).tofile(f)
+            del codes
+            os.replace(target, source)
+        entry['dtype'] = str(dtype)
+        entry['labels'] = entry['file'].replace('.bin', '.labels.npy')
+        np.save(os.path.join(self._tmp, entry['labels']), _label_array(labels), allow_pickle=False)
+
+    def close(self):
+        if self.columns is None:
+            raise ValueError("Cannot write a store without any chunks")
+        for entry in self.columns:
+            if entry['kind'] == 'dict':
+                self._finish_dict(entry)
+        with open(os.path.join(self._tmp, 'schema.json'), 'w') as f:
+            json.dump({'version': STORE_VERSION, 'rows': self.rows, 'columns': self.columns, 'meta': self.meta}, f)
+        try:
+            os.rename(self._tmp, self.directory)
+        except OSError:
+            self.abort()
+            raise
+
+    def abort(self):
+        shutil.rmtree(self._tmp, ignore_errors=True)
+
+
+class TripStore:
+    """Read-only view of a store directory; columns are mapped lazily."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, 'schema.json')) as f:
+            schema = json.load(f)
+        if schema.get('version') != STORE_VERSION:
+            raise ValueError(f"Unsupported trip store version in {directory}")
+        self.rows = schema['rows']
+        self.meta = schema.get('meta', {})
+        self.columns = [entry['name'] for entry in schema['columns']]
+        self._entries = {entry['name']: entry for entry in schema['columns']}
+        self._maps = {}
+
+    def column(self, name):
+        """The mapped values of ``name`` (codes for a text column)."""
+        if name not in self._maps:
+            entry = self._entries[name]
+            dtype = np.dtype(entry['dtype'])
+            if self.rows:
+                values = np.memmap(os.path.join(self.directory, entry['file']), dtype=dtype, mode='r',
+                                   shape=(self.rows,))
+            else:
+                values = np.empty(0, dtype=dtype)
+            self._maps[name] = values
+        return self._maps[name]
+
+    def labels(self, name):
+        """Sorted labels of a text column, or None for numeric columns."""
+        entry = self._entries[name]
+        if entry['kind'] != 'dict':
+            return None
+        return np.load(os.path.join(self.directory, entry['labels']), allow_pickle=False)
+
+    def series(self, name):
+        values = self.column(name)
+        entry = self._entries[name]
+        if entry['kind'] == 'dict':
+            categories = pd.Index(self.labels(name))
+            values = pd.Categorical.from_codes(values, categories=categories, ordered=entry['ordered'],
+                                               validate=False)
+        return pd.Series(values, name=name, copy=False)
+
+    def frame(self):
+        """All columns as a DataFrame backed by the mapped files (no copies)."""
+        return pd.DataFrame({name: self.series(name) for name in self.columns}, columns=self.columns,
+                            copy=False)
+
+    def chunks(self, size=CHUNK_ROWS):
+        for start in range(0, self.rows, size):
+            yield slice(start, min(start + size, self.rows))
+
+
+def _trim_trailing_blank(rows):
+    """Drop empty rows at the end of a sheet, like ``pd.read_excel``."""
+    blank = []
+    for row in rows:
+        if all(v is None for v in row):
+            blank.append(row)
+            continue
+        yield from blank
+        blank.clear()
+        yield row
+
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Yield the first sheet of a workbook (or a CSV file) as DataFrame chunks.
+
+    Chunks are indexed by data row position across the whole sheet.
+    """
+    if path.lower().endswith('.csv'):
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+        return
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [f"Unnamed: {i}" if h is None else h for i, h in enumerate(header)]
+        rows = _trim_trailing_blank(rows)
+        offset = 0
+        while True:
+            batch = list(itertools.islice(rows, chunk_rows))
+            if batch or not offset:
+                yield pd.DataFrame(batch, columns=header, index=pd.RangeIndex(offset, offset + len(batch)))
+            if not batch:
+                break
+            offset += len(batch)
+    finally:
+        workbook.close()
+
+
+def build_store(path, directory, prepare=None, chunk_rows=CHUNK_ROWS):
+    """Stream ``path`` into a new store at ``directory``, applying ``prepare`` per chunk."""
+    with StoreWriter(directory) as writer:
+        for chunk in read_chunks(path, chunk_rows):
+            writer.append(prepare(chunk) if prepare else chunk)
+    return TripStore(directory)
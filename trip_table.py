@@ -0,0 +1,102 @@
+"""Paginated, sortable slices of the trip table pages.
+
+``TripTable`` is built once per dataset version. For each sortable column it
+keeps the stable ascending row order plus its inverse (the rank of every
+row). A page request sorts its base row set by those ranks once (the result
+is cached per row set and column), then only the requested slice is turned
+into HTML, so page cost does not grow with the number of trips. Cursors
+carry the snapshot's cross-process tag (``TripDataset.tag``), so a cursor
+from one worker stays valid on any other worker serving the same data.
+"""
+import threading
+
+import numpy as np
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class Page:
+    def __init__(self, rows, offset, page_size, total, sort, descending, tag):
+        self.rows = rows
+        self.offset = offset
+        self.page_size = page_size
+        self.total = total
+        self.sort = sort
+        self.descending = descending
+        self.number = offset // page_size + 1
+        self.pages = max((total + page_size - 1) // page_size, 1)
+        self.first = offset + 1 if total else 0
+        self.last = offset + len(rows)
+        self.next_cursor = encode_cursor(tag, self.last) if self.last < total else None
+        self.prev_cursor = encode_cursor(tag, max(offset - page_size, 0)) if offset else None
+
+
+def encode_cursor(tag, offset):
+    return f"{tag}.{offset}"
+
+
+def decode_cursor(cursor, tag):
+    """Offset stored in ``cursor``, or None if it is malformed or stale."""
+    try:
+        cursor_tag, offset = cursor.split('.')
+        if cursor_tag == tag:
+            return max(int(offset), 0)
+    except (AttributeError, ValueError):
+        pass
+    return None
+
+
+class TripTable:
+    def __init__(self, df, tag, columns=()):
+        self.df = df
+        self.tag = tag
+        self._ranks = {}
+        self._sorted = {}
+        self._lock = threading.Lock()
+        for column in columns:
+            self.ranks(column)
+
+    def ranks(self, column):
+        """Rank of every row when the frame is stably sorted by ``column``."""
+        ranks = self._ranks.get(column)
+        if ranks is None:
+            values = self.df[column].reset_index(drop=True)
+            order = values.sort_values(kind='stable', na_position='last').index.to_numpy()
+            ranks = np.empty(len(order), dtype=np.int64)
+            ranks[order] = np.arange(len(order))
+            with self._lock:
+                self._ranks[column] = ranks
+        return ranks
+
+    def sorted_rows(self, name, rows, column):
+        """``rows`` ordered by ``column``; cached under ``(name, column)``."""
+        key = (name, column)
+        ordered = self._sorted.get(key)
+        if ordered is None:
+            rows = np.arange(len(self.df)) if isinstance(rows, slice) else rows
+            ordered = rows[np.argsort(self.ranks(column)[rows], kind='stable')] if column else rows
+            with self._lock:
+                self._sorted[key] = ordered
+        return ordered
+
+    def page(self, name, rows, columns, args):
+        """Pick the page described by request ``args`` out of ``rows``."""
+        sort = args.get('sort') if args.get('sort') in columns else None
+        descending = args.get('order') == 'desc'
+        page_size = min(max(args.get('page_size', DEFAULT_PAGE_SIZE, type=int) or DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+        ordered = self.sorted_rows(name, rows, sort)
+        total = len(ordered)
+
+        offset = decode_cursor(args.get('cursor'), self.tag)
+        if offset is None:
+            offset = (max(args.get('page', 1, type=int) or 1, 1) - 1) * page_size
+        last_page_start = max((total - 1) // page_size, 0) * page_size
+        offset = min(offset, last_page_start)
+
+        if descending:
+            stop = total - offset
+            selected = ordered[max(stop - page_size, 0):stop][::-1]
+        else:
+            selected = ordered[offset:offset + page_size]
+        return Page(selected, offset, page_size, total, sort, descending, self.tag)
@@ -0,0 +1,87 @@
+"""SQLite-backed user accounts shared by the signup and login entry points.
+
+Users used to live in a Python list (searched linearly on every login) or in
+a JSON file rewritten in full on every signup, which loses accounts when two
+signups race. Here every account is a row in a SQLite table with a unique
+index on ``email``, so a lookup is one B-tree probe and a duplicate signup
+fails atomically inside the database instead of in application code. The
+database runs in WAL mode, so logins keep reading while a signup commits,
+and every query is a fixed parameterised statement that ``sqlite3`` prepares
+once per connection and reuses.
+
+Connections are per thread (and per process, so a store created before a
+fork is safe to use in the workers).
+"""
+import os
+import sqlite3
+import threading
+
+USER_DB = os.environ.get('USER_DB', 'users.db')
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        email TEXT NOT NULL,
+        password TEXT,
+        role TEXT NOT NULL DEFAULT 'Owner',
+        phone TEXT
+    )""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS users_email ON users (email)",
+)
+FIELDS = ('name', 'email', 'password', 'role', 'phone')
+
+INSERT = "INSERT INTO users (name, email, password, role, phone) VALUES (?, ?, ?, ?, ?)"
+SELECT = "SELECT name, email, password, role, phone FROM users WHERE email = ?"
+COUNT = "SELECT COUNT(*) FROM users"
+
+
+class DuplicateEmail(ValueError):
+    """Raised by ``UserStore.add`` when the email is already registered."""
+
+
+class UserStore:
+    """User accounts in the SQLite database at ``path``."""
+
+    def __init__(self, path=USER_DB, timeout=30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._connection() as conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+
+    def _connection(self):
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.timeout, cached_statements=16)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            local.conn, local.pid = conn, os.getpid()
+        return local.conn
+
+    def add(self, name, email, password, role='Owner', phone=None):
+        """Register a user; ``password`` is the already hashed password."""
+        try:
+            with self._connection() as conn:
+                conn.execute(INSERT, (name, email, password, role, phone))
+        except sqlite3.IntegrityError:
+            raise DuplicateEmail(email) from None
+
+    def get(self, email):
+        """The user registered with ``email`` as a dict, or None."""
+        row = self._connection().execute(SELECT, (email,)).fetchone()
+        return dict(zip(FIELDS, row)) if row else None
+
+    def import_users(self, users):
+        """Add user dicts that are not registered yet (e.g. from an old JSON file)."""
+        rows = [(u.get('name', ''), u['email'], u.get('password'), u.get('role') or 'Owner', u.get('phone'))
+                for u in users if u.get('email')]
+        with self._connection() as conn:
+            conn.executemany(INSERT.replace('INSERT', 'INSERT OR IGNORE', 1), rows)
+        return len(rows)
+
+    def __len__(self):
+        return self._connection().execute(COUNT).fetchone()[0]
@@ -0,0 +1,25 @@
+"""WSGI entry point for production servers.
+
+gunicorn (Linux, the Docker images)::
+
+    gunicorn -c server_config.py wsgi:application
+
+waitress (any platform, threads only)::
+
+    python wsgi.py
+
+Settings come from the environment; see ``server_config.py``.
+"""
+from app import app as application
+
+
+def main():
+    from waitress import serve
+
+    from server_config import waitress_settings
+
+    serve(application, **waitress_settings())
+
+
+if __name__ == '__main__':
+    main()